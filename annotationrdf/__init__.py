@@ -5,4 +5,9 @@ __email__ = 'steve.cassidy@mq.edu.au'
 __version__ = '0.1.0'
 
 from annotation import Annotation, AnnotationCollection, SecondAnnotation, HMSAnnotation
-from maus_textgrid import maus_annotations
\ No newline at end of file
+from columnar import ColumnarAnnotationCollection
+from maus_textgrid import maus_annotations
+from instruments import Instruments
+from delta import Delta, diff
+from sink import StoreSink
+from bulk import bulk_load
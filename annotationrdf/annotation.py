@@ -1,10 +1,38 @@
+import re
 from UserDict import DictMixin
+from itertools import islice
 from uuid import uuid4
 from rdflib import Namespace, Graph, Literal, XSD, URIRef
 from namespaces import *
 
 from annotation_names import NAMEMAP
-
+from intervals import ContainmentIndex
+from serializers import write_ntriples, write_turtle, read_ntriples
+from jsonld import write_jsonld, read_jsonld
+from terms import TermCache, NO_TERMS
+from instruments import NO_INSTRUMENTS
+
+
+# terms used in the triples for every annotation, made here once since
+# each namespace lookup makes a new URIRef
+RDF_TYPE = RDF.type
+DADA_ANNOTATION = DADA.Annotation
+DADA_PARTOF = DADA.partof
+DADA_TARGETS = DADA.targets
+DADA_TYPE = DADA.type
+DADA_LABEL = DADA.label
+DADA_START = DADA.start
+DADA_END = DADA.end
+AUSNC_SPEAKERID = AUSNC.speakerid
+DADA_TEXTREGION = DADA.TextRegion
+DADA_SECONDREGION = DADA.SecondRegion
+DADA_HMSREGION = DADA.HMSRegion
+XSD_INTEGER = XSD.integer
+XSD_FLOAT = XSD.float
+DADA_NEXT = DADA.next
+DADA_HASCHILD = DADA.hasChild
+DADA_ANNOTATIONCOLLECTION = DADA.AnnotationCollection
+DADA_ANNOTATES = DADA.annotates
 
 
 class Annotation(DictMixin):
@@ -18,6 +46,13 @@ class Annotation(DictMixin):
 
     uniqueid = 0
 
+    # cached URIs and the values they were made from, see uri()
+    _uri = None
+    _uri_id = None
+    _uri_base = None
+    _locator = None
+    _locator_of = None
+
     def __init__(self, tipe, val, start, end, collection, id=None, properties=None):
         # generate an id unless we're given one
         if id:
@@ -81,7 +116,23 @@ class Annotation(DictMixin):
     def uri(self):
         """Return the URI for this annotation"""
 
-        return Namespace(self.collection.uri())['/annotation/' + self.id]
+        # the URI is made once and reused until the id or the
+        # collection URI is replaced
+        base = self.collection.uri()
+        if self._uri_id is not self.id or self._uri_base is not base:
+            self._uri = URIRef(u'%s/annotation/%s' % (base, self.id))
+            self._uri_id = self.id
+            self._uri_base = base
+        return self._uri
+
+    def locator_uri(self):
+        """Return the URI for the locator of this annotation"""
+
+        uri = self.uri()
+        if self._locator_of is not uri:
+            self._locator = URIRef(u'%sL' % uri)
+            self._locator_of = uri
+        return self._locator
 
 
     def set_next(self, ann):
@@ -120,7 +171,17 @@ class Annotation(DictMixin):
         annotation. Nodes go into the given namespace
         and are part of the collectionUri"""
 
-        corpusID = self.collection.corpusID()
+        for triple in self.triples():
+            g.add(triple)
+
+    def triples(self, terms=None):
+        """Generate the RDF triples that represent this annotation,
+        terms is a TermCache used to share repeated terms, if not
+        given each triple gets terms of its own"""
+
+        if terms is None:
+            terms = NO_TERMS
+
         collectionUri = self.collection.uri()
 
         # some identifiers
@@ -128,28 +189,24 @@ class Annotation(DictMixin):
 
         annoturi = self.uri()
 
-        locatoruri = URIRef(self.uri()+"L")
+        locatoruri = self.locator_uri()
 
         # annotation
-        g.add((annoturi, RDF.type, DADA.Annotation))
-        g.add((annoturi, DADA.partof, collectionUri))
-
-        # locator info depends on the type of annotation
-        locatoruri = self.locator_rdf(locatoruri, g)
-        g.add((annoturi, DADA.targets, locatoruri))
-
-        g.add((annoturi, DADA.type, self.tipe))
+        yield (annoturi, RDF_TYPE, DADA_ANNOTATION)
+        yield (annoturi, DADA_PARTOF, collectionUri)
+        yield (annoturi, DADA_TARGETS, locatoruri)
+        yield (annoturi, DADA_TYPE, self.tipe)
 
         for key in self.keys():
             if self[key] != '':
                 if isinstance(key, URIRef):
                     prop = key
                 elif key == 'val':
-                    prop = DADA.label
+                    prop = DADA_LABEL
                 elif key == "speakerid":
-                    prop = AUSNC.speakerid
+                    prop = AUSNC_SPEAKERID
                 else:
-                    prop = property_namespace[key]
+                    prop = terms.uri(u'%s%s' % (property_namespace, key))
                 
                 # if we have a singleton value, make it a list
                 if type(self[key]) != list:
@@ -161,72 +218,118 @@ class Annotation(DictMixin):
                     if isinstance(value, URIRef):
                         obj = value
                     else:
-                        obj = Literal(unicode(value))
+                        obj = terms.literal(unicode(value))
                 
-                    g.add((annoturi, prop, obj))
+                    yield (annoturi, prop, obj)
 
+        # locator info depends on the type of annotation
+        for triple in self.locator_triples(locatoruri, terms):
+            yield triple
 
     def locator_rdf(self, locatoruri, graph):
         """Add RDF triples to the graph to represent the locator information
         for this annotation"""
 
-        graph.add((locatoruri, RDF.type, DADA.TextRegion))
-        graph.add((locatoruri, DADA.start, Literal(int(self.start), datatype=XSD.integer)))
-        graph.add((locatoruri, DADA.end, Literal(int(self.end), datatype=XSD.integer)))
+        for triple in self.locator_triples(locatoruri):
+            graph.add(triple)
 
         return locatoruri
 
+    def locator_triples(self, locatoruri, terms=None):
+        """Generate the RDF triples that represent the locator information
+        for this annotation"""
+
+        if terms is None:
+            terms = NO_TERMS
+
+        yield (locatoruri, RDF_TYPE, DADA_TEXTREGION)
+        yield (locatoruri, DADA_START, terms.literal(int(self.start), XSD_INTEGER))
+        yield (locatoruri, DADA_END, terms.literal(int(self.end), XSD_INTEGER))
+
 
 class SecondAnnotation(Annotation):
     """An annotation on a audio/video document with endpoints defined by offsets in seconds,
     defines the serialisation of the locator"""
 
 
-    def locator_rdf(self, locatoruri, graph):
-        """Add RDF triples to the graph to represent the locator information
+    def locator_triples(self, locatoruri, terms=None):
+        """Generate the RDF triples that represent the locator information
         for this annotation"""
 
+        if terms is None:
+            terms = NO_TERMS
 
-        graph.add((locatoruri, RDF.type, DADA.SecondRegion))
-        graph.add((locatoruri, DADA.start, Literal(float(self.start), datatype=XSD.float)))
-        graph.add((locatoruri, DADA.end, Literal(float(self.end), datatype=XSD.float)))
-        return locatoruri
+        yield (locatoruri, RDF_TYPE, DADA_SECONDREGION)
+        yield (locatoruri, DADA_START, terms.literal(float(self.start), XSD_FLOAT))
+        yield (locatoruri, DADA_END, terms.literal(float(self.end), XSD_FLOAT))
 
 class HMSAnnotation(Annotation):
     """An annotation on a audio/video document with endpoints defined by offsets in HH:MM:SS
     defines the serialisation of the locator"""
 
-    def locator_rdf(self, locatoruri, graph):
-        """Add RDF triples to the graph to represent the locator information
+    def locator_triples(self, locatoruri, terms=None):
+        """Generate the RDF triples that represent the locator information
         for this annotation"""
 
-        graph.add((locatoruri, RDF.type, DADA.HMSRegion))
-        graph.add((locatoruri, DADA.start, Literal(self.start)))
-        graph.add((locatoruri, DADA.end, Literal(self.end)))
-        return locatoruri
+        if terms is None:
+            terms = NO_TERMS
+
+        yield (locatoruri, RDF_TYPE, DADA_HMSREGION)
+        yield (locatoruri, DADA_START, terms.literal(self.start))
+        yield (locatoruri, DADA_END, terms.literal(self.end))
+
+
+# an id with a number at the end, see _id_order
+NUMBERED = re.compile(r'^(.*?)(\d+)$')
+
+# the annotation class for each type of locator and how to read its
+# start and end, used by AnnotationCollection.from_rdf
+LOCATOR_CLASSES = {
+    DADA_TEXTREGION: (Annotation, int),
+    DADA_SECONDREGION: (SecondAnnotation, float),
+    DADA_HMSREGION: (HMSAnnotation, unicode),
+}
+
+# predicates that give the structure of an annotation rather than a property
+STRUCTURE = frozenset([RDF_TYPE, DADA_PARTOF, DADA_TARGETS, DADA_TYPE, DADA_NEXT, DADA_HASCHILD])
 
 
 
 # TODO: AnnotationCollection should have metadata - at least owner, date, source, possibly PROV-O
-# TODO: method to export to JSON-LD format
-# TODO: method to read from JSON-LD format
 class AnnotationCollection:
     """All the annotations on an item"""
 
+    # cached URI and the values it was made from, see uri()
+    _uri = None
+    _uri_itemid = None
+    _uri_id = None
 
-    def __init__(self, annotationList, corpusid, itemid, aclass=Annotation):
+    def __init__(self, annotationList, corpusid, itemid, aclass=Annotation, id=None):
 
         self.annotations = annotationList
 
         self.itemid = itemid
-        self.id = str(uuid4())   # random unique identifier
+        # a random unique identifier unless we're given one, which
+        # should be unique for the item
+        if id:
+            self.id = str(id)
+        else:
+            self.id = str(uuid4())
         self.corpusid = corpusid
         self.aclass = aclass
 
+        # index of annotations by type, kept up to date by add_annotation
+        # and rebuilt if annotations are appended to the list directly
+        self.reindex()
+
     def uri(self):
         """Return an identifier URI for this annotation collection"""
 
-        return Namespace(self.itemid)["/"+self.id]
+        if self._uri_id is not self.id or self._uri_itemid is not self.itemid:
+            self._uri = URIRef(u'%s/%s' % (self.itemid, self.id))
+            self._uri_id = self.id
+            self._uri_itemid = self.itemid
+        return self._uri
 
     def corpusID(self):
         """Return the corpus identifier associated with this annotation"""
@@ -244,34 +347,332 @@ class AnnotationCollection:
 
         ann = self.aclass(tipe, val, start, end, self, id=id, properties=properties)
         self.annotations.append(ann)
+        self.index_annotation(ann)
 
         return ann
 
-    def link_children(self, parenttier, childtier):
-        """Generate links between annotations on the parent and child tiers"""
-        
-        parents = [a for a in self.annotations if a.tipe==parenttier]
-        children =  [a for a in self.annotations if a.tipe==childtier]
-        
-        for parent in parents:
-            for child in children:
-                if child.start >= parent.start and child.end <= parent.end:
-                    parent.add_child(child)
+    def index_annotation(self, ann):
+        """Add an annotation to the index by type, this is done by
+        add_annotation so is only needed for annotations appended
+        to the annotations list directly"""
+
+        if ann.tipe not in self.type_index:
+            self.type_index[ann.tipe] = []
+            self.type_list.append(ann.tipe)
+        self.type_index[ann.tipe].append(ann)
+        self.indexed += 1
+
+    def reindex(self):
+        """Index all of the annotations by type again, needed after
+        changing the tipe of an annotation in the collection; annotations
+        appended to the list directly are found without this"""
+
+        self.type_index = dict()
+        self.type_list = []
+        self.indexed = 0
+        for ann in self.annotations:
+            self.index_annotation(ann)
+
+    def _check_index(self):
+        if self.indexed != len(self.annotations):
+            self.reindex()
+
+    def types(self):
+        """Return a list of the annotation types in this collection
+        in the order they were first added"""
 
+        self._check_index()
+        return list(self.type_list)
 
-    def to_rdf(self, graph=None):
+    def annotations_of_type(self, tipe):
+        """Return a list of the annotations of the given type in the
+        order they were added, which for a tier read from a file is
+        time order"""
+
+        self._check_index()
+        return list(self.type_index.get(tipe, []))
+
+    def link_children(self, parenttier, childtier):
+        """Generate links between annotations on the parent and child tiers,
+        return the number of links made"""
+
+        # from the annotations themselves rather than the index, so that
+        # none are missed whatever has been done to them since they were added
+        parents = []
+        children = []
+        for ann in self.annotations:
+            if ann.tipe == parenttier:
+                parents.append(ann)
+            if ann.tipe == childtier:
+                children.append(ann)
+
+        # children are visited in order so each parent gets them in order
+        index = ContainmentIndex(parents)
+        links = 0
+        for child in children:
+            for parent in index.containing(child.start, child.end):
+                parent.add_child(child)
+                links += 1
+        return links
+
+
+    def to_rdf(self, graph=None, terms=None, chunksize=10000, instruments=None):
         """Add RDF for all of the annotations in the collection
-        in an RDF graph"""
+        in an RDF graph.  Triples are added chunksize at a time
+        with addN so that stores can insert them in bulk.  Repeated
+        terms are shared through terms, a TermCache, which is made for
+        this run if not given, as the graph keeps them.  The time
+        taken and the number of triples are recorded in instruments
+        if given."""
 
         if graph == None:
             graph = Graph()
+        if terms is None:
+            terms = TermCache()
+        if instruments is None:
+            instruments = NO_INSTRUMENTS
 
         graph = bind_graph(graph)
 
+        # addN takes quads, triples go in the graph's default context
+        # as they would with add
+        context = getattr(graph, 'default_context', graph)
+        triples = self.triples(terms)
+        count = 0
+        with instruments.stage('to_rdf'):
+            while True:
+                chunk = [(s, p, o, context) for (s, p, o) in islice(triples, chunksize)]
+                if not chunk:
+                    break
+                graph.addN(chunk)
+                count += len(chunk)
+        instruments.count('triples', count)
+
+        return graph
+
+    def triples(self, terms=None):
+        """Generate the RDF triples for the collection and all of
+        its annotations.  Repeated terms are shared through terms,
+        a TermCache, if given; writing is faster without one, see
+        benchmarks/term_cache.py."""
+
+        if terms is None:
+            terms = NO_TERMS
+
         for a in self.annotations:
-            a.to_rdf(graph)
+            for triple in a.triples(terms):
+                yield triple
+
+        yield (self.uri(), RDF_TYPE, DADA_ANNOTATIONCOLLECTION)
+        yield (self.uri(), DADA_ANNOTATES, self.itemid)
+
+    def write_ntriples(self, out, terms=None, instruments=None):
+        """Write the RDF for this collection to the file object out
+        as N-Triples, one annotation at a time, without building a graph"""
+
+        self._write(write_ntriples, out, terms, instruments)
+
+    def write_turtle(self, out, terms=None, instruments=None):
+        """Write the RDF for this collection to the file object out
+        as Turtle, one annotation at a time, without building a graph"""
+
+        self._write(write_turtle, out, terms, instruments)
+
+    def write_jsonld(self, out, terms=None, instruments=None):
+        """Write the RDF for this collection to the file object out
+        as JSON-LD with the context jsonld.CONTEXT, one annotation at
+        a time, without building a graph"""
+
+        self._write(write_jsonld, out, terms, instruments)
+
+    def _write(self, writer, out, terms, instruments):
+        if instruments is None:
+            instruments = NO_INSTRUMENTS
+        with instruments.stage('serialize'):
+            count = writer(self.triples(terms), out)
+        instruments.count('triples', count)
+
+    @classmethod
+    def from_ntriples(cls, lines, corpusid=None, terms=None):
+        """Make a collection from N-Triples written by write_ntriples,
+        reading lines, eg. an open file, in one pass without building
+        a graph.  See from_rdf."""
+
+        return cls.from_rdf(read_ntriples(lines, terms), corpusid)
+
+    @classmethod
+    def from_jsonld(cls, lines, corpusid=None, terms=None):
+        """Make a collection from JSON-LD written by write_jsonld,
+        reading lines, eg. an open file, a node at a time.  See from_rdf."""
+
+        return cls.from_rdf(read_jsonld(lines, terms), corpusid)
+
+    @classmethod
+    def from_rdf(cls, triples, corpusid=None):
+        """Make a collection from the RDF for one collection as made by
+        to_rdf, given as an rdflib Graph or any iterable of triples,
+        which is read once.
+
+        Each annotation is made as an Annotation, SecondAnnotation or
+        HMSAnnotation according to the type of its locator, with its
+        properties, next link and children.  Annotations and the
+        collection keep the ids in their URIs so the collection gives
+        the same RDF again.  The corpus is not recorded in the RDF so
+        is given as corpusid."""
+
+        if isinstance(triples, Graph):
+            triples = triples.triples((None, None, None))
+
+        # everything said about each subject, sorted out at the end
+        # since the triples may come in any order
+        subjects = dict()
+        annotations = []
+        collections = []
+        for (s, p, o) in triples:
+            if s in subjects:
+                subjects[s].append((p, o))
+            else:
+                subjects[s] = [(p, o)]
+            if p == RDF_TYPE:
+                if o == DADA_ANNOTATION:
+                    annotations.append(s)
+                elif o == DADA_ANNOTATIONCOLLECTION:
+                    collections.append(s)
+
+        if len(collections) != 1:
+            raise TypeError("Expected the RDF for one AnnotationCollection, found %d" % len(collections))
+        colluri = collections[0]
+        itemid = None
+        for (p, o) in subjects[colluri]:
+            if p == DADA_ANNOTATES:
+                itemid = o
+        prefix = u'%s/' % itemid
+        if itemid is None or not colluri.startswith(prefix):
+            raise TypeError("Collection %s is not an annotation collection on an item" % colluri)
+        annprefix = u'%s/annotation/' % colluri
+
+        records = []
+        for uri in annotations:
+            tipe = locator = nexturi = None
+            children = []
+            values = []
+            partof = False
+            for (p, o) in subjects[uri]:
+                if p in STRUCTURE:
+                    if p == DADA_TYPE:
+                        tipe = o
+                    elif p == DADA_TARGETS:
+                        locator = o
+                    elif p == DADA_NEXT:
+                        nexturi = o
+                    elif p == DADA_HASCHILD:
+                        children.append(o)
+                    elif p == DADA_PARTOF:
+                        partof = o == colluri
+                else:
+                    values.append((p, o))
+            if not partof:
+                continue
+            if not uri.startswith(annprefix):
+                raise TypeError("Annotation %s is not in collection %s" % (uri, colluri))
+
+            kind = start = end = None
+            for (p, o) in subjects.get(locator, ()):
+                if p == RDF_TYPE:
+                    kind = o
+                elif p == DADA_START:
+                    start = o
+                elif p == DADA_END:
+                    end = o
+            if kind not in LOCATOR_CLASSES or start is None or end is None:
+                raise TypeError("Annotation %s has no locator with a start and end" % uri)
+            (aclass, convert) = LOCATOR_CLASSES[kind]
+
+            id = str(uri[len(annprefix):])
+            records.append((_id_order(id), id, uri, tipe, aclass, convert(start),
+                            convert(end), values, nexturi, children))
+
+        # annotations in the order they were made, as far as the ids tell
+        records.sort()
+        aclass = records[0][4] if records else Annotation
+        collection = cls([], corpusid, itemid, aclass)
+        collection.id = str(colluri[len(prefix):])
+        property_namespace = collection.property_namespace()
+
+        byuri = dict()
+        position = dict()
+        for (order, id, uri, tipe, klass, start, end, values, nexturi, children) in records:
+            properties = _properties(values, property_namespace)
+            val = properties.pop('val', None)
+            if klass is aclass:
+                ann = collection.add_annotation(tipe, val, start, end, id=id, properties=properties)
+            else:
+                # a collection with more than one kind of locator
+                ann = klass(tipe, val, start, end, collection, id=id, properties=properties)
+                collection.annotations.append(ann)
+                collection.index_annotation(ann)
+            byuri[uri] = ann
+            position[uri] = len(position)
+
+        # later annotations must not reuse the ids of those read
+        numbered = [r[0][1] for r in records if r[0][0] == 0]
+        if numbered and max(numbered) >= Annotation.uniqueid:
+            Annotation.uniqueid = max(numbered) + 1
+
+        for (order, id, uri, tipe, klass, start, end, values, nexturi, children) in records:
+            if nexturi is None and not children:
+                continue
+            ann = byuri[uri]
+            if nexturi is not None:
+                if nexturi in byuri:
+                    ann.set_next(byuri[nexturi])
+                else:
+                    ann[DADA_NEXT] = nexturi
+            # the RDF doesn't keep the order of children, they were
+            # most likely added in the order the annotations were made
+            for child in sorted(children, key=lambda c: position.get(c, len(position))):
+                if child in byuri:
+                    ann.add_child(byuri[child])
+                else:
+                    ann[DADA_HASCHILD] = ann.get(DADA_HASCHILD, []) + [child]
 
-        graph.add((self.uri(), RDF.type, DADA.AnnotationCollection))
-        graph.add((self.uri(), DADA.annotates, self.itemid))
+        return collection
+
+
+def _properties(values, property_namespace):
+    """The properties dictionary of an annotation from the (predicate,
+    object) pairs that are not part of its structure, the reverse of the
+    property triples made by Annotation.triples"""
+
+    properties = dict()
+    for (p, o) in values:
+        if p == DADA_LABEL:
+            key = 'val'
+        elif p == AUSNC_SPEAKERID:
+            key = 'speakerid'
+        elif p.startswith(property_namespace):
+            key = str(p[len(property_namespace):])
+        else:
+            key = p
+        value = o if isinstance(o, URIRef) else unicode(o)
+        if key not in properties:
+            properties[key] = value
+        elif isinstance(properties[key], list):
+            properties[key].append(value)
+        else:
+            properties[key] = [properties[key], value]
+    return properties
+
+
+def _id_order(id):
+    """Sort key for annotations: generated ids are numbers and are in
+    the order the annotations were made, any others go after them,
+    numbered in order after any prefix as eg. MAU12"""
+
+    if id.isdigit():
+        return (0, int(id))
+    m = NUMBERED.match(id)
+    if m:
+        return (1, m.group(1), int(m.group(2)))
+    return (1, id, -1)
 
-        return graph
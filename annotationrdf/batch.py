@@ -0,0 +1,206 @@
+"""Convert directories of MAUS TextGrid files to RDF in parallel
+
+    maus2rdf --corpus austalk --output out --jobs 8 data/*/ 'more/*.TextGrid'
+
+Each TextGrid is converted by maus_annotations and written to its own
+file in the output directory, named after the item.  A line with the
+time taken or the error is reported for each file, failures don't stop
+the run, and the exit status is 1 if any file failed.
+
+With --cache the output for each file is kept in a directory under a
+hash of the TextGrid and the options, and files that haven't changed
+since they were last converted are copied from there.  Conversions
+through the cache always use stable ids.
+"""
+
+import argparse
+import fnmatch
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from rdflib import URIRef
+
+from maus_textgrid import maus_annotations
+from namespaces import corpus_uri
+from instruments import Instruments
+from cache import ConversionCache
+
+
+FORMATS = {'turtle': '.ttl', 'nt': '.nt'}
+
+DEFAULT_ITEM_URI = "http://ns.ausnc.org.au/corpora/{corpus}/items/{item}"
+
+# the ConversionCache for each (directory, max_bytes) in this process
+_caches = dict()
+
+
+def open_cache(directory, max_bytes):
+    """Return a ConversionCache, one per process so that the size of
+    the cache is only found once"""
+
+    if (directory, max_bytes) not in _caches:
+        _caches[(directory, max_bytes)] = ConversionCache(directory, max_bytes)
+    return _caches[(directory, max_bytes)]
+
+
+def find_textgrids(inputs, pattern="*.TextGrid"):
+    """Return a sorted list of the files named by inputs, which may be
+    files, glob patterns or directories to search for pattern"""
+
+    found = set()
+    for name in inputs:
+        if os.path.isdir(name):
+            for (dirpath, dirnames, filenames) in os.walk(name):
+                for filename in fnmatch.filter(filenames, pattern):
+                    found.add(os.path.join(dirpath, filename))
+        elif os.path.exists(name):
+            found.add(name)
+        else:
+            found.update(glob.glob(name))
+    return sorted(found)
+
+
+def item_id(path):
+    """The item identifier for a file is its name without extension"""
+
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def duplicate_items(paths):
+    """Return a dictionary of the item identifiers given to more than one
+    of paths, each with the list of those paths"""
+
+    items = dict()
+    for path in paths:
+        items.setdefault(item_id(path), []).append(path)
+    return dict((item, found) for (item, found) in items.items() if len(found) > 1)
+
+
+def convert(job):
+    """Convert one TextGrid, return a tuple (path, outpath, seconds, error, stats)
+    where error is None if the conversion worked and stats are the
+    stage times and counts from Instruments, and whether the output
+    was cached.  cache is None or the directory and size in bytes of a
+    ConversionCache."""
+
+    (path, outdir, corpus, item_uri, fmt, stable_ids, cache) = job
+    item = item_id(path)
+    outpath = os.path.join(outdir, item + FORMATS[fmt])
+    instruments = Instruments()
+    start = time.time()
+    cached = False
+    try:
+        itemid = URIRef(item_uri.format(corpus=corpus, item=item))
+        if cache is not None:
+            cache = open_cache(*cache)
+            key = cache.key(path, corpus_uri(corpus), itemid, fmt)
+            cached = cache.fetch(key, outpath)
+        if not cached:
+            collection = maus_annotations(path, corpus_uri(corpus), itemid, instruments=instruments,
+                                          stable_ids=stable_ids or cache is not None)
+            with open(outpath, 'wb') as out:
+                if fmt == 'nt':
+                    collection.write_ntriples(out, instruments=instruments)
+                else:
+                    collection.write_turtle(out, instruments=instruments)
+            if cache is not None:
+                cache.store(key, outpath)
+    except Exception as e:
+        # don't leave partial output behind
+        if os.path.exists(outpath):
+            os.remove(outpath)
+        error = "%s: %s" % (e.__class__.__name__, e)
+    else:
+        error = None
+    stats = dict(instruments.stats())
+    stats['cached'] = cached
+    return (path, outpath, time.time() - start, error, stats)
+
+
+def convert_all(paths, outdir, corpus, item_uri=DEFAULT_ITEM_URI, fmt='turtle', jobs=1,
+                stable_ids=False, cache=None):
+    """Convert each of the TextGrid files in paths, using a pool of jobs
+    processes if jobs > 1.  Generates a result tuple from convert for
+    each file as it finishes."""
+
+    work = [(path, outdir, corpus, item_uri, fmt, stable_ids, cache) for path in paths]
+    if jobs > 1:
+        pool = multiprocessing.Pool(jobs)
+        try:
+            for result in pool.imap_unordered(convert, work):
+                yield result
+        finally:
+            pool.terminate()
+            pool.join()
+    else:
+        for job in work:
+            yield convert(job)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('inputs', nargs='+',
+                        help='TextGrid files, glob patterns or directories')
+    parser.add_argument('--corpus', required=True, help='corpus identifier')
+    parser.add_argument('--item-uri', default=DEFAULT_ITEM_URI,
+                        help='template for item URIs using {corpus} and {item} (default %(default)s)')
+    parser.add_argument('--output', '-o', default='.', help='output directory')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='turtle',
+                        help='output format')
+    parser.add_argument('--pattern', default='*.TextGrid',
+                        help='file name pattern used to search directories')
+    parser.add_argument('--stable-ids', action='store_true',
+                        help='give the same URIs each time an item is converted, '
+                        'so versions can be compared')
+    parser.add_argument('--cache', help='directory to keep converted output in, '
+                        'unchanged files are copied from here')
+    parser.add_argument('--cache-size', type=int, default=1024,
+                        help='megabytes of output to keep in the cache (default %(default)s)')
+    parser.add_argument('--metrics', help='append the stage times and counts for each file '
+                        'to this file as lines of JSON')
+    parser.add_argument('--jobs', '-j', type=int, default=multiprocessing.cpu_count(),
+                        help='number of processes (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    paths = find_textgrids(args.inputs, args.pattern)
+    # these would write the same output file and item URI
+    duplicates = duplicate_items(paths)
+    if duplicates:
+        parser.error("more than one file for the same item: %s" % '; '.join(
+            "%s (%s)" % (item, ', '.join(found)) for (item, found) in sorted(duplicates.items())))
+    if not os.path.isdir(args.output):
+        os.makedirs(args.output)
+
+    metrics = open(args.metrics, 'a') if args.metrics else None
+    cache = (args.cache, args.cache_size << 20) if args.cache else None
+    failed = 0
+    cached = 0
+    total = 0.0
+    for (path, outpath, seconds, error, stats) in convert_all(paths, args.output, args.corpus,
+                                                              args.item_uri, args.format, args.jobs,
+                                                              args.stable_ids, cache):
+        total += seconds
+        if error:
+            failed += 1
+            print "FAILED %8.3fs %s: %s" % (seconds, path, error)
+        elif stats['cached']:
+            cached += 1
+            print "cached %8.3fs %s -> %s" % (seconds, path, outpath)
+        else:
+            print "ok     %8.3fs %s -> %s" % (seconds, path, outpath)
+        sys.stdout.flush()
+        if metrics:
+            metrics.write(json.dumps(dict(stats, path=path, seconds=seconds, error=error)) + '\n')
+
+    if metrics:
+        metrics.close()
+    print "%d files, %d failed, %d cached, %.3fs conversion time" % (len(paths), failed, cached, total)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Load many collections into an rdflib graph, usually one on a
+persistent store, in large batches
+
+    rdflib_sqlalchemy.registerplugins()
+    graph = Graph(store='SQLAlchemy')
+    graph.open(Literal('sqlite:///corpus.db'), create=True)
+    bulk_load(graph, (maus_annotations(p, corpusid, item(p)) for p in paths))
+    graph.close()
+
+Calling to_rdf for each item adds its triples with an addN for each
+item.  bulk_load takes the triples of any number of collections and
+adds them chunksize at a time, so a store that writes each addN in one
+database transaction, as rdflib-sqlalchemy does, makes one for each
+chunk rather than for each item.  rdflib stores update their indexes as
+each triple is added and have no way to put that off.
+
+graph.commit is called every transaction_size triples, and a failure
+rolls back to the last commit, only if the store is transaction_aware.
+rdflib's own IOMemory and Sleepycat stores are not, their commit and
+rollback do nothing and Sleepycat syncs to disk on a timer, so the
+triples added before a failure stay in the graph.  rdflib-sqlalchemy
+0.3 says it is transaction aware but commits each addN itself and does
+nothing on commit or rollback; AuditableStore, wrapping another store,
+does roll back.
+"""
+
+from itertools import islice
+
+from namespaces import bind_graph
+from instruments import NO_INSTRUMENTS
+from terms import TermCache
+
+
+def bulk_load(graph, collections, transaction_size=500000, chunksize=10000, instruments=None):
+    """Add the triples of each collection in the iterable collections,
+    which may make them one at a time, to graph, return the number of
+    triples added.
+
+    If the graph's store is transaction aware it is committed after
+    every transaction_size triples and at the end, and if anything fails
+    the current transaction is rolled back and the error raised; earlier
+    transactions stay committed.  Otherwise there are no commits and
+    the triples added before a failure are left in the graph.  The time
+    taken and counts of items, triples and transactions are recorded in
+    instruments if given."""
+
+    if instruments is None:
+        instruments = NO_INSTRUMENTS
+    transaction_aware = graph.store.transaction_aware
+
+    bind_graph(graph)
+    # as in to_rdf, triples go in the default context of a ConjunctiveGraph
+    context = getattr(graph, 'default_context', graph)
+
+    items = [0]
+
+    def item_triples():
+        for collection in collections:
+            items[0] += 1
+            # a cache for each item as in to_rdf, one shared by all the
+            # items fills with their URIs and is cleared again and again
+            for triple in collection.triples(TermCache()):
+                yield triple
+
+    triples = item_triples()
+    count = 0
+    pending = 0
+    transactions = 0
+    with instruments.stage('bulk_load'):
+        try:
+            while True:
+                chunk = [(s, p, o, context) for (s, p, o) in islice(triples, chunksize)]
+                if chunk:
+                    graph.addN(chunk)
+                    pending += len(chunk)
+                if pending and (pending >= transaction_size or not chunk):
+                    if transaction_aware:
+                        graph.commit()
+                        transactions += 1
+                    count += pending
+                    pending = 0
+                if not chunk:
+                    break
+        except Exception:
+            if transaction_aware:
+                graph.rollback()
+            raise
+        finally:
+            instruments.count('items', items[0])
+            instruments.count('triples', count)
+            instruments.count('transactions', transactions)
+
+    return count
@@ -0,0 +1,190 @@
+"""A content addressed cache of converted TextGrids on disk, so that
+files that haven't changed since the last run are not converted again
+
+    cache = ConversionCache('/var/cache/maus2rdf')
+    key = cache.key(path, corpusid, itemid, 'nt')
+    if not cache.fetch(key, outpath):
+        collection = maus_annotations(path, corpusid, itemid, stable_ids=True)
+        collection.write_ntriples(open(outpath, 'wb'))
+        cache.store(key, outpath)
+
+Output should be made with stable ids so that a file converted again
+after its entry was evicted gives the same output as before.
+"""
+
+# so that annotationrdf below is the package, not annotationrdf.py in it
+from __future__ import absolute_import
+
+import cPickle as pickle
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+
+from annotationrdf import __version__
+
+
+# part of every key, bump this whenever a change to the code changes the
+# output for the same input, eg. to the serializers or the URIs made, so
+# that output from before the change is not used
+OUTPUT_VERSION = 1
+
+
+class ConversionCache(object):
+    """Converted output kept in a directory under a hash of everything
+    that it depends on: the bytes of the TextGrid, the corpus and item
+    ids, any options such as the output format, and the version of this
+    library and of its output, OUTPUT_VERSION.
+
+    Using an entry updates its modification time, and when the entries
+    grow beyond max_bytes the least recently used are removed.  Entries
+    are written to a temporary file and renamed into place so several
+    processes can share a cache directory.
+    """
+
+    def __init__(self, directory, max_bytes=1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # total size of the entries, found when first needed
+        self.size = None
+        _makedirs(directory)
+
+    def key(self, path, corpusid, itemid, *options):
+        """Return the key for converting the file at path"""
+
+        digest = hashlib.sha1()
+        for part in (__version__, OUTPUT_VERSION, corpusid, itemid) + options:
+            digest.update(unicode(part).encode('utf-8'))
+            digest.update('\0')
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), ''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def path(self, key, suffix=''):
+        """The file for an entry, in a subdirectory named by the start of
+        the key so that no one directory gets too large"""
+
+        return os.path.join(self.directory, key[:2], key + suffix)
+
+    def fetch(self, key, outpath):
+        """Copy the output stored under key to outpath, return True if
+        there was one or False if it must be converted"""
+
+        entry = self.path(key)
+        try:
+            os.utime(entry, None)
+            shutil.copyfile(entry, outpath)
+        except (IOError, OSError):
+            # not there, or evicted by another process as we copied it
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def store(self, key, outpath):
+        """Store a copy of the output in the file outpath under key"""
+
+        with open(outpath, 'rb') as f:
+            self._write(self.path(key), lambda out: shutil.copyfileobj(f, out))
+
+    def load_collection(self, key):
+        """Return the collection stored under key, or None"""
+
+        entry = self.path(key, '.pickle')
+        try:
+            os.utime(entry, None)
+            with open(entry, 'rb') as f:
+                collection = pickle.load(f)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return collection
+
+    def store_collection(self, key, collection):
+        """Store a collection under key, a ColumnarAnnotationCollection
+        is much smaller than an AnnotationCollection"""
+
+        self._write(self.path(key, '.pickle'),
+                    lambda out: pickle.dump(collection, out, pickle.HIGHEST_PROTOCOL))
+
+    def _write(self, entry, write):
+        directory = os.path.dirname(entry)
+        _makedirs(directory)
+        (fd, tmppath) = tempfile.mkstemp(dir=directory, prefix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                write(out)
+            # an entry stored again replaces the old one
+            try:
+                replaced = os.path.getsize(entry)
+            except OSError:
+                replaced = 0
+            os.rename(tmppath, entry)
+        finally:
+            if os.path.exists(tmppath):
+                os.remove(tmppath)
+
+        if self.size is None:
+            self.size = sum(size for (mtime, size, path) in self.entries())
+        else:
+            self.size += os.path.getsize(entry) - replaced
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def entries(self):
+        """Return a list of (modification time, size, path) for the
+        entries in the cache"""
+
+        result = []
+        for (dirpath, dirnames, filenames) in os.walk(self.directory):
+            for filename in filenames:
+                if filename.startswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                result.append((info.st_mtime, info.st_size, path))
+        return result
+
+    def evict(self):
+        """Remove the least recently used entries until those left take
+        no more than max_bytes, return the number removed"""
+
+        entries = sorted(self.entries())
+        self.size = sum(size for (mtime, size, path) in entries)
+        removed = 0
+        for (mtime, size, path) in entries:
+            if self.size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # removed by another process
+                pass
+            self.size -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        """Return a dictionary of statistics about the cache"""
+
+        lookups = self.hits + self.misses
+        return {'cache_hits': self.hits,
+                'cache_misses': self.misses,
+                'cache_hit_rate': float(self.hits) / lookups if lookups else 0.0,
+                }
+
+
+def _makedirs(directory):
+    try:
+        os.makedirs(directory)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
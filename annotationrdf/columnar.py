@@ -0,0 +1,341 @@
+"""A compact, column oriented store for large annotation collections"""
+
+from array import array
+from bisect import bisect_left
+from UserDict import DictMixin
+
+from rdflib import URIRef
+
+from annotation import Annotation, AnnotationCollection
+from intervals import ContainmentIndex
+from namespaces import DADA
+
+
+class Codes(object):
+    """Dictionary encoding of values as small integer codes"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = dict()
+
+    def __len__(self):
+        return len(self.values)
+
+    def code(self, value):
+        """Return the code for value, assigning a new one if needed"""
+
+        try:
+            return self.codes[value]
+        except KeyError:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+            return code
+
+
+class ColumnarAnnotationCollection(AnnotationCollection):
+    """An annotation collection that keeps its annotations in typed
+    arrays, one entry per annotation, instead of as Annotation objects.
+
+    Start and end times are stored as doubles, so they must be numbers
+    (or strings that can be read as numbers).  Types and labels are
+    stored as codes into a table of distinct values, next links and
+    links made by link_children as row numbers.  Any other properties
+    are kept in a dictionary for just the annotations that have them.
+
+    Annotation objects are made on demand as views of one row: reading
+    or changing a view reads or changes the columns, so the collection
+    can be used in the same way as an AnnotationCollection.
+    """
+
+    def __init__(self, annotationList, corpusid, itemid, aclass=Annotation, id=None):
+
+        AnnotationCollection.__init__(self, [], corpusid, itemid, aclass, id)
+
+        self.starts = array('d')
+        self.ends = array('d')
+        self.tipes = array('i')
+        self.labels = array('i')
+        self.ids = array('l')
+        self.nexts = array('i')
+
+        self.tipe_codes = Codes()
+        self.label_codes = Codes()
+
+        self.explicit_ids = dict()  # row -> id given to add_annotation
+        self.children = dict()      # row -> array of child rows
+        self.extra = dict()         # row -> dict of any other properties
+        self.type_rows = []         # type code -> array of rows
+
+        self.view_class = view_class(aclass)
+        self.annotations = AnnotationColumns(self)
+
+        for ann in annotationList:
+            properties = dict(ann.properties)
+            del properties['val']
+            self.add_annotation(ann.tipe, ann['val'], ann.start, ann.end, id=ann.id,
+                                properties=properties)
+
+    def add_annotation(self, tipe, val, start, end, id=None, properties=None):
+        """Add a new annotation to this collection"""
+
+        assert(isinstance(tipe, URIRef))
+
+        row = len(self.starts)
+        self.starts.append(float(start))
+        self.ends.append(float(end))
+        code = self.tipe_codes.code(tipe)
+        self.tipes.append(code)
+        if code == len(self.type_rows):
+            self.type_rows.append(array('i'))
+        self.type_rows[code].append(row)
+        # val is a special property
+        self.labels.append(self.label_codes.code(val or ""))
+        self.nexts.append(-1)
+
+        # generate an id unless we're given one
+        if id:
+            self.ids.append(-1)
+            self.explicit_ids[row] = str(id)
+        else:
+            self.ids.append(Annotation.uniqueid)
+            Annotation.uniqueid = Annotation.uniqueid + 1
+
+        ann = self.view(row)
+        if properties:
+            for key in properties:
+                if key != 'val':
+                    ann[key] = properties[key]
+
+        return ann
+
+    def link_children(self, parenttier, childtier):
+        """Generate links between annotations on the parent and child tiers,
+        working on rows so that no annotation views are made, return the
+        number of links made"""
+
+        parents = self.rows_of_type(parenttier)
+        index = ContainmentIndex(parents, start=self.starts.__getitem__, end=self.ends.__getitem__)
+
+        links = 0
+        for row in self.rows_of_type(childtier):
+            for parent in index.containing(self.starts[row], self.ends[row]):
+                if parent not in self.children:
+                    self.children[parent] = array('i')
+                self.children[parent].append(row)
+                links += 1
+        return links
+
+    def index_annotation(self, ann):
+        """Types are indexed by add_annotation as rows are added"""
+
+        pass
+
+    def types(self):
+        """Return a list of the annotation types in this collection
+        in the order they were first added"""
+
+        return list(self.tipe_codes.values)
+
+    def rows_of_type(self, tipe):
+        """Return an array of the rows holding annotations of the given type"""
+
+        if tipe in self.tipe_codes.codes:
+            return self.type_rows[self.tipe_codes.codes[tipe]]
+        return array('i')
+
+    def annotations_of_type(self, tipe):
+        """Return a list of the annotations of the given type in the
+        order they were added"""
+
+        return [self.view(row) for row in self.rows_of_type(tipe)]
+
+    def view(self, row):
+        """Return an Annotation for the given row"""
+
+        return self.view_class(self, row)
+
+    def __getstate__(self):
+        # view classes are made at run time so can't be pickled,
+        # they are made again from aclass
+        state = dict(self.__dict__)
+        del state['view_class']
+        del state['annotations']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.view_class = view_class(self.aclass)
+        self.annotations = AnnotationColumns(self)
+
+
+class AnnotationColumns(object):
+    """The list of annotations in a ColumnarAnnotationCollection,
+    making an Annotation view for each one as it is accessed"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __len__(self):
+        return len(self.collection.starts)
+
+    def __iter__(self):
+        for row in xrange(len(self)):
+            yield self.collection.view(row)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.collection.view(row) for row in xrange(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("annotation index out of range")
+        return self.collection.view(index)
+
+
+class ColumnProperties(DictMixin):
+    """The properties of one annotation in a ColumnarAnnotationCollection"""
+
+    def __init__(self, collection, row):
+        self.collection = collection
+        self.row = row
+
+    def __getitem__(self, key):
+        c = self.collection
+        extra = c.extra.get(self.row, {})
+        if key == 'val':
+            return c.label_codes.values[c.labels[self.row]]
+        elif key == DADA.next and c.nexts[self.row] >= 0:
+            return c.view(c.nexts[self.row]).uri()
+        elif key == DADA.hasChild and self.row in c.children:
+            return [c.view(r).uri() for r in c.children[self.row]] + extra.get(key, [])
+        return extra[key]
+
+    def __setitem__(self, key, value):
+        c = self.collection
+        if key == 'val':
+            c.labels[self.row] = c.label_codes.code(value)
+            return
+        elif key == DADA.next:
+            c.nexts[self.row] = -1
+        elif key == DADA.hasChild:
+            c.children.pop(self.row, None)
+        c.extra.setdefault(self.row, {})[key] = value
+
+    def __delitem__(self, key):
+        c = self.collection
+        found = False
+        if key == DADA.next and c.nexts[self.row] >= 0:
+            c.nexts[self.row] = -1
+            found = True
+        elif key == DADA.hasChild and self.row in c.children:
+            del c.children[self.row]
+            found = True
+        extra = c.extra.get(self.row, {})
+        if key in extra:
+            del extra[key]
+            if not extra:
+                del c.extra[self.row]
+            found = True
+        if not found:
+            raise KeyError(key)
+
+    def keys(self):
+        c = self.collection
+        extra = c.extra.get(self.row, {})
+        keys = ['val']
+        if c.nexts[self.row] >= 0:
+            keys.append(DADA.next)
+        if self.row in c.children and DADA.hasChild not in extra:
+            keys.append(DADA.hasChild)
+        return keys + extra.keys()
+
+
+class ColumnarAnnotation(object):
+    """Mixin that makes an Annotation class a view of one row of
+    a ColumnarAnnotationCollection"""
+
+    def __init__(self, collection, row):
+        self.collection = collection
+        self.row = row
+        self.properties = ColumnProperties(collection, row)
+
+    def _get_id(self):
+        c = self.collection
+        if c.ids[self.row] < 0:
+            return c.explicit_ids[self.row]
+        return str(c.ids[self.row])
+
+    def _set_id(self, id):
+        self.collection.ids[self.row] = -1
+        self.collection.explicit_ids[self.row] = str(id)
+
+    id = property(_get_id, _set_id)
+
+    def _get_tipe(self):
+        return self.collection.tipe_codes.values[self.collection.tipes[self.row]]
+
+    def _set_tipe(self, tipe):
+        assert(isinstance(tipe, URIRef))
+        c = self.collection
+        c.type_rows[c.tipes[self.row]].remove(self.row)
+        code = c.tipe_codes.code(tipe)
+        if code == len(c.type_rows):
+            c.type_rows.append(array('i'))
+        rows = c.type_rows[code]
+        rows.insert(bisect_left(rows, self.row), self.row)
+        c.tipes[self.row] = code
+
+    tipe = property(_get_tipe, _set_tipe)
+
+    def _get_start(self):
+        return self.collection.starts[self.row]
+
+    def _set_start(self, start):
+        self.collection.starts[self.row] = float(start)
+
+    start = property(_get_start, _set_start)
+
+    def _get_end(self):
+        return self.collection.ends[self.row]
+
+    def _set_end(self, end):
+        self.collection.ends[self.row] = float(end)
+
+    end = property(_get_end, _set_end)
+
+    def _same_collection(self, ann):
+        return isinstance(ann, ColumnarAnnotation) and ann.collection is self.collection
+
+    def set_next(self, ann):
+        """assert that 'ann' is the next in sequence to this annotation"""
+
+        if self._same_collection(ann):
+            self.properties.pop(DADA.next, None)
+            self.collection.nexts[self.row] = ann.row
+        else:
+            Annotation.set_next(self, ann)
+
+    def add_child(self, ann):
+        """add an annotation as the child of this one, nodes can
+        have multiple children"""
+
+        if self._same_collection(ann):
+            children = self.collection.children
+            if self.row not in children:
+                children[self.row] = array('i')
+            children[self.row].append(ann.row)
+        else:
+            extra = self.collection.extra.setdefault(self.row, {})
+            extra.setdefault(DADA.hasChild, []).append(ann.uri())
+
+
+_view_classes = dict()
+
+
+def view_class(aclass):
+    """Return the class of views for annotations of class aclass"""
+
+    if aclass not in _view_classes:
+        _view_classes[aclass] = type('Columnar' + aclass.__name__, (ColumnarAnnotation, aclass), {})
+    return _view_classes[aclass]
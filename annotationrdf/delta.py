@@ -0,0 +1,309 @@
+"""Differences between two versions of the RDF for an item, so that a
+store can be updated with just the triples that changed
+
+    old = AnnotationCollection.from_ntriples(open('item.nt'))
+    new = maus_annotations(path, corpusid, itemid, stable_ids=True)
+    change = diff(old, new)
+    change.write_sparql(out)
+
+The URIs of the two versions must mostly line up for the difference
+to be small, so collections should be made with stable ids (see
+maus_annotations).  Stable ids are positions along a tier, so an
+interval added or dropped on a re-run renumbers the rest of its tier;
+diff matches the annotations of each type in the two versions by their
+labels and gives the new ones the URIs of the old before comparing, so
+that the change stays local.  Triples with blank nodes can't be matched
+between versions and always appear as removed and added, write_sparql
+removes them with DELETE WHERE since DELETE DATA can't have them.
+"""
+
+from difflib import SequenceMatcher
+
+from rdflib import Graph, URIRef, BNode
+
+from annotation import AnnotationCollection, RDF_TYPE, DADA_ANNOTATION, DADA_TYPE, DADA_LABEL, \
+    DADA_TARGETS, DADA_START, DADA_END
+from serializers import ntriples_term, read_ntriples, NONASCII, escape_nonascii
+from terms import TermCache
+
+
+def triples_of(source):
+    """The triples of a collection, a Graph or an iterable of triples"""
+
+    if isinstance(source, AnnotationCollection):
+        return source.triples()
+    if isinstance(source, Graph):
+        return source.triples((None, None, None))
+    return source
+
+
+# the properties of annotations and their locators used to match them
+MATCHED = frozenset([DADA_TYPE, DADA_LABEL, DADA_TARGETS, DADA_START, DADA_END])
+
+
+def diff(old, new, align=True):
+    """Return the Delta that changes old into new, each a collection,
+    a Graph or an iterable of triples.  If align is true the
+    annotations of new are first renamed to match those of old, see
+    align_annotations, and the delta adds them under the old URIs."""
+
+    old = set(triples_of(old))
+    new = set(triples_of(new))
+    if align:
+        new = align_annotations(old, new)
+    return Delta(old - new, new - old)
+
+
+def align_annotations(old, new):
+    """Return the triples of new with its annotations, and their
+    locators, renamed to the URIs of the matching annotations in old.
+
+    The annotations of each type are put in time order and their
+    label sequences matched with difflib; annotations in matching or
+    replaced runs take the URI of their partner in old.  An unmatched
+    annotation whose URI is now used by another is given a new one,
+    its URI with -1, -2... added."""
+
+    old_tiers = _tiers(old)
+    new_tiers = _tiers(new)
+
+    rename = dict()
+    for tipe in sorted(new_tiers):
+        old_tier = old_tiers.get(tipe, [])
+        new_tier = new_tiers[tipe]
+        for (i, j) in _matches([a[1] for a in old_tier], [a[1] for a in new_tier]):
+            (a, b) = (old_tier[i], new_tier[j])
+            rename[b[2]] = a[2]
+            if a[3] is not None and b[3] is not None:
+                rename[b[3]] = a[3]
+
+    taken = set(rename.values())
+    names = set(s for (s, p, o) in old) | set(s for (s, p, o) in new)
+    for tipe in sorted(new_tiers):
+        for (key, label, uri, locator) in new_tiers[tipe]:
+            for term in (uri, locator):
+                if term is not None and term not in rename and term in taken:
+                    rename[term] = _fresh(term, names)
+
+    rename = dict((a, b) for (a, b) in rename.items() if a != b)
+    if not rename:
+        return new
+    return set((rename.get(s, s), p, rename.get(o, o)) for (s, p, o) in new)
+
+
+def _matches(old, new):
+    """Generate the pairs of positions of matching items in the lists
+    old and new.  The common start and end are matched first, since
+    SequenceMatcher is slow on long lists of a few repeated labels and
+    most changes are local."""
+
+    start = 0
+    limit = min(len(old), len(new))
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+
+    for i in range(start):
+        yield (i, i)
+    matcher = SequenceMatcher(None, old[start:len(old) - end], new[start:len(new) - end], autojunk=False)
+    for (op, i1, i2, j1, j2) in matcher.get_opcodes():
+        if op in ('equal', 'replace'):
+            for k in range(min(i2 - i1, j2 - j1)):
+                yield (start + i1 + k, start + j1 + k)
+    for k in range(1, end + 1):
+        yield (len(old) - k, len(new) - k)
+
+
+def _tiers(triples):
+    """The annotations in triples by type, each a time ordered list of
+    (sort key, label, uri, locator uri)"""
+
+    annotations = []
+    fields = dict()
+    for (s, p, o) in triples:
+        if p in MATCHED:
+            fields.setdefault(s, {})[p] = o
+        elif p == RDF_TYPE and o == DADA_ANNOTATION:
+            annotations.append(s)
+
+    tiers = dict()
+    for uri in annotations:
+        values = fields.get(uri, {})
+        locator = values.get(DADA_TARGETS)
+        region = fields.get(locator, {})
+        key = (_value(region.get(DADA_START)), _value(region.get(DADA_END)), uri)
+        tiers.setdefault(values.get(DADA_TYPE), []).append((key, values.get(DADA_LABEL), uri, locator))
+    for tier in tiers.values():
+        tier.sort()
+    return tiers
+
+
+def _value(term):
+    if term is None:
+        return None
+    return term.toPython()
+
+
+def _fresh(uri, names):
+    """A URI made from uri that is not in names, which it is added to"""
+
+    n = 1
+    while URIRef(u'%s-%d' % (uri, n)) in names:
+        n += 1
+    fresh = URIRef(u'%s-%d' % (uri, n))
+    names.add(fresh)
+    return fresh
+
+
+def ntriples_line(triple):
+    """The N-Triples form of a triple, without the newline"""
+
+    line = u'%s %s %s .' % tuple(ntriples_term(term) for term in triple)
+    return NONASCII.sub(escape_nonascii, line).encode('ascii')
+
+
+def pattern_line(triple, variables):
+    """The form of a triple in a SPARQL pattern, blank nodes replaced by
+    variables named in the dictionary variables, without the newline"""
+
+    terms = []
+    for term in triple:
+        if isinstance(term, BNode):
+            if term not in variables:
+                variables[term] = u'?b%d' % len(variables)
+            terms.append(variables[term])
+        else:
+            terms.append(ntriples_term(term))
+    line = u'%s %s %s .' % tuple(terms)
+    return NONASCII.sub(escape_nonascii, line).encode('ascii')
+
+
+def _has_bnode(triple):
+    return isinstance(triple[0], BNode) or isinstance(triple[2], BNode)
+
+
+def _bnode_groups(triples):
+    """Split triples, each with a blank node, into lists of those
+    connected by shared blank nodes"""
+
+    parent = dict()
+
+    def find(node):
+        while parent.setdefault(node, node) != node:
+            node = parent[node]
+        return node
+
+    for triple in triples:
+        nodes = [t for t in triple if isinstance(t, BNode)]
+        for node in nodes[1:]:
+            parent[find(node)] = find(nodes[0])
+
+    groups = dict()
+    for triple in triples:
+        node = [t for t in triple if isinstance(t, BNode)][0]
+        groups.setdefault(find(node), []).append(triple)
+    return groups.values()
+
+
+class Delta(object):
+    """The triples to remove from and add to one version of some RDF to
+    make another.  Output is in sorted N-Triples order so that the same
+    change is always written the same way."""
+
+    def __init__(self, removed, added):
+        self.removed = set(removed)
+        self.added = set(added)
+
+    def __len__(self):
+        return len(self.removed) + len(self.added)
+
+    def __nonzero__(self):
+        return bool(self.removed or self.added)
+
+    def apply(self, graph):
+        """Make the change to an rdflib Graph, return the graph"""
+
+        for triple in self.removed:
+            graph.remove(triple)
+        context = getattr(graph, 'default_context', graph)
+        graph.addN((s, p, o, context) for (s, p, o) in self.added)
+        return graph
+
+    def write_patch(self, out):
+        """Write the change to the file object out as an RDF Patch, a
+        line for each triple, with D before the triples to remove and A
+        before those to add.  Returns the number of triples written."""
+
+        for (op, triples) in (('D', self.removed), ('A', self.added)):
+            for line in sorted(ntriples_line(t) for t in triples):
+                out.write('%s %s\n' % (op, line))
+        return len(self)
+
+    def write_sparql(self, out, graph=None, chunksize=10000):
+        """Write the change to the file object out as a SPARQL Update
+        request, DELETE DATA and INSERT DATA operations of at most
+        chunksize triples each, in the named graph if given.  Blank
+        nodes are not allowed in DELETE DATA, so removed triples with
+        them are written as DELETE WHERE patterns with a variable for
+        each blank node, one for each group of triples sharing blank
+        nodes.  Nothing is written if there is no change.  Returns the
+        number of triples written."""
+
+        ground = []
+        blank = []
+        for triple in self.removed:
+            if _has_bnode(triple):
+                blank.append(triple)
+            else:
+                ground.append(triple)
+
+        operations = []
+        lines = sorted(ntriples_line(t) for t in ground)
+        for i in range(0, len(lines), chunksize):
+            operations.append(('DELETE DATA', lines[i:i + chunksize]))
+        patterns = []
+        for group in _bnode_groups(blank):
+            variables = dict()
+            patterns.append(sorted(pattern_line(t, variables) for t in group))
+        for lines in sorted(patterns):
+            operations.append(('DELETE WHERE', lines))
+        lines = sorted(ntriples_line(t) for t in self.added)
+        for i in range(0, len(lines), chunksize):
+            operations.append(('INSERT DATA', lines[i:i + chunksize]))
+
+        for (n, (op, lines)) in enumerate(operations):
+            if n > 0:
+                out.write(';\n')
+            out.write('%s {\n' % op)
+            if graph is not None:
+                out.write('GRAPH %s {\n' % ntriples_term(graph).encode('utf-8'))
+            for line in lines:
+                out.write(line)
+                out.write('\n')
+            if graph is not None:
+                out.write('}\n')
+            out.write('}\n')
+        return len(self)
+
+
+def read_patch(lines, terms=None):
+    """Read an RDF Patch written by Delta.write_patch from an iterable
+    of lines, return the Delta"""
+
+    if terms is None:
+        terms = TermCache()
+
+    delta = Delta((), ())
+    for (number, line) in enumerate(lines):
+        if not line.strip():
+            continue
+        if line.startswith('D '):
+            triples = delta.removed
+        elif line.startswith('A '):
+            triples = delta.added
+        else:
+            raise TypeError("Bad RDF Patch on line %d: %s" % (number + 1, line.strip()))
+        triples.update(read_ntriples([line[2:]], terms))
+    return delta
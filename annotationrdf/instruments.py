@@ -0,0 +1,106 @@
+"""Optional timing and counting of the stages of a conversion"""
+
+import time
+from collections import OrderedDict
+
+
+class Instruments(object):
+    """Records the wall clock and CPU seconds taken by each stage of a
+    conversion, and counts of the things made, for maus_annotations,
+    AnnotationCollection.to_rdf and the streaming writers:
+
+        instruments = Instruments()
+        collection = maus_annotations(path, corpusid, itemid, instruments=instruments)
+        collection.to_rdf(instruments=instruments)
+        instruments.stats()
+
+    The stages are parse (reading the TextGrid and making annotations),
+    link, to_rdf and serialize; the counts are tiers, intervals,
+    annotations, links and triples.  Times and counts from several calls
+    are added together.
+
+    If callback is given it is called as callback(name, value) with each
+    time or count as it is recorded, to pass them on to a metrics system.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.times = OrderedDict()
+        self.counts = OrderedDict()
+
+    def stage(self, name):
+        """Return a context manager that times the named stage"""
+
+        return Stage(self, name)
+
+    def record(self, name, wall, cpu):
+        """Add wall clock and CPU seconds to the time for a stage"""
+
+        (w, c) = self.times.get(name, (0.0, 0.0))
+        self.times[name] = (w + wall, c + cpu)
+        if self.callback is not None:
+            self.callback(name + '.wall', wall)
+            self.callback(name + '.cpu', cpu)
+
+    def count(self, name, n):
+        """Add n to the named count"""
+
+        self.counts[name] = self.counts.get(name, 0) + n
+        if self.callback is not None:
+            self.callback(name, n)
+
+    def stats(self):
+        """Return a dictionary of the times, as stage.wall and stage.cpu,
+        and the counts"""
+
+        result = OrderedDict()
+        for (name, (wall, cpu)) in self.times.items():
+            result[name + '.wall'] = wall
+            result[name + '.cpu'] = cpu
+        result.update(self.counts)
+        return result
+
+
+class Stage(object):
+    """Times one stage for Instruments.stage"""
+
+    def __init__(self, instruments, name):
+        self.instruments = instruments
+        self.name = name
+
+    def __enter__(self):
+        self.wall = time.time()
+        self.cpu = time.clock()
+        return self
+
+    def __exit__(self, *exc):
+        self.instruments.record(self.name, time.time() - self.wall, time.clock() - self.cpu)
+        return False
+
+
+class NullInstruments(object):
+    """Instruments that record nothing, used when none are given so
+    that the cost of not measuring is a method call per stage"""
+
+    def stage(self, name):
+        return NULL_STAGE
+
+    def count(self, name, n):
+        pass
+
+    def stats(self):
+        return OrderedDict()
+
+
+class NullStage(object):
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = NullStage()
+
+NO_INSTRUMENTS = NullInstruments()
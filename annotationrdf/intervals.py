@@ -0,0 +1,67 @@
+"""Interval indexing used to link annotations by containment"""
+
+from bisect import bisect_right
+
+
+class ContainmentIndex(object):
+    """An index over a set of intervals that finds all of the intervals
+    containing a given query interval, ie. those with start <= qstart
+    and end >= qend.
+
+    Intervals are sorted by start and a max-end segment tree is built
+    over them, so building the index is O(n log n) and each query is
+    O((k + 1) log n) for k results.  Endpoints are compared with the
+    ordinary Python comparison operators, so any totally ordered values
+    can be used.
+    """
+
+    def __init__(self, items, start=lambda x: x.start, end=lambda x: x.end):
+        """Build an index over items, using the start and end functions
+        to find the endpoints of each item"""
+
+        decorated = sorted(((start(item), i) for i, item in enumerate(items)))
+        self.items = [items[i] for (s, i) in decorated]
+        self.starts = [s for (s, i) in decorated]
+        self.ends = [end(item) for item in self.items]
+
+        # leaves of the tree are at n..2n-1, node i covers nodes 2i and 2i+1
+        n = len(self.items)
+        self.maxend = [None] * n + self.ends
+        for i in range(n - 1, 0, -1):
+            self.maxend[i] = max(self.maxend[2 * i], self.maxend[2 * i + 1])
+
+    def __len__(self):
+        return len(self.items)
+
+    def containing(self, start, end):
+        """Return a list of the items that contain the interval start..end"""
+
+        n = len(self.items)
+        result = []
+
+        # candidates are the items starting at or before start; collect
+        # the tree nodes that exactly cover that prefix of the sorted items
+        lo = n
+        hi = n + bisect_right(self.starts, start)
+        nodes = []
+        while lo < hi:
+            if lo & 1:
+                nodes.append(lo)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                nodes.append(hi)
+            lo >>= 1
+            hi >>= 1
+
+        # descend into every node whose subtree has an item ending late enough
+        while nodes:
+            node = nodes.pop()
+            if self.maxend[node] >= end:
+                if node >= n:
+                    result.append(self.items[node - n])
+                else:
+                    nodes.append(2 * node)
+                    nodes.append(2 * node + 1)
+
+        return result
@@ -0,0 +1,281 @@
+"""Write streams of RDF triples as JSON-LD, and read them back,
+without building an rdflib Graph
+
+Documents have a fixed @context, CONTEXT, made from the prefixes in
+namespaces.NAMESPACES and terms for the DADA vocabulary, and one node
+object per line in @graph:
+
+    {"@context": {...},
+     "@graph": [
+    {"@id": "http://.../annotation/0", "@type": "Annotation", "label": "w", ...},
+    {"@id": "http://.../annotation/0L", "@type": "SecondRegion", "startSeconds": "0.0", ...}
+    ]}
+
+so that write_jsonld can write one subject at a time and read_jsonld
+can read a line at a time.  Other JSON-LD with an inline context is
+read as a whole.
+"""
+
+import json
+from itertools import chain, islice
+
+from rdflib import URIRef, Literal, BNode
+
+from namespaces import NAMESPACES, DADA, AUSNC, RDF, XSD
+from terms import TermCache
+
+
+# DADA classes, and properties with the type their values are coerced to,
+# there is a term for each type of start and end in a locator
+TERMS = [
+    ('Annotation', DADA.Annotation, None),
+    ('AnnotationCollection', DADA.AnnotationCollection, None),
+    ('TextRegion', DADA.TextRegion, None),
+    ('SecondRegion', DADA.SecondRegion, None),
+    ('HMSRegion', DADA.HMSRegion, None),
+    ('annotates', DADA.annotates, '@id'),
+    ('partof', DADA.partof, '@id'),
+    ('targets', DADA.targets, '@id'),
+    ('type', DADA.type, '@id'),
+    ('next', DADA.next, '@id'),
+    ('hasChild', DADA.hasChild, '@id'),
+    ('label', DADA.label, None),
+    ('speakerid', AUSNC.speakerid, None),
+    ('start', DADA.start, None),
+    ('end', DADA.end, None),
+    ('startOffset', DADA.start, XSD.integer),
+    ('endOffset', DADA.end, XSD.integer),
+    ('startSeconds', DADA.start, XSD.float),
+    ('endSeconds', DADA.end, XSD.float),
+]
+
+
+def make_context(namespaces=NAMESPACES, terms=TERMS):
+    """Return a JSON-LD context with the prefixes in the dictionary
+    namespaces and the (term, IRI, type) definitions in terms"""
+
+    context = dict((prefix, unicode(ns)) for (prefix, ns) in namespaces.items())
+    for (term, iri, coercion) in terms:
+        if coercion is None:
+            context[term] = unicode(iri)
+        else:
+            context[term] = {'@id': unicode(iri), '@type': unicode(coercion)}
+    return context
+
+
+CONTEXT = make_context()
+
+# how write_jsonld starts a document, the context follows HEADER
+HEADER = '{"@context": '
+GRAPH = ' "@graph": [\n'
+
+
+class Context(object):
+    """The terms and prefixes of a JSON-LD context, for expanding keys
+    and values when reading and choosing them when writing"""
+
+    def __init__(self, context):
+        if not isinstance(context, dict):
+            raise TypeError("Only an inline JSON-LD @context can be read, not %r" % (context,))
+
+        self.prefixes = dict()
+        for (key, value) in context.items():
+            if isinstance(value, basestring):
+                self.prefixes[key] = value
+
+        # term -> (IRI, type) and (IRI, type) -> term
+        self.terms = dict()
+        self.names = dict()
+        for (key, value) in context.items():
+            if key.startswith('@'):
+                continue
+            if isinstance(value, dict):
+                (iri, coercion) = (value.get('@id', key), value.get('@type'))
+            else:
+                (iri, coercion) = (value, None)
+            iri = self.expand(iri, vocab=False)
+            if coercion is not None and coercion != '@id':
+                coercion = self.expand(coercion)
+            self.terms[key] = (iri, coercion)
+            if coercion not in (None, '@id'):
+                # to match the datatypes of literals
+                coercion = URIRef(coercion)
+            self.names.setdefault((URIRef(iri), coercion), key)
+
+        # class IRIs -> terms, for @type
+        self.classes = dict((iri, key) for ((iri, coercion), key) in self.names.items()
+                            if coercion is None)
+
+    def expand(self, text, vocab=True):
+        """Return the IRI for a term, if vocab is true, or a compact IRI"""
+
+        if vocab and text in self.terms:
+            return self.terms[text][0]
+        if ':' in text:
+            (prefix, suffix) = text.split(':', 1)
+            if prefix in self.prefixes and not suffix.startswith('//'):
+                return self.prefixes[prefix] + suffix
+        return text
+
+    def key(self, predicate, obj):
+        """Return the key and JSON value for a triple in a node object"""
+
+        if isinstance(obj, Literal):
+            if obj.language:
+                return (self.names.get((predicate, None), predicate),
+                        {'@value': obj, '@language': obj.language})
+            term = self.names.get((predicate, obj.datatype))
+            if term is not None:
+                return (term, obj)
+            term = self.names.get((predicate, None), predicate)
+            if obj.datatype is None:
+                return (term, obj)
+            return (term, {'@value': obj, '@type': obj.datatype})
+
+        iri = node_id(obj)
+        term = self.names.get((predicate, '@id'))
+        if term is not None:
+            return (term, iri)
+        return (self.names.get((predicate, None), predicate), {'@id': iri})
+
+
+def node_id(term):
+    if isinstance(term, BNode):
+        return u'_:%s' % term
+    return term
+
+
+def write_jsonld(triples, out, context=CONTEXT):
+    """Write triples to the file object out as a JSON-LD document
+    with the given context, one node object for each run of triples
+    about the same subject, return the number of triples written"""
+
+    names = Context(context)
+    rdf_type = RDF.type
+    dumps = json.JSONEncoder(ensure_ascii=True, sort_keys=True).encode
+
+    out.write('%s%s,\n%s' % (HEADER, dumps(context), GRAPH))
+
+    count = 0
+    subject = None
+    node = None
+    for (s, p, o) in triples:
+        if s is not subject and s != subject:
+            if node is not None:
+                out.write(dumps(node))
+                out.write(',\n')
+            subject = s
+            node = {'@id': node_id(s)}
+
+        if p == rdf_type:
+            (key, value) = ('@type', names.classes.get(o, o))
+        else:
+            (key, value) = names.key(p, o)
+
+        if key not in node:
+            node[key] = value
+        elif isinstance(node[key], list):
+            node[key].append(value)
+        else:
+            node[key] = [node[key], value]
+        count += 1
+
+    if node is not None:
+        out.write(dumps(node))
+    out.write('\n]}\n')
+    return count
+
+
+def read_jsonld(lines, terms=None):
+    """Generate the triples in a JSON-LD document from an iterable of
+    lines, such as an open file.  Documents written by write_jsonld are
+    read a node at a time, any others are read whole.  Repeated terms
+    are shared through terms, a TermCache, which is made for this run
+    if not given."""
+
+    if terms is None:
+        terms = TermCache()
+
+    # the first two lines of a document from write_jsonld
+    lines = iter(lines)
+    header = list(islice(lines, 2))
+    if len(header) < 2 or not header[0].startswith(HEADER) or header[1].strip() != GRAPH.strip():
+        # not one node per line, read the whole document
+        document = json.loads(''.join(chain(header, lines)))
+        if not isinstance(document, dict):
+            raise TypeError("Expected a JSON-LD document with an inline @context")
+        context = Context(document.get('@context'))
+        for node in document.get('@graph', [document]):
+            for triple in node_triples(node, context, terms):
+                yield triple
+        return
+
+    context = Context(json.loads(''.join(header) + ']}')['@context'])
+    for (number, line) in enumerate(lines, len(header) + 1):
+        line = line.strip().rstrip(',')
+        if line == ']}':
+            break
+        elif not line:
+            continue
+        try:
+            node = json.loads(line)
+        except ValueError:
+            raise TypeError("Bad JSON-LD node on line %d" % number)
+        for triple in node_triples(node, context, terms):
+            yield triple
+
+
+def node_triples(node, context, terms, subject=None):
+    """Generate the triples for a JSON-LD node object, those for
+    nested node objects follow"""
+
+    if subject is None:
+        subject = node_term(node.get('@id'), context, terms)
+
+    for (key, values) in node.iteritems():
+        if key == '@id' or key == '@context':
+            continue
+        if not isinstance(values, list):
+            values = [values]
+
+        if key == '@type':
+            for value in values:
+                yield (subject, RDF.type, terms.uri(context.expand(value)))
+            continue
+
+        (iri, coercion) = context.terms.get(key, (None, None))
+        predicate = terms.uri(iri or context.expand(key))
+
+        for value in values:
+            if value is None:
+                continue
+            if isinstance(value, dict):
+                if '@value' in value:
+                    if '@language' in value:
+                        obj = Literal(value['@value'], lang=value['@language'])
+                    elif '@type' in value:
+                        obj = terms.literal(unicode(value['@value']), terms.uri(context.expand(value['@type'])))
+                    else:
+                        obj = terms.literal(value['@value'])
+                    yield (subject, predicate, obj)
+                else:
+                    obj = node_term(value.get('@id'), context, terms)
+                    yield (subject, predicate, obj)
+                    for triple in node_triples(value, context, terms, obj):
+                        yield triple
+            elif coercion == '@id':
+                yield (subject, predicate, node_term(value, context, terms))
+            elif isinstance(value, basestring) and coercion is not None:
+                yield (subject, predicate, terms.literal(value, terms.uri(coercion)))
+            else:
+                yield (subject, predicate, terms.literal(value))
+
+
+def node_term(iri, context, terms):
+    """The URIRef or BNode for the @id of a node object"""
+
+    if iri is None:
+        return BNode()
+    if iri.startswith('_:'):
+        return BNode(iri[2:])
+    return terms.uri(context.expand(iri, vocab=False))
@@ -2,42 +2,91 @@ from rdflib import Namespace, Graph, Literal, XSD, URIRef
 
 from annotation import AnnotationCollection, SecondAnnotation
 from namespaces import MAUS
+from instruments import NO_INSTRUMENTS
 
-from textgrid import TextGrid
+from textgrid import textgrid_reader
 
 
-def maus_annotations(tgfile, corpusid, itemid):
+# the collection id used with stable_ids, there is one MAUS collection per item
+STABLE_ID = 'maus'
+
+
+def maus_annotations(tgfile, corpusid, itemid, collection_class=AnnotationCollection, link=True,
+                     instruments=None, stable_ids=False):
     """Read annotations from a MAUS generated TextGrid file and generate a collection
-    of annotation objects"""
+    of annotation objects from its ORT, KAN and MAU tiers, collection_class can be ColumnarAnnotationCollection
+    to store large collections compactly.  If link is False the words are not
+    linked to their canonical and phonetic children.  The time taken by each
+    stage and counts of what was read are recorded in instruments if given.
+
+    If stable_ids is true the collection id is STABLE_ID and annotations
+    are numbered along their tier, eg. MAU12, rather than given random and
+    global ids, so converting the item again gives the same URIs and two
+    versions can be compared with delta.diff."""
     
-    collection = AnnotationCollection([], corpusid, itemid, SecondAnnotation)
+    if instruments is None:
+        instruments = NO_INSTRUMENTS
+
+    collection = collection_class([], corpusid, itemid, SecondAnnotation,
+                                  id=STABLE_ID if stable_ids else None)
     
     tiers = {'MAU': MAUS.phonetic,
              'ORT': MAUS.orthographic,
              'KAN': MAUS.canonical,
              }
              
-    tg = TextGrid.load(tgfile)
-        
-    for i, tier in enumerate(tg):
-        # generate annotations for this tier
-        
-        last = None
-        for row in tier.simple_transcript:
-            (start, end, label) = row
-            if label == "":
-                label = "#"
-                
-            ann = collection.add_annotation(tiers[tier.tier_name()], label, start, end)
-            if last != None:
-                last.set_next(ann)
-            last = ann
-
-    collection.link_children(tiers['ORT'], tiers['KAN'])
-    collection.link_children(tiers['ORT'], tiers['MAU'])    
+    # generate annotations as the rows are read, chaining each
+    # to the last one seen on the same tier
+    last = dict()
+    numbers = dict()
+    intervals = 0
+    with instruments.stage('parse'):
+        with open(tgfile, 'rb') as read_file:
+            reader = textgrid_reader(read_file)
+            for tier, row in reader:
+                tipe = tiers.get(tier.tier_name())
+                if tipe is None:
+                    # not a MAUS tier
+                    continue
+                (start, end, label) = row
+                if label == "":
+                    label = "#"
+
+                if stable_ids:
+                    # numbered by name so that tiers with the same name
+                    # don't give the same ids
+                    name = tier.tier_name()
+                    number = numbers.get(name, 0)
+                    numbers[name] = number + 1
+                    id = '%s%d' % (name, number)
+                else:
+                    id = None
+
+                # times are numbers from here on so that they compare properly
+                ann = collection.add_annotation(tipe, label, float(start), float(end), id=id)
+                if tier in last:
+                    last[tier].set_next(ann)
+                last[tier] = ann
+                intervals += 1
+    instruments.count('tiers', len(reader.tiers))
+    instruments.count('intervals', intervals)
+    instruments.count('annotations', len(collection.annotations))
+
+    if link:
+        with instruments.stage('link'):
+            links = link_maus_tiers(collection)
+        instruments.count('links', links)
 
     return collection
 
+
+def link_maus_tiers(collection):
+    """Link each word in a MAUS collection to the canonical and
+    phonetic annotations that it contains, return the number of links"""
+
+    return (collection.link_children(MAUS.orthographic, MAUS.canonical) +
+            collection.link_children(MAUS.orthographic, MAUS.phonetic))
+
     
 if __name__=='__main__':
     
@@ -50,7 +99,5 @@ if __name__=='__main__':
     
     collection = maus_annotations(tf, corpusid, itemid)
 
-    graph = collection.to_rdf()
-    
-    print graph.serialize(format='turtle')
+    collection.write_turtle(sys.stdout)
     
\ No newline at end of file
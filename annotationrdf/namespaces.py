@@ -1,3 +1,5 @@
+import weakref
+
 from rdflib import Namespace
 
 #from hcsvlab_robochef import configmanager
@@ -57,24 +59,53 @@ namespaces = [n for n in sys.modules[__name__].__dict__.keys() if n.isupper() an
 for ns in namespaces:
     NAMESPACES[ns.lower()] = eval(ns)
 
-def bind_graph(graph):
+class NamespaceTemplate(object):
+    """A fixed set of prefix bindings that is built once and then bound
+    to any number of graphs.  Bindings belong to a graph's store, so
+    they are only made the first time the template is bound to each
+    store and binding it again is a single lookup."""
+
+    def __init__(self, namespaces):
+        self.bindings = tuple(sorted(namespaces.items()))
+        self.stores = weakref.WeakKeyDictionary()
+
+    def __iter__(self):
+        return iter(self.bindings)
+
+    def bind(self, graph):
+        """Bind these prefixes to graph, return the graph"""
+
+        if graph.store not in self.stores:
+            for (prefix, ns) in self.bindings:
+                graph.bind(prefix, ns)
+            self.stores[graph.store] = True
+        return graph
 
-    for ns in NAMESPACES.keys():
-        graph.bind(ns, NAMESPACES[ns])
+
+TEMPLATE = NamespaceTemplate(NAMESPACES)
+
+
+def bind_graph(graph, namespaces=None):
+    """Bind the standard prefixes in NAMESPACES to the graph, along
+    with any extra ones in the dictionary namespaces"""
+
+    TEMPLATE.bind(graph)
+    if namespaces:
+        for prefix in namespaces:
+            graph.bind(prefix, namespaces[prefix])
 
     return graph
 
 
-def corpus_property_namespace(corpusID):
+def corpus_property_namespace(corpusID, graph=None):
     """Return a namespace object suitable for use
     in generating new property names for this corpus
-    also adds this to the global NAMESPACES list that is bound
-    to the graph for output"""
-
-    global NAMESPACES
+    if a graph is given the namespace is also bound to it
+    for output"""
 
     ns = Namespace(SCHEMA[corpusID.lower()+"/"])
-    NAMESPACES[corpusID.lower()] = ns
+    if graph is not None:
+        graph.bind(corpusID.lower(), ns)
     return ns
 
 
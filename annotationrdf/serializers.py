@@ -0,0 +1,209 @@
+"""Write streams of RDF triples directly to a file, and read them
+back, without building an rdflib Graph"""
+
+import re
+
+from rdflib import URIRef, Literal, BNode
+
+from namespaces import TEMPLATE
+from terms import TermCache
+
+
+# local names we can safely write as prefix:name in Turtle
+LOCALNAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_\-]*$')
+
+NONASCII = re.compile(u'[^\x00-\x7f]')
+
+
+def escape_nonascii(match):
+    code = ord(match.group(0))
+    if code > 0xFFFF:
+        return u'\\U%08X' % code
+    return u'\\u%04X' % code
+
+
+def quote_literal(text):
+    """Return text as a quoted N-Triples/Turtle string"""
+
+    text = text.replace('\\', '\\\\').replace('"', '\\"')
+    text = text.replace('\n', '\\n').replace('\r', '\\r')
+    return u'"' + text + u'"'
+
+
+def literal_term(literal):
+    """Return the N-Triples form of a Literal"""
+
+    # terms are formatted into plain strings, adding to a URIRef would
+    # make (and validate) a new URIRef
+    result = quote_literal(unicode(literal))
+    if literal.language:
+        result = u'%s@%s' % (result, literal.language)
+    elif literal.datatype:
+        result = u'%s^^<%s>' % (result, literal.datatype)
+    return result
+
+
+def ntriples_term(term):
+    """Return the N-Triples form of an RDF term"""
+
+    if isinstance(term, Literal):
+        return literal_term(term)
+    elif isinstance(term, URIRef):
+        return u'<%s>' % term
+    else:
+        return u'_:%s' % term
+
+
+def write_ntriples(triples, out):
+    """Write the triples to the file object out in N-Triples format,
+    which is ASCII with escapes for any other characters.  Returns
+    the number of triples written."""
+
+    count = 0
+    for (s, p, o) in triples:
+        line = u'%s %s %s .\n' % (ntriples_term(s), ntriples_term(p), ntriples_term(o))
+        out.write(NONASCII.sub(escape_nonascii, line).encode('ascii'))
+        count += 1
+    return count
+
+
+class TurtleWriter(object):
+    """Writes triples to a file as Turtle, abbreviating URIs with the
+    namespace prefixes and grouping runs of triples with the same subject"""
+
+    def __init__(self, out, namespaces=TEMPLATE):
+
+        self.out = out
+        # longest namespaces first so we find the most specific prefix
+        self.prefixes = sorted(namespaces, key=lambda item: -len(item[1]))
+        self.subject = None
+
+    def write_prefixes(self):
+        for (prefix, ns) in sorted(self.prefixes):
+            self.write(u'@prefix %s: <%s> .\n' % (prefix, ns))
+        self.write(u'\n')
+
+    def write(self, text):
+        self.out.write(text.encode('utf-8'))
+
+    def term(self, term):
+        """Return the Turtle form of an RDF term"""
+
+        if isinstance(term, URIRef):
+            for (prefix, ns) in self.prefixes:
+                if term.startswith(ns):
+                    local = term[len(ns):]
+                    if LOCALNAME.match(local):
+                        return u'%s:%s' % (prefix, local)
+                    break
+        return ntriples_term(term)
+
+    def triple(self, triple):
+        (s, p, o) = triple
+        if s == self.subject:
+            self.write(u' ;\n    %s %s' % (self.term(p), self.term(o)))
+        else:
+            if self.subject is not None:
+                self.write(u' .\n\n')
+            self.subject = s
+            self.write(u'%s %s %s' % (self.term(s), self.term(p), self.term(o)))
+
+    def close(self):
+        if self.subject is not None:
+            self.write(u' .\n')
+        self.subject = None
+
+
+def write_turtle(triples, out, namespaces=TEMPLATE):
+    """Write the triples to the file object out in Turtle format,
+    namespaces is a NamespaceTemplate or a list of (prefix, namespace)
+    pairs to use.  Returns the number of triples written."""
+
+    writer = TurtleWriter(out, namespaces)
+    writer.write_prefixes()
+    count = 0
+    for triple in triples:
+        writer.triple(triple)
+        count += 1
+    writer.close()
+    return count
+
+
+# a line of N-Triples: subject, predicate and an object that is a URI,
+# a blank node or a literal with an optional datatype or language
+NTRIPLE = re.compile(r'\s*(?:<([^>]*)>|_:(\S+))\s*<([^>]*)>\s*'
+                     r'(?:<([^>]*)>|_:(\S+)|"((?:[^"\\]|\\.)*)"(?:\^\^<([^>]*)>|@([A-Za-z0-9\-]+))?)'
+                     r'\s*\.\s*$')
+
+ESCAPE = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))')
+
+ESCAPES = {'t': u'\t', 'b': u'\b', 'n': u'\n', 'r': u'\r', 'f': u'\f',
+           '"': u'"', "'": u"'", '\\': u'\\'}
+
+
+def unescape(match):
+    (short, long, char) = match.groups()
+    if short:
+        return unichr(int(short, 16))
+    elif long:
+        # decoded rather than unichr so that narrow builds get a surrogate pair
+        return ('\\U' + long).decode('unicode_escape')
+    try:
+        return ESCAPES[char]
+    except KeyError:
+        raise TypeError("Bad escape '\\%s' in N-Triples" % char)
+
+
+def read_ntriples(lines, terms=None):
+    """Generate the triples in an iterable of lines of N-Triples, such as
+    an open file, one line at a time.  Repeated objects are shared
+    through terms, a TermCache, which is made for this run if not given;
+    predicates and datatypes, of which there are few, are kept for the
+    whole run and a subject is reused while it is repeated on
+    consecutive lines, as write_ntriples writes them."""
+
+    if terms is None:
+        terms = TermCache()
+
+    # predicate and datatype URIs
+    vocabulary = dict()
+    (last, subject) = (None, None)
+
+    for (number, line) in enumerate(lines):
+        line = line.decode('utf-8')
+        stripped = line.strip()
+        if not stripped or stripped.startswith(u'#'):
+            continue
+        m = NTRIPLE.match(line)
+        if m is None:
+            raise TypeError("Bad N-Triples on line %d: %s" % (number + 1, stripped))
+        (s, sblank, p, o, oblank, text, datatype, language) = m.groups()
+
+        if '\\' in line:
+            (s, p, o, text) = [t if t is None else ESCAPE.sub(unescape, t) for t in (s, p, o, text)]
+
+        if text is not None:
+            if language:
+                obj = Literal(text, lang=language)
+            elif datatype:
+                if datatype not in vocabulary:
+                    vocabulary[datatype] = URIRef(datatype)
+                obj = terms.literal(text, vocabulary[datatype])
+            else:
+                obj = terms.literal(text)
+        elif o is not None:
+            obj = terms.uri(o)
+        else:
+            obj = BNode(oblank)
+
+        if p not in vocabulary:
+            vocabulary[p] = URIRef(p)
+
+        if s is None:
+            subject = BNode(sblank)
+            last = None
+        elif s != last:
+            subject = URIRef(s)
+            last = s
+
+        yield (subject, vocabulary[p], obj)
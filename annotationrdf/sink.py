@@ -0,0 +1,236 @@
+"""Send annotation collections to a triple store over HTTP, many
+collections to a request
+
+    with StoreSink('http://localhost:3030/ds/update') as sink:
+        for path in paths:
+            sink.add(maus_annotations(path, corpusid, item(path)))
+
+Triples are sent as SPARQL 1.1 Update INSERT DATA requests or, with
+protocol='graph', posted as N-Triples to a SPARQL 1.1 Graph Store
+Protocol endpoint.  A request is sent whenever the triples waiting
+reach max_triples or max_bytes of N-Triples.  Requests are made by
+concurrency threads, each keeping one HTTP/1.1 connection open for all
+of its requests, and failed requests are retried with exponential
+backoff.
+"""
+
+import httplib
+import random
+import socket
+import threading
+import time
+import urllib
+from cStringIO import StringIO
+from itertools import islice
+from Queue import Queue
+from urlparse import urlsplit
+
+from serializers import write_ntriples, ntriples_term
+
+
+# statuses worth trying again, the server is busy or failed
+RETRY_STATUS = frozenset([408, 429, 500, 502, 503, 504])
+
+CONTENT_TYPES = {'update': 'application/sparql-update',
+                 'graph': 'application/n-triples'}
+
+
+class SinkError(Exception):
+    """A request to the store failed and could not be retried"""
+
+
+class StoreSink(object):
+    """Batches the triples of collections into requests to a SPARQL
+    Update or Graph Store Protocol endpoint.
+
+    graph is the URI of a named graph to add to, the default graph is
+    used if it is None.  headers are added to each request, eg. for
+    authorisation.  A request that fails with a connection error or a
+    status in RETRY_STATUS is tried again up to retries times, waiting
+    backoff seconds doubled for each attempt, or as long as the server's
+    Retry-After header asks.  Any other failure is kept and raised as a
+    SinkError by flush or close.
+    """
+
+    def __init__(self, endpoint, protocol='update', graph=None, max_triples=50000,
+                 max_bytes=8 << 20, concurrency=4, retries=5, backoff=0.5,
+                 timeout=60, headers=None):
+        if protocol not in CONTENT_TYPES:
+            raise TypeError("Unknown protocol '%s', expected update or graph" % protocol)
+
+        url = urlsplit(endpoint)
+        if url.scheme not in ('http', 'https'):
+            raise TypeError("Expected an http or https endpoint, not %s" % endpoint)
+        self.scheme = url.scheme
+        self.netloc = url.netloc
+        self.path = url.path or '/'
+        if protocol == 'graph':
+            # the Graph Store Protocol names the graph in the query string
+            if graph is None:
+                target = 'default'
+            else:
+                target = 'graph=' + urllib.quote(graph.encode('utf-8'), safe='')
+            self.path = '%s?%s' % (self.path, '&'.join(filter(None, [url.query, target])))
+        elif url.query:
+            self.path = '%s?%s' % (self.path, url.query)
+
+        self.protocol = protocol
+        self.graph = graph
+        self.max_triples = max_triples
+        self.max_bytes = max_bytes
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.headers = {'Content-Type': CONTENT_TYPES[protocol]}
+        self.headers.update(headers or {})
+
+        self.batch = StringIO()
+        self.count = 0
+        self.errors = []
+        self.counts = {'requests': 0, 'retries': 0, 'triples': 0, 'bytes': 0}
+        self.lock = threading.Lock()
+
+        # a short queue so that batches aren't made much faster than
+        # they can be sent
+        self.queue = Queue(concurrency)
+        self.workers = [threading.Thread(target=self._work) for i in range(concurrency)]
+        for worker in self.workers:
+            worker.daemon = True
+            worker.start()
+
+    def add(self, collection):
+        """Add the triples of a collection"""
+
+        self.add_triples(collection.triples())
+
+    def add_triples(self, triples):
+        """Add triples, sending requests as the batch fills"""
+
+        triples = iter(triples)
+        while True:
+            # a little at a time so that max_bytes is not overshot by much
+            room = min(self.max_triples - self.count, 1000)
+            written = write_ntriples(islice(triples, room), self.batch)
+            if written == 0:
+                break
+            self.count += written
+            if self.count >= self.max_triples or self.batch.tell() >= self.max_bytes:
+                self._send_batch()
+
+    def flush(self):
+        """Send any triples waiting and wait until all requests have
+        finished, raise a SinkError if any failed"""
+
+        self._send_batch()
+        self.queue.join()
+        if self.errors:
+            errors = self.errors
+            self.errors = []
+            raise SinkError("%d of the requests failed, the first with: %s" % (len(errors), errors[0]))
+
+    def close(self):
+        """Flush and stop the threads that send requests"""
+
+        if not self.workers:
+            return
+        try:
+            self.flush()
+        finally:
+            for worker in self.workers:
+                self.queue.put(None)
+            for worker in self.workers:
+                worker.join()
+            self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def stats(self):
+        """Return a dictionary of the requests, retries, triples and
+        bytes sent"""
+
+        with self.lock:
+            return dict(self.counts)
+
+    def _send_batch(self):
+        if self.count == 0:
+            return
+        lines = self.batch.getvalue()
+        if self.protocol == 'update':
+            if self.graph is None:
+                body = 'INSERT DATA {\n%s}\n' % lines
+            else:
+                body = 'INSERT DATA {\nGRAPH %s {\n%s}\n}\n' % (ntriples_term(self.graph).encode('utf-8'), lines)
+        else:
+            body = lines
+        self.queue.put((body, self.count))
+        self.batch = StringIO()
+        self.count = 0
+
+    def _connect(self):
+        if self.scheme == 'https':
+            return httplib.HTTPSConnection(self.netloc, timeout=self.timeout)
+        return httplib.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    def _work(self):
+        """Send requests from the queue over one kept-alive connection"""
+
+        connection = self._connect()
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    connection.close()
+                    return
+                (body, count) = item
+                try:
+                    self._post(connection, body)
+                except Exception as e:
+                    with self.lock:
+                        self.errors.append(e)
+                else:
+                    with self.lock:
+                        self.counts['requests'] += 1
+                        self.counts['triples'] += count
+                        self.counts['bytes'] += len(body)
+            finally:
+                self.queue.task_done()
+
+    def _post(self, connection, body):
+        """Post body, trying again after failures that may not last"""
+
+        attempt = 0
+        while True:
+            wait = None
+            try:
+                connection.request('POST', self.path, body, self.headers)
+                response = connection.getresponse()
+                # read the whole response so the connection can be reused
+                content = response.read()
+            except (socket.error, httplib.HTTPException) as e:
+                # a dropped connection is opened again by the next request
+                connection.close()
+                error = "%s: %s" % (e.__class__.__name__, e)
+            else:
+                if 200 <= response.status < 300:
+                    return
+                error = "HTTP %d %s: %s" % (response.status, response.reason, content[:200])
+                if response.status not in RETRY_STATUS:
+                    raise SinkError(error)
+                retry_after = response.getheader('Retry-After')
+                if retry_after and retry_after.isdigit():
+                    wait = int(retry_after)
+
+            if attempt >= self.retries:
+                raise SinkError("%s, after %d retries" % (error, attempt))
+            if wait is None:
+                # with some jitter so that threads don't retry together
+                wait = self.backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+            time.sleep(wait)
+            attempt += 1
+            with self.lock:
+                self.counts['retries'] += 1
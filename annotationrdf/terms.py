@@ -0,0 +1,71 @@
+"""Interning of the RDF terms made while serialising a collection"""
+
+from rdflib import Literal, URIRef
+
+
+class TermCache(object):
+    """A bounded cache of Literal and URIRef terms, used for one
+    serialisation run so that repeated labels, times and property
+    URIs are made once and shared rather than made for every triple.
+
+    The cache is a plain dictionary that is cleared when it holds size
+    terms; the terms that repeat in a collection come back quickly and
+    this is cheaper than keeping the cache in least recently used order.
+    Counts of hits and misses are kept.
+    """
+
+    def __init__(self, size=4096):
+        self.size = size
+        self.terms = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _intern(self, key, make, *args):
+        terms = self.terms
+        term = terms.get(key)
+        if term is None:
+            self.misses += 1
+            if len(terms) >= self.size:
+                terms.clear()
+            term = terms[key] = make(*args)
+        else:
+            self.hits += 1
+        return term
+
+    def literal(self, value, datatype=None):
+        """Return a Literal for value, with an optional datatype"""
+
+        # the type is part of the key so that eg. 1 and 1.0 are kept apart
+        return self._intern((type(value), value, datatype), Literal, value, None, datatype)
+
+    def uri(self, text):
+        """Return a URIRef for text"""
+
+        return self._intern((URIRef, text), URIRef, text)
+
+    def stats(self):
+        """Return a dictionary of statistics about the cache"""
+
+        lookups = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+                'size': len(self.terms),
+                }
+
+
+class NullTerms(object):
+    """A stand in for TermCache that makes a new term every time, for
+    when sharing terms is not wanted"""
+
+    def literal(self, value, datatype=None):
+        return Literal(value, None, datatype)
+
+    def uri(self, text):
+        return URIRef(text)
+
+    def stats(self):
+        return {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'size': 0}
+
+
+NO_TERMS = NullTerms()
@@ -15,7 +15,7 @@ Module contents
 
 The textgrid corpus reader provides 4 data items and 1 function
 for each textgrid file.  For each tier in the file, the reader
-provides 10 data items and 2 functions.
+provides 8 data items and 2 functions.
 
 For the full textgrid file:
 
@@ -36,6 +36,10 @@ For the full textgrid file:
                 - ooTextFile:  Organized by tier.
                 - ChronTextFile:  Organized by time.
                 - OldooTextFile:  Similar to ooTextFile.
+                - ooBinaryFile:  Praat's binary format, organized by tier.
+
+    - write(out, text_type)
+        Write the TextGrid to a file object in any of the text formats.
 
     - to_chron()
         Convert given file to a ChronTextFile format.
@@ -43,6 +47,14 @@ For the full textgrid file:
     - to_oo()
         Convert given file to an ooTextFile format.
 
+A TextGridReader reads the text formats one line at a time and yields
+(tier, row) pairs as they are read, for files too large to hold in memory.
+A BinaryTextGridReader does the same for the binary format, and
+textgrid_reader() picks the right one for a file.  A TextGrid can be
+read lazily, parsing the rows of each tier only when they are used, and
+a MappedTextGrid does so through a memory map of the file.  Either can
+be limited to named tiers.
+
 For each tier:
 
     - text_type
@@ -65,51 +77,404 @@ For each tier:
     - size
         Number of entries in the tier.
 
-    - transcript
-        The raw transcript for the tier.
-
     - simple_transcript
         The transcript formatted as a list of tuples: (time1, time2, utterance).
 
-    - tier_info
-        List of (classid, nameid, xmin, xmax, size, transcript).
-
     - min_max()
         A tuple of (xmin, xmax).
 
+    - columns()
+        The transcript as a tuple (starts, ends, labels), with the times
+        in float64 arrays, NumPy arrays if NumPy is installed.
+
     - time(non_speech_marker)
         Returns the utterance time of a given tier.
         Excludes entries that begin with a non-speech marker.
 
+    - stats(non_speech_marker, percentiles)
+        Counts, total, mean and percentile durations, the speech ratio
+        and label frequencies of the tier; TextGrid.stats() gives them
+        for every tier.
+
 """
 
 # needs more cleanup, subclassing, epydoc docstrings
 
+import copy
+import heapq
+import mmap
 import sys
 import re
+import struct
+import math
+import warnings
+from array import array
+from collections import Counter
+from itertools import chain, islice, izip
+from cStringIO import StringIO
+
+try:
+        import numpy
+except ImportError:
+        numpy = None
 
 TEXTTIER = "TextTier"
 INTERVALTIER = "IntervalTier"
 
-OOTEXTFILE = re.compile(r"""(?x)
-                        xmin\ =\ (.*)[\r\n]+
-                        xmax\ =\ (.*)[\r\n]+
-                        [\s\S]+?size\ =\ (.*)[\r\n]+
-""")
+# A token in a Praat text file: a complete string, the opening quote of a
+# string that runs onto the next line, a comment or any other word
+TOKEN = re.compile(r'"([^"]*(?:""[^"]*)*)"(?!")|(")|!.*|([^\s"!]+)')
+
+# The start of a file in Praat's binary format
+BINARY_MAGIC = "ooBinaryFile"
+
+# Words starting with one of these are numbers or flags such as <exists>,
+# other words are labels like "xmin =" or "intervals [1]:" in the long format
+DATA_START = "0123456789-+.<"
+
+
+def tokens(lines):
+        """
+        Generates the data in a Praat text file from an iterable of lines.
+        Numbers and flags are yielded as they appear and strings without
+        their quotes.  Labels and comments are skipped, so the long, short
+        and chronological formats all produce a plain stream of values.
+        Only the current line, or a string spanning several lines, is held
+        in memory.
+        """
+
+        lines = iter(lines)
+        for line in lines:
+                # fast paths for the lines most files are made of, which
+                # give the same tokens as TOKEN: words only, as in
+                # 'xmin = 0.5 ' or '1 0.5 0.7', or words then one string
+                # without doubled quotes, as in 'text = "a" ' or '"a"'
+                if '"' not in line:
+                        if "!" not in line:
+                                for word in line.split():
+                                        if word[0] in DATA_START:
+                                                yield word
+                                continue
+                else:
+                        value = line.rstrip()
+                        start = value.find('"')
+                        if value[-1] == '"' and value.count('"') == 2 and "!" not in value[:start]:
+                                for word in value[:start].split():
+                                        if word[0] in DATA_START:
+                                                yield word
+                                yield value[start + 1:-1]
+                                continue
+
+                pos = 0
+                while True:
+                        m = TOKEN.search(line, pos)
+                        if m is None:
+                                break
+                        pos = m.end()
+                        (text, opened, word) = m.groups()
+                        if text is not None:
+                                yield text.replace('""', '"')
+                        elif opened:
+                                # join the next line and try again
+                                try:
+                                        line = line[m.start():] + lines.next()
+                                except StopIteration:
+                                        raise TypeError("Unterminated string in TextGrid file")
+                                pos = 0
+                        elif word and word[0] in DATA_START:
+                                yield word
+
+
+def _check_type(head):
+        """
+        Figures out the TextGrid format from the first lines of the file.
+        """
+
+        try:
+                type_id = head[0].strip()
+        except IndexError:
+                raise TypeError("Cannot read file -- try TextGrid.load()")
+        if type_id == "File type = \"ooTextFile\"":
+                if len(head) < 4 or "xmin" not in head[3]:
+                        text_type = "OldooTextFile"
+                else:
+                        text_type = "ooTextFile"
+        elif type_id == "\"Praat chronological TextGrid text file\"":
+                text_type = "ChronTextFile"
+        else:
+                raise TypeError("Unknown format '(%s)'" % type_id)
+        return text_type
+
+
+#################################################################
+# TextGridReader Class
+#################################################################
+
+class TextGridReader(object):
+        """
+        Reads a TextGrid file in any of the text formats in a single pass
+        over its lines.  The file header is read when the reader is created,
+        then iterating over the reader yields a (tier, row) pair for each
+        interval or point as it is read, where row is a tuple as found in
+        Tier.simple_transcript.  Tier objects are appended to tiers as their
+        headers are read but rows are not stored in them, so memory use does
+        not grow with the size of the file.
+        """
+
+        def __init__(self, read_file):
+                """
+                @type read_file: An open TextGrid file, mode "r", or any
+                iterable of lines.
+                @param size:  Number of tiers.
+                @param xmin: xmin.
+                @param xmax: xmax.
+                @param t_time:  Total time of TextGrid file.
+                @param text_type:  TextGrid format.
+                @type tiers:  A list of the tier objects read so far.
+                """
+
+                lines = iter(read_file)
+                head = list(islice(lines, 4))
+                self.text_type = _check_type(head)
+                self._tokens = tokens(chain(head, lines))
+                self.tiers = []
+                self._read_header()
+
+        def _read_header(self):
+                if self.text_type == "ChronTextFile":
+                        self._next()
+                        self.xmin = float(self._next())
+                        self.xmax = float(self._next())
+                        self.size = int(self._next())
+                else:
+                        # file type and object class
+                        self._next()
+                        self._next()
+                        self.xmin = float(self._next())
+                        self.xmax = float(self._next())
+                        if self._next() == "<exists>":
+                                self.size = int(self._next())
+                        else:
+                                self.size = 0
+                self.t_time = self.xmax - self.xmin
+
+        def __iter__(self):
+                if self.text_type == "ChronTextFile":
+                        return self._chron_rows()
+                return self._oo_rows()
+
+        def _next(self):
+                try:
+                        return self._tokens.next()
+                except StopIteration:
+                        raise TypeError("Unexpected end of TextGrid file")
+
+        def _read_tier(self):
+                """
+                Reads a tier header and adds a new Tier to tiers.
+                """
+
+                classid = self._next()
+                nameid = self._next()
+                xmin = float(self._next())
+                xmax = float(self._next())
+                # No size values are given in the Chronological Text File format.
+                if self.text_type == "ChronTextFile":
+                        size = None
+                else:
+                        size = int(self._next())
+                tier = self._make_tier(classid, nameid, xmin, xmax, size)
+                self.tiers.append(tier)
+                return tier
+
+        def _make_tier(self, classid, nameid, xmin, xmax, size):
+                return Tier(classid, nameid, xmin, xmax, size, self.text_type, self.t_time)
+
+        def _read_row(self, tier):
+                """
+                @return:  The next (time mark) or (start_time end_time label) row.
+                """
+
+                if tier.classid == TEXTTIER:
+                        return (self._next(), self._next())
+                return (self._next(), self._next(), self._next())
+
+        def _oo_rows(self):
+                """
+                Tiers follow each other, each header gives the number of rows.
+                """
+
+                for i in range(self.size):
+                        tier = self._read_tier()
+                        for j in range(tier.size):
+                                yield (tier, self._read_row(tier))
+
+        def _chron_rows(self):
+                """
+                All tier headers come first, then rows in time order, each
+                starting with the number of its tier.  Rows are handed to
+                their tier by that number in a single pass over the file.
+                """
+
+                for i in range(self.size):
+                        self._read_tier()
+                for idx in self._tokens:
+                        try:
+                                i = int(idx) - 1
+                        except ValueError:
+                                i = -1
+                        if not 0 <= i < self.size:
+                                raise TypeError("Bad tier number '%s' in TextGrid file" % idx)
+                        tier = self.tiers[i]
+                        yield (tier, self._read_row(tier))
+
+
+#################################################################
+# BinaryTextGridReader Class
+#################################################################
+
+_BYTE = struct.Struct(">B")
+_SHORT = struct.Struct(">H")
+_INT = struct.Struct(">i")
+_DOUBLE = struct.Struct(">d")
+_DOUBLES = struct.Struct(">dd")
+
+
+class BinaryTextGridReader(object):
+        """
+        Reads a TextGrid in Praat's binary format, where numbers are big
+        endian doubles and integers and strings are length prefixed, so
+        no text has to be scanned.  It has the same attributes as a
+        TextGridReader and iterating over it yields the same (tier, row)
+        pairs, with times given as the repr of each double and non-ASCII
+        labels encoded as UTF-8, as they would be read from a text file.
+        """
+
+        def __init__(self, data):
+                """
+                @type data: The contents of a binary TextGrid file, a string
+                or a buffer such as an mmap.
+                """
+
+                if data[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+                        raise TypeError("Not a binary TextGrid file")
+                self._data = data
+                self._pos = len(BINARY_MAGIC)
+                if self._string8() != "TextGrid":
+                        raise TypeError("Binary file does not hold a TextGrid")
+                self.text_type = "ooBinaryFile"
+                self.tiers = []
+                (self.xmin, self.xmax) = self._unpack(_DOUBLES)
+                if self._unpack(_BYTE)[0]:
+                        self.size = self._unpack(_INT)[0]
+                else:
+                        self.size = 0
+                self.t_time = self.xmax - self.xmin
+
+        def _unpack(self, fmt):
+                try:
+                        values = fmt.unpack_from(self._data, self._pos)
+                except struct.error:
+                        raise TypeError("Unexpected end of TextGrid file")
+                self._pos += fmt.size
+                return values
+
+        def _bytes(self, length):
+                end = self._pos + length
+                if end > len(self._data):
+                        raise TypeError("Unexpected end of TextGrid file")
+                text = self._data[self._pos:end]
+                self._pos = end
+                return text
+
+        def _string8(self):
+                """
+                @return:  A string with a one byte length, used for class names.
+                """
+
+                return self._bytes(self._unpack(_BYTE)[0])
+
+        def _string16(self):
+                """
+                @return:  A string with a two byte length, or if that is
+                0xFFFF a two byte count of the UTF-16 characters that follow.
+                """
+
+                length = self._unpack(_SHORT)[0]
+                if length != 0xFFFF:
+                        return self._bytes(length)
+                length = self._unpack(_SHORT)[0]
+                return self._bytes(2 * length).decode("utf-16-be").encode("utf-8")
+
+        def _read_tier(self):
+                """
+                Reads a tier header and adds a new Tier to tiers.
+                """
+
+                classid = self._string8()
+                nameid = self._string16()
+                (xmin, xmax) = self._unpack(_DOUBLES)
+                size = self._unpack(_INT)[0]
+                tier = self._make_tier(classid, nameid, xmin, xmax, size)
+                self.tiers.append(tier)
+                return tier
+
+        def _make_tier(self, classid, nameid, xmin, xmax, size):
+                return Tier(classid, nameid, xmin, xmax, size, self.text_type, self.t_time)
+
+        def _skip_string16(self):
+                length = self._unpack(_SHORT)[0]
+                if length == 0xFFFF:
+                        length = 2 * self._unpack(_SHORT)[0]
+                self._pos += length
+
+        def _read_row(self, tier):
+                """
+                @return:  The next (time mark) or (start_time end_time label) row.
+                """
+
+                if tier.classid == TEXTTIER:
+                        (time,) = self._unpack(_DOUBLE)
+                        return (repr(time), self._string16())
+                (start, end) = self._unpack(_DOUBLES)
+                return (repr(start), repr(end), self._string16())
+
+        def _read_times(self, tier):
+                """
+                @return:  The times of the next row as floats, skipping its label.
+                """
 
-CHRONTEXTFILE = re.compile(r"""(?x)
-                        [\r\n]+(\S+)\
-                        (\S+)\ +!\ Time\ domain.\ *[\r\n]+
-                        (\S+)\ +!\ Number\ of\ tiers.\ *[\r\n]+"
-""")
+                times = self._unpack(_DOUBLE if tier.classid == TEXTTIER else _DOUBLES)
+                self._skip_string16()
+                return times
 
-OLDOOTEXTFILE = re.compile(r"""(?x)
-                        [\r\n]+(\S+)
-                        [\r\n]+(\S+)
-                        [\r\n]+.+[\r\n]+(\S+)
-""")
+        def __iter__(self):
+                for i in range(self.size):
+                        tier = self._read_tier()
+                        for j in range(tier.size):
+                                yield (tier, self._read_row(tier))
 
 
+def textgrid_reader(read_file):
+        """
+        Returns a reader for a TextGrid in any format, a BinaryTextGridReader
+        for the binary format or a TextGridReader for the text formats.
+        @type read_file: An open TextGrid file, mode "rb", or a string
+        holding the contents of one.
+        """
+
+        if isinstance(read_file, basestring):
+                if read_file.startswith(BINARY_MAGIC):
+                        return BinaryTextGridReader(read_file)
+                return TextGridReader(read_file.splitlines(True))
+
+        head = read_file.read(len(BINARY_MAGIC))
+        if head == BINARY_MAGIC:
+                return BinaryTextGridReader(head + read_file.read())
+        # finish the first line so that a text reader sees whole lines
+        head += read_file.readline()
+        return TextGridReader(chain(head.splitlines(True), read_file))
+
 
 #################################################################
 # TextGrid Class
@@ -125,11 +490,19 @@ class TextGrid(object):
         own attributes.
         """
 
-        def __init__(self, read_file):
+        def __init__(self, read_file, tiers=None, lazy=False):
                 """
-                Takes open read file as input, initializes attributes
-                of the TextGrid file.
-                @type read_file: An open TextGrid file, mode "r".
+                Takes the contents of a TextGrid file, or an open file, as
+                input and reads its tiers.  Any of the text formats or the
+                binary format can be read.
+                @type read_file: A string or an open TextGrid file, mode "rb",
+                or an mmap of one if lazy.
+                @param tiers:  Names of the tiers to read, others are skipped.
+                If None all tiers are read.
+                @param lazy:  If true only the tier headers are read, each
+                tier's rows are parsed the first time they are used.  Rows
+                of the chronological format are not grouped by tier, so
+                they are all scanned once to find the rows of each tier.
                 @param size:  Number of tiers.
                 @param xmin: xmin.
                 @param xmax: xmax.
@@ -138,18 +511,45 @@ class TextGrid(object):
                 @type tiers:  A list of tier objects.
                 """
 
+                # as the old parser did, though only text was accepted then
                 self.read_file = read_file
-                self.size = 0
-                self.xmin = 0
-                self.xmax = 0
-                self.t_time = 0
-                self.text_type = self._check_type()
-                self.tiers = self._find_tiers()
+                if tiers is not None:
+                        tiers = set(tiers)
+                if lazy:
+                        if not isinstance(read_file, (basestring, mmap.mmap)):
+                                read_file = read_file.read()
+                        reader = _indexed_reader(read_file)
+                else:
+                        reader = textgrid_reader(read_file)
+                        for (tier, row) in reader:
+                                if tiers is None or tier.nameid in tiers:
+                                        tier.simple_transcript.append(row)
+                self.xmin = reader.xmin
+                self.xmax = reader.xmax
+                self.t_time = reader.t_time
+                self.text_type = reader.text_type
+                self.tiers = [tier for tier in reader.tiers if tiers is None or tier.nameid in tiers]
+                self.size = len(self.tiers)
 
         def __iter__(self):
                 for tier in self.tiers:
                         yield tier
 
+        def stats(self, non_speech_char=".", percentiles=(50, 90, 95)):
+                """
+                @return:  A list of the statistics of each tier, from
+                Tier.stats, with the tier name and class added as name
+                and classid.
+                """
+
+                result = []
+                for tier in self.tiers:
+                        stats = tier.stats(non_speech_char, percentiles)
+                        stats["name"] = tier.nameid
+                        stats["classid"] = tier.classid
+                        result.append(stats)
+                return result
+
         def next(self):
                 if self.idx == (self.size - 1):
                         raise StopIteration
@@ -157,174 +557,233 @@ class TextGrid(object):
                 return self.tiers[self.idx]
 
         @staticmethod
-        def load(file):
+        def load(file, tiers=None, lazy=False):
                 """
                 @param file: a file in TextGrid format
+                @param tiers: names of the tiers to read, as for TextGrid
+                @param lazy: read tier rows only when they are used, as for TextGrid
                 """
 
-                return TextGrid(open(file).read())
+                with open(file, "rb") as read_file:
+                        return TextGrid(read_file, tiers, lazy)
 
-        def _load_tiers(self, header):
+        def write(self, out, text_type="ooTextFile"):
                 """
-                Iterates over each tier and grabs tier information.
+                Writes the TextGrid to a file object one row at a time,
+                so the time taken is linear in the number of rows and,
+                for lazily read tiers, memory use does not grow with it.
+                @param out:  A file object open for writing.
+                @param text_type:  The format to write, ooTextFile (long),
+                OldooTextFile (short) or ChronTextFile.
                 """
 
-                tiers = []
-                if self.text_type == "ChronTextFile":
-                        m = re.compile(header)
-                        tier_headers = m.findall(self.read_file)
-                        tier_re = " \d+.?\d* \d+.?\d*[\r\n]+\"[^\"]*\""
-                        for i in range(0, self.size):
-                                tier_info = [tier_headers[i]] + \
-                                re.findall(str(i + 1) + tier_re, self.read_file)
-                                tier_info = "\n".join(tier_info)
-                                tiers.append(Tier(tier_info, self.text_type, self.t_time))
-                        return tiers
-
-                tier_re = header + "[\s\S]+?(?=" + header + "|$$)"
-                m = re.compile(tier_re)
-                tier_iter = m.finditer(self.read_file)
-                for iterator in tier_iter:
-                        (begin, end) = iterator.span()
-                        tier_info = self.read_file[begin:end]
-                        tiers.append(Tier(tier_info, self.text_type, self.t_time))
-                return tiers
-
-        def _check_type(self):
-                """
-                Figures out the TextGrid format.
-                """
-
-                m = re.match("(.*)[\r\n](.*)[\r\n](.*)[\r\n](.*)", self.read_file)
                 try:
-                        type_id = m.group(1).strip()
-                except AttributeError:
-                        raise TypeError("Cannot read file -- try TextGrid.load()")
-                xmin = m.group(4)
-                if type_id == "File type = \"ooTextFile\"":
-                        if "xmin" not in xmin:
-                                text_type = "OldooTextFile"
-                        else:
-                                text_type = "ooTextFile"
-                elif type_id == "\"Praat chronological TextGrid text file\"":
-                        text_type = "ChronTextFile"
-                else:
-                        raise TypeError("Unknown format '(%s)'", (type_id))
-                return text_type
+                        writer = _WRITERS[text_type]
+                except KeyError:
+                        raise TypeError("Cannot write TextGrid format '%s'" % text_type)
+                writer(self, out)
 
-        def _find_tiers(self):
+        def save(self, file, text_type="ooTextFile"):
                 """
-                Splits the textgrid file into substrings corresponding to tiers.
+                @param file: the name of the file to write
+                @param text_type: the format to write, as for write()
                 """
 
-                if self.text_type == "ooTextFile":
-                        m = OOTEXTFILE
-                        header = " +item \["
-                elif self.text_type == "ChronTextFile":
-                        m = CHRONTEXTFILE
-                        header = "\"\S+\" \".*\" \d+\.?\d* \d+\.?\d*"
-                elif self.text_type == "OldooTextFile":
-                        m = OLDOOTEXTFILE
-                        header = "\".*\"[\r\n]+\".*\""
-
-                file_info = m.findall(self.read_file)[0]
-                self.xmin = float(file_info[0])
-                self.xmax = float(file_info[1])
-                self.t_time = self.xmax - self.xmin
-                self.size = int(file_info[2])
-                tiers = self._load_tiers(header)
-                return tiers
+                with open(file, "wb") as out:
+                        self.write(out, text_type)
 
         def to_chron(self):
                 """
                 @return:  String in Chronological TextGrid file format.
                 """
 
-                chron_file = ""
-                chron_file += "\"Praat chronological TextGrid text file\"\n"
-                chron_file += str(self.xmin) + " " + str(self.xmax)
-                chron_file += "   ! Time domain.\n"
-                chron_file += str(self.size) + "   ! Number of tiers.\n"
-                for tier in self.tiers:
-                        idx = (self.tiers.index(tier)) + 1
-                        tier_header = "\"" + tier.classid + "\" \"" \
-                                                    + tier.nameid + "\" " + str(tier.xmin) \
-                                                    + " " + str(tier.xmax)
-                        chron_file += tier_header + "\n"
-                        transcript = tier.simple_transcript
-                        for (xmin, xmax, utt) in transcript:
-                                chron_file += str(idx) + " " + str(xmin)
-                                chron_file += " " + str(xmax) +"\n"
-                                chron_file += "\"" + utt + "\"\n"
-                return chron_file
+                out = StringIO()
+                self.write(out, "ChronTextFile")
+                return out.getvalue()
 
         def to_oo(self):
                 """
                 @return:  A string in OoTextGrid file format.
                 """
 
-                oo_file = ""
-                oo_file += "File type = \"ooTextFile\"\n"
-                oo_file += "Object class = \"TextGrid\"\n\n"
-                oo_file += "xmin = ", self.xmin, "\n"
-                oo_file += "xmax = ", self.xmax, "\n"
-                oo_file += "tiers? <exists>\n"
-                oo_file += "size = ", self.size, "\n"
-                oo_file += "item []:\n"
-                for i in range(len(self.tiers)):
-                        oo_file += "%4s%s [%s]" % ("", "item", i + 1)
-                        _curr_tier = self.tiers[i]
-                        for (x, y) in _curr_tier.header:
-                                oo_file += "%8s%s = \"%s\"" % ("", x, y)
-                        if _curr_tier.classid != TEXTTIER:
-                                for (xmin, xmax, text) in _curr_tier.simple_transcript:
-                                        oo_file += "%12s%s = %s" % ("", "xmin", xmin)
-                                        oo_file += "%12s%s = %s" % ("", "xmax", xmax)
-                                        oo_file += "%12s%s = \"%s\"" % ("", "text", text)
-                        else:
-                                for (time, mark) in _curr_tier.simple_transcript:
-                                        oo_file += "%12s%s = %s" % ("", "time", time)
-                                        oo_file += "%12s%s = %s" % ("", "mark", mark)
-                return oo_file
+                out = StringIO()
+                self.write(out, "ooTextFile")
+                return out.getvalue()
+
+
+#################################################################
+# Writers
+#################################################################
+
+def _number(value):
+        """
+        @return:  A time as written in a TextGrid, times read from files are
+        strings and are written as they were read.
+        """
+
+        if isinstance(value, basestring):
+                return value
+        text = repr(float(value))
+        # whole numbers are written as integers, as Praat does
+        if text.endswith(".0"):
+                return text[:-2]
+        return text
+
+
+def _string(text):
+        if '"' in text:
+                text = text.replace('"', '""')
+        return '"%s"' % text
+
+
+def _row_count(tier):
+        """
+        @return:  The number of rows in a tier, without parsing those of a
+        lazy tier that has its size in its header.
+        """
+
+        if tier._transcript is not None:
+                return len(tier._transcript)
+        if tier.size is not None:
+                return tier.size
+        return sum(1 for row in tier.rows())
+
+
+def _write_long(tg, out):
+        write = out.write
+        write('File type = "ooTextFile"\nObject class = "TextGrid"\n\n')
+        write("xmin = %s \nxmax = %s \n" % (_number(tg.xmin), _number(tg.xmax)))
+        if not tg.tiers:
+                write("tiers? <absent> \n")
+                return
+        write("tiers? <exists> \nsize = %d \nitem []: \n" % len(tg.tiers))
+        for (i, tier) in enumerate(tg.tiers):
+                write("    item [%d]:\n" % (i + 1))
+                write("        class = %s \n        name = %s \n" % (_string(tier.classid), _string(tier.nameid)))
+                write("        xmin = %s \n        xmax = %s \n" % (_number(tier.xmin), _number(tier.xmax)))
+                if tier.classid == TEXTTIER:
+                        write("        points: size = %d \n" % _row_count(tier))
+                        for (j, (time, mark)) in enumerate(tier.rows()):
+                                write("        points [%d]:\n            number = %s \n            mark = %s \n"
+                                      % (j + 1, _number(time), _string(mark)))
+                else:
+                        write("        intervals: size = %d \n" % _row_count(tier))
+                        for (j, (xmin, xmax, text)) in enumerate(tier.rows()):
+                                write("        intervals [%d]:\n            xmin = %s \n            xmax = %s \n"
+                                      "            text = %s \n" % (j + 1, _number(xmin), _number(xmax), _string(text)))
+
+
+def _write_short(tg, out):
+        write = out.write
+        write('File type = "ooTextFile"\nObject class = "TextGrid"\n\n')
+        write("%s\n%s\n" % (_number(tg.xmin), _number(tg.xmax)))
+        if not tg.tiers:
+                write("<absent>\n")
+                return
+        write("<exists>\n%d\n" % len(tg.tiers))
+        for tier in tg.tiers:
+                write("%s\n%s\n%s\n%s\n%d\n" % (_string(tier.classid), _string(tier.nameid),
+                                                 _number(tier.xmin), _number(tier.xmax), _row_count(tier)))
+                if tier.classid == TEXTTIER:
+                        for (time, mark) in tier.rows():
+                                write("%s\n%s\n" % (_number(time), _string(mark)))
+                else:
+                        for (xmin, xmax, text) in tier.rows():
+                                write("%s\n%s\n%s\n" % (_number(xmin), _number(xmax), _string(text)))
+
+
+def _chron_rows(number, tier):
+        """
+        @return:  The rows of a tier as they are written in the chronological
+        format, keyed for merging in time order.
+        """
+
+        if tier.classid == TEXTTIER:
+                for (j, (time, mark)) in enumerate(tier.rows()):
+                        yield (float(time), number, j, "%d %s\n%s\n" % (number, _number(time), _string(mark)))
+        else:
+                for (j, (xmin, xmax, text)) in enumerate(tier.rows()):
+                        yield (float(xmin), number, j, "%d %s %s\n%s\n" % (number, _number(xmin), _number(xmax),
+                                                                           _string(text)))
+
+
+def _write_chron(tg, out):
+        write = out.write
+        write('"Praat chronological TextGrid text file"\n')
+        write("%s %s   ! Time domain.\n" % (_number(tg.xmin), _number(tg.xmax)))
+        write("%d   ! Number of tiers.\n" % len(tg.tiers))
+        for tier in tg.tiers:
+                write("%s %s %s %s\n" % (_string(tier.classid), _string(tier.nameid),
+                                         _number(tier.xmin), _number(tier.xmax)))
+        # each tier is in time order, so merging them needs one row from each
+        for row in heapq.merge(*[_chron_rows(i + 1, tier) for (i, tier) in enumerate(tg.tiers)]):
+                write(row[3])
+
+
+_WRITERS = {"ooTextFile": _write_long,
+            "OldooTextFile": _write_short,
+            "ChronTextFile": _write_chron,
+            }
 
 
 #################################################################
 # Tier Class
 #################################################################
 
+def _is_speech(label, non_speech_char):
+        label = label.strip()
+        # an empty marker means there is none, every label starts with ""
+        return bool(label) and (not non_speech_char or not label.startswith(non_speech_char))
+
+
+def _sum(values):
+        if numpy is not None:
+                return float(values.sum())
+        return sum(values)
+
+
+def _percentile(ordered, p):
+        """
+        @return:  The p'th percentile of the sorted list ordered, interpolating
+        linearly between the nearest rows as numpy.percentile does.
+        """
+
+        rank = (len(ordered) - 1) * p / 100.0
+        low = int(math.floor(rank))
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
 class Tier(object):
         """
         A container for each tier.
         """
 
-        def __init__(self, tier, text_type, t_time):
+        def __init__(self, classid, nameid, xmin, xmax, size, text_type, t_time, simple_transcript=None):
                 """
                 Initializes attributes of the tier: class, name, xmin, xmax
-                size, transcript, total time.
-                Utilizes text_type to guide how to parse the file.
-                @type tier: a tier object; single item in the TextGrid list.
-                @param text_type:  TextGrid format
-                @param t_time:  Total time of TextGrid file.
+                size, transcript, total time.  Tiers are normally made by
+                a TextGridReader, which fills in the transcript as it goes.
                 @param classid:  Type of tier (point or interval).
                 @param nameid:  Name of tier.
                 @param xmin:  xmin of the tier.
                 @param xmax:  xmax of the tier.
-                @param size:  Number of entries in the tier
-                @param transcript:  The raw transcript for the tier.
+                @param size:  Number of entries in the tier, None if not known.
+                @param text_type:  TextGrid format
+                @param t_time:  Total time of TextGrid file.
+                @param simple_transcript:  List of entries in the tier.
                 """
 
-                self.tier = tier
                 self.text_type = text_type
                 self.t_time = t_time
-                self.classid = ""
-                self.nameid = ""
-                self.xmin = 0
-                self.xmax = 0
-                self.size = 0
-                self.transcript = ""
-                self.tier_info = ""
-                self._make_info()
-                self.simple_transcript = self.make_simple_transcript()
+                self.classid = classid
+                self.nameid = nameid
+                self.xmin = xmin
+                self.xmax = xmax
+                self.size = size
+                if simple_transcript is None:
+                        simple_transcript = []
+                self.simple_transcript = simple_transcript
                 if self.classid != TEXTTIER:
                         self.mark_type = "intervals"
                 else:
@@ -332,92 +791,151 @@ class Tier(object):
                         self.header = [("class", self.classid), ("name", self.nameid), \
                         ("xmin", self.xmin), ("xmax", self.xmax), ("size", self.size)]
 
-        def __iter__(self):
-                return self
+        def _get_transcript(self):
+                if self._transcript is None:
+                        self._transcript = list(self.rows())
+                return self._transcript
 
-        def _make_info(self):
+        def _set_transcript(self, rows):
+                self._transcript = rows
+                self._columns = None
+
+        simple_transcript = property(_get_transcript, _set_transcript)
+
+        def rows(self):
                 """
-                Figures out most attributes of the tier object:
-                class, name, xmin, xmax, transcript.
+                @return:  An iterator over the rows of the tier.
                 """
 
-                trans = "([\S\s]*)"
-                if self.text_type == "ChronTextFile":
-                        classid = "\"(.*)\" +"
-                        nameid = "\"(.*)\" +"
-                        xmin = "(\d+\.?\d*) +"
-                        xmax = "(\d+\.?\d*) *[\r\n]+"
-                        # No size values are given in the Chronological Text File format.
-                        self.size = None
-                        size = ""
-                elif self.text_type == "ooTextFile":
-                        classid = " +class = \"(.*)\" *[\r\n]+"
-                        nameid = " +name = \"(.*)\" *[\r\n]+"
-                        xmin = " +xmin = (\d+\.?\d*) *[\r\n]+"
-                        xmax = " +xmax = (\d+\.?\d*) *[\r\n]+"
-                        size = " +\S+: size = (\d+) *[\r\n]+"
-                elif self.text_type == "OldooTextFile":
-                        classid = "\"(.*)\" *[\r\n]+"
-                        nameid = "\"(.*)\" *[\r\n]+"
-                        xmin = "(\d+\.?\d*) *[\r\n]+"
-                        xmax = "(\d+\.?\d*) *[\r\n]+"
-                        size = "(\d+) *[\r\n]+"
-                m = re.compile(classid + nameid + xmin + xmax + size + trans)
-                self.tier_info = m.findall(self.tier)[0]
-                self.classid = self.tier_info[0]
-                self.nameid = self.tier_info[1]
-                self.xmin = float(self.tier_info[2])
-                self.xmax = float(self.tier_info[3])
-                if self.size != None:
-                        self.size = int(self.tier_info[4])
-                self.transcript = self.tier_info[-1]
+                return iter(self.simple_transcript)
 
-        def make_simple_transcript(self):
+        def times(self):
                 """
-                @return:  Transcript of the tier, in form [(start_time end_time label)]
+                @return:  An iterator over the times of each row as a tuple of
+                floats, (time) or (start_time, end_time).
                 """
 
-                if self.text_type == "ChronTextFile":
-                        trans_head = ""
-                        trans_xmin = " (\S+)"
-                        trans_xmax = " (\S+)[\r\n]+"
-                        trans_text = "\"([\S\s]*?)\""
-                elif self.text_type == "ooTextFile":
-                        trans_head = " +\S+ \[\d+\]: *[\r\n]+"
-                        trans_xmin = " +\S+ = (\S+) *[\r\n]+"
-                        trans_xmax = " +\S+ = (\S+) *[\r\n]+"
-                        trans_text = " +\S+ = \"([^\"]*?)\""
-                elif self.text_type == "OldooTextFile":
-                        trans_head = ""
-                        trans_xmin = "(.*)[\r\n]+"
-                        trans_xmax = "(.*)[\r\n]+"
-                        trans_text = "\"([\S\s]*?)\""
-                if self.classid == TEXTTIER:
-                        trans_xmin = ""
-                trans_m = re.compile(trans_head + trans_xmin + trans_xmax + trans_text)
-                self.simple_transcript = trans_m.findall(self.transcript)
-                return self.simple_transcript
+                for row in self.rows():
+                        yield tuple(float(t) for t in row[:-1])
 
-        def transcript(self):
+        def labels(self):
+                """
+                @return:  An iterator over the label of each row.
+                """
+
+                for row in self.rows():
+                        yield row[-1]
+
+        def columns(self):
+                """
+                The rows of the tier as columns, made on first use and kept
+                until simple_transcript is replaced.  The times are float64
+                arrays, NumPy arrays if NumPy is installed or otherwise from
+                the array module, so they are converted from strings once.
+                For a TextTier both starts and ends hold the point times.
+                @return:  A tuple (starts, ends, labels) where labels is a list.
+                """
+
+                if self._columns is None:
+                        starts = array("d")
+                        ends = array("d")
+                        for times in self.times():
+                                starts.append(times[0])
+                                ends.append(times[-1])
+                        if numpy is not None:
+                                starts = numpy.frombuffer(starts, dtype=numpy.float64)
+                                ends = numpy.frombuffer(ends, dtype=numpy.float64)
+                        self._columns = (starts, ends, list(self.labels()))
+                return self._columns
+
+        def starts(self):
+                """
+                @return:  The start times of the rows, see columns().
+                """
+
+                return self.columns()[0]
+
+        def ends(self):
                 """
-                @return:  Transcript of the tier, as it appears in the file.
+                @return:  The end times of the rows, see columns().
                 """
 
-                return self.transcript
+                return self.columns()[1]
+
+        def __iter__(self):
+                return self
 
         def time(self, non_speech_char="."):
                 """
                 @return: Utterance time of a given tier.
-                Screens out entries that begin with a non-speech marker.
+                Screens out entries that begin with a non-speech marker,
+                or only empty entries if non_speech_char is empty.
                 """
 
-                total = 0.0
-                if self.classid != TEXTTIER:
-                        for (time1, time2, utt) in self.simple_transcript:
-                                utt = utt.strip()
-                                if utt and not utt[0] == ".":
-                                        total += (float(time2) - float(time1))
-                return total
+                return _sum(self._durations(non_speech_char)[1])
+
+        def _durations(self, non_speech_char):
+                """
+                @return:  A tuple (durations, speech_durations, labels) of
+                arrays of the durations of all rows and of speech rows, and
+                the labels of all rows.
+                """
+
+                (starts, ends, labels) = self.columns()
+                speech = [_is_speech(label, non_speech_char) for label in labels]
+                if numpy is not None:
+                        durations = ends - starts
+                        return (durations, durations[numpy.array(speech, dtype=bool)], labels)
+                durations = array("d", [end - start for (start, end) in izip(starts, ends)])
+                return (durations, array("d", [d for (d, s) in izip(durations, speech) if s]), labels)
+
+        def stats(self, non_speech_char=".", percentiles=(50, 90, 95)):
+                """
+                Statistics of the tier, computed from columns() with NumPy
+                if it is installed.  Speech rows are those whose label is
+                not empty and does not begin with non_speech_char, as for
+                time().  Rows of a TextTier have no duration.
+                @return:  A dictionary with
+                        - count:  number of rows
+                        - speech_count:  number of speech rows
+                        - total:  summed duration of all rows
+                        - speech:  summed duration of speech rows, as time()
+                        - non_speech:  total - speech
+                        - speech_ratio:  speech / total, or 0.0
+                        - mean, min, max:  of speech row durations, or None
+                        - percentiles:  a dictionary from each of percentiles
+                          to that percentile of speech row durations
+                        - labels:  a Counter of the labels of all rows
+                """
+
+                (durations, speech_durations, labels) = self._durations(non_speech_char)
+                total = _sum(durations)
+                speech_time = _sum(speech_durations)
+                n = len(speech_durations)
+                if n == 0:
+                        (low, high, mean) = (None, None, None)
+                        points = [None] * len(percentiles)
+                elif numpy is not None:
+                        (low, high) = (float(speech_durations.min()), float(speech_durations.max()))
+                        mean = speech_time / n
+                        points = [float(v) for v in numpy.percentile(speech_durations, percentiles)]
+                else:
+                        (low, high) = (min(speech_durations), max(speech_durations))
+                        mean = speech_time / n
+                        ordered = sorted(speech_durations)
+                        points = [_percentile(ordered, p) for p in percentiles]
+                return {"count": len(labels),
+                        "speech_count": n,
+                        "total": total,
+                        "speech": speech_time,
+                        "non_speech": total - speech_time,
+                        "speech_ratio": speech_time / total if total else 0.0,
+                        "mean": mean,
+                        "min": low,
+                        "max": high,
+                        "percentiles": dict(zip(percentiles, points)),
+                        "labels": Counter(labels),
+                        }
 
         def tier_name(self):
                 """
@@ -440,12 +958,316 @@ class Tier(object):
 
                 return (self.xmin, self.xmax)
 
+        # Deprecated names kept for code written against the old regular
+        # expression parser, which kept the text of each tier.
+
+        @property
+        def transcript(self):
+                """
+                Deprecated, use simple_transcript or rows().
+                @return:  The rows of the tier, not the text of the file.
+                """
+
+                warnings.warn("Tier.transcript is deprecated, use simple_transcript",
+                              DeprecationWarning, stacklevel=2)
+                return self.simple_transcript
+
+        @property
+        def tier_info(self):
+                """
+                Deprecated, use the tier attributes.
+                @return:  (classid, nameid, xmin, xmax, size, simple_transcript)
+                """
+
+                warnings.warn("Tier.tier_info is deprecated, use the tier attributes",
+                              DeprecationWarning, stacklevel=2)
+                return (self.classid, self.nameid, self.xmin, self.xmax, self.size, self.simple_transcript)
+
+        def make_simple_transcript(self):
+                """
+                Deprecated, rows are read with the tier header.
+                @return:  simple_transcript
+                """
+
+                warnings.warn("Tier.make_simple_transcript is deprecated, use simple_transcript",
+                              DeprecationWarning, stacklevel=2)
+                return self.simple_transcript
+
+        def _make_info(self):
+                """
+                Deprecated, the tier attributes are set when it is read.
+                """
+
+                warnings.warn("Tier._make_info is deprecated", DeprecationWarning, stacklevel=2)
+
         def __repr__(self):
                 return "<%s \"%s\" (%.2f, %.2f) %.2f%%>" % (self.classid, self.nameid, self.xmin, self.xmax, 100*self.time()/self.t_time)
 
         def __str__(self):
                 return self.__repr__() + "\n  " + "\n  ".join(" ".join(row) for row in self.simple_transcript)
 
+#################################################################
+# Lazily read tiers
+#################################################################
+
+def _map_tokens(buf, pos, endpos):
+        """
+        Generates a (start, end, quoted, next) tuple for each data token
+        between pos and endpos in a TextGrid text file held in buf, giving
+        the offsets of its value, whether it is a string and the offset
+        just after it, without copying anything out of buf.
+        """
+
+        for m in TOKEN.finditer(buf, pos, endpos):
+                if m.start(1) >= 0:
+                        yield (m.start(1), m.end(1), True, m.end())
+                elif m.start(2) >= 0:
+                        raise TypeError("Unterminated string in TextGrid file")
+                elif m.start(3) >= 0 and buf[m.start(3)] in DATA_START:
+                        yield (m.start(3), m.end(3), False, m.end())
+
+
+def _token_value(buf, token):
+        (start, end, quoted, next) = token
+        if quoted:
+                return buf[start:end].replace('""', '"')
+        return buf[start:end]
+
+
+def _head(buf, count=4):
+        """
+        @return:  The first count lines of buf.
+        """
+
+        lines = []
+        pos = 0
+        while len(lines) < count and pos < len(buf):
+                end = buf.find("\n", pos)
+                end = len(buf) if end < 0 else end + 1
+                lines.append(buf[pos:end])
+                pos = end
+        return lines
+
+
+def _indexed_reader(buf):
+        """
+        Reads the header of the TextGrid held in buf, a string or an mmap,
+        and finds the span of each tier's rows.
+        @return:  A reader whose tiers are LazyTier objects.
+        """
+
+        if buf[:len(BINARY_MAGIC)] == BINARY_MAGIC:
+                reader = _IndexedBinaryReader(buf)
+        else:
+                reader = _IndexedTextReader(buf, _check_type(_head(buf)))
+        reader.index()
+        return reader
+
+
+class _IndexedTextReader(TextGridReader):
+        """
+        Finds the rows of each tier of a text file held in a buffer and
+        parses them on demand.
+        """
+
+        def __init__(self, buf, text_type):
+                self._buf = buf
+                self.text_type = text_type
+                self.tiers = []
+                self.pos = 0
+                self._raw = _map_tokens(buf, 0, len(buf))
+                self._tokens = self._values()
+                self._read_header()
+
+        def _values(self):
+                for token in self._raw:
+                        self.pos = token[3]
+                        yield _token_value(self._buf, token)
+
+        def _make_tier(self, classid, nameid, xmin, xmax, size):
+                return LazyTier(self, len(self.tiers) + 1, classid, nameid, xmin, xmax, size,
+                                self.text_type, self.t_time)
+
+        def index(self):
+                """
+                Reads the tier headers and records the span of each tier's rows.
+                Rows of the chronological format are shared by all the tiers,
+                so the offset of each row is recorded for its own tier instead.
+                """
+
+                if self.text_type == "ChronTextFile":
+                        self._index_chron()
+                        return
+
+                for i in range(self.size):
+                        tier = self._read_tier()
+                        begin = self.pos
+                        count = tier.size * (2 if tier.classid == TEXTTIER else 3)
+                        for token in islice(self._raw, count):
+                                self.pos = token[3]
+                                count -= 1
+                        if count:
+                                raise TypeError("Unexpected end of TextGrid file")
+                        tier._span = (begin, self.pos)
+
+        def _index_chron(self):
+                for i in range(self.size):
+                        self._read_tier()
+                buf = self._buf
+                raw = self._raw
+                widths = [2 if t.classid == TEXTTIER else 3 for t in self.tiers]
+                offsets = [array('l') for t in self.tiers]
+                for token in raw:
+                        idx = _token_value(buf, token)
+                        try:
+                                i = int(idx) - 1
+                        except ValueError:
+                                i = -1
+                        if not 0 <= i < self.size:
+                                raise TypeError("Bad tier number '%s' in TextGrid file" % idx)
+                        # the row's values follow its tier number
+                        offsets[i].append(token[3])
+                        count = widths[i]
+                        for token in islice(raw, count):
+                                count -= 1
+                        if count:
+                                raise TypeError("Unexpected end of TextGrid file")
+                for (tier, rows) in izip(self.tiers, offsets):
+                        tier._offsets = rows
+
+        def rows(self, tier, labels):
+                buf = self._buf
+                width = 2 if tier.classid == TEXTTIER else 3
+                if tier._offsets is None:
+                        raw = _map_tokens(buf, *tier._span)
+                        rows = (list(islice(raw, width)) for j in xrange(tier.size))
+                else:
+                        end = len(buf)
+                        rows = (list(islice(_map_tokens(buf, pos, end), width)) for pos in tier._offsets)
+                for row in rows:
+                        if labels:
+                                yield tuple(_token_value(buf, t) for t in row)
+                        else:
+                                yield tuple(float(buf[t[0]:t[1]]) for t in row[:-1])
+
+
+class _IndexedBinaryReader(BinaryTextGridReader):
+        """
+        Finds the rows of each tier of a binary file held in a buffer and
+        parses them on demand.
+        """
+
+        def _make_tier(self, classid, nameid, xmin, xmax, size):
+                return LazyTier(self, len(self.tiers) + 1, classid, nameid, xmin, xmax, size,
+                                self.text_type, self.t_time)
+
+        def index(self):
+                for i in range(self.size):
+                        tier = self._read_tier()
+                        begin = self._pos
+                        for j in xrange(tier.size):
+                                self._read_times(tier)
+                        tier._span = (begin, self._pos)
+
+        def rows(self, tier, labels):
+                # a cursor of its own so that tiers can be read side by side
+                cursor = copy.copy(self)
+                cursor._pos = tier._span[0]
+                read = cursor._read_row if labels else cursor._read_times
+                for j in xrange(tier.size):
+                        yield read(tier)
+
+
+class LazyTier(Tier):
+        """
+        A tier whose header has been read but whose rows are parsed from
+        the file contents only when they are used.  rows(), times() and
+        labels() parse them each time without keeping them, the first
+        use of simple_transcript parses them into a list that is kept.
+        """
+
+        def __init__(self, reader, number, *args):
+                """
+                @param reader:  The reader that found the tier, which holds
+                the file contents.
+                @param number:  The number of the tier in the file, from 1.
+                Other arguments are as for Tier.
+                """
+
+                Tier.__init__(self, *args)
+                self._transcript = None
+                self._reader = reader
+                self._number = number
+                self._span = None
+                self._offsets = None
+
+        def rows(self):
+                """
+                @return:  An iterator over the rows of the tier, as in simple_transcript.
+                """
+
+                if self._transcript is not None:
+                        return iter(self._transcript)
+                return self._reader.rows(self, True)
+
+        def times(self):
+                """
+                @return:  An iterator over the times of each row as a tuple of
+                floats, (time) or (start_time, end_time), without reading labels.
+                """
+
+                if self._transcript is not None:
+                        return Tier.times(self)
+                return self._reader.rows(self, False)
+
+
+#################################################################
+# MappedTextGrid Class
+#################################################################
+
+class MappedTextGrid(TextGrid):
+        """
+        A TextGrid read lazily through a memory map of its file, for files
+        too large to load.  Opening it reads the file header and finds where
+        the rows of each tier are, keeping only their offsets, so memory
+        use does not grow with the size of the file until rows are used.
+        The chronological format is the exception, an offset is kept for
+        each of its rows.  Any of the text formats or the binary format
+        can be mapped.
+
+            with MappedTextGrid("big.TextGrid", tiers=["MAU"]) as tg:
+                    for (start, end) in tg.tiers[0].times():
+                            ...
+        """
+
+        def __init__(self, filename, tiers=None):
+                """
+                @param filename:  A file in TextGrid format.
+                @param tiers:  Names of the tiers to read, as for TextGrid.
+                """
+
+                with open(filename, "rb") as read_file:
+                        try:
+                                self._map = mmap.mmap(read_file.fileno(), 0, access=mmap.ACCESS_READ)
+                        except ValueError:
+                                raise TypeError("Cannot read empty file '%s'" % filename)
+                try:
+                        TextGrid.__init__(self, self._map, tiers, lazy=True)
+                except:
+                        self._map.close()
+                        raise
+
+        def close(self):
+                self._map.close()
+
+        def __enter__(self):
+                return self
+
+        def __exit__(self, *exc):
+                self.close()
+                return False
+
+
 def demo_TextGrid(demo_data):
         print "** Demo of the TextGrid class. **"
 
@@ -597,7 +1419,7 @@ Object class = "TextGrid"
 "phones"
 0
 2.8
-6
+7
 0
 1.6229213249309031
 ""
@@ -625,7 +1447,7 @@ demo_data3 = """"Praat chronological TextGrid text file"
 0 2.8   ! Time domain.
 2   ! Number of tiers.
 "IntervalTier" "utterances" 0 2.8
-"IntervalTier" "utterances" 0 2.8
+"IntervalTier" "phones" 0 2.8
 1 0 1.6229213249309031
 ""
 2 0 1.6229213249309031
@@ -0,0 +1,2 @@
+"""Benchmarks for annotationrdf, run as modules from the top level directory,
+eg. python -m benchmarks.link_children"""
@@ -0,0 +1,38 @@
+"""The TextGrid parser as it was before it was rewritten, loaded from
+git, so that benchmarks can compare against it
+
+Its pattern for the header of a chronological file wants a newline
+between xmin and xmax, so it can't read any chronological file that
+Praat writes.  That one pattern is replaced with a working one, the
+rest of the parser is used as it was.
+"""
+
+import imp
+import os
+import re
+import subprocess
+
+
+# the header pattern of the old parser as it was meant to be
+CHRONTEXTFILE = re.compile(r'[\r\n]+(\S+) (\S+) +! Time domain\. *[\r\n]+(\S+) +! Number of tiers\. *[\r\n]+"')
+
+
+def baseline_textgrid(rev=None):
+    """Return the annotationrdf.textgrid module at the git revision rev,
+    the first commit if None, or None if git can't give it"""
+
+    devnull = open(os.devnull, 'w')
+    try:
+        if rev is None:
+            rev = subprocess.check_output(['git', 'rev-list', '--max-parents=0', 'HEAD'],
+                                          stderr=devnull).split()[-1]
+        source = subprocess.check_output(['git', 'show', '%s:annotationrdf/textgrid.py' % rev],
+                                         stderr=devnull)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    finally:
+        devnull.close()
+    module = imp.new_module('baseline_textgrid')
+    exec compile(source, 'baseline_textgrid.py', 'exec') in module.__dict__
+    module.CHRONTEXTFILE = CHRONTEXTFILE
+    return module
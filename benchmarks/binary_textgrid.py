@@ -0,0 +1,45 @@
+"""Compare reading the same TextGrid in Praat's binary format and in
+each of the text formats
+
+    python -m benchmarks.binary_textgrid --duration 3600
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from annotationrdf.textgrid import TextGrid
+from benchmarks.generate import FORMATS, maus_tiers, write_textgrid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=3600.0,
+                        help='seconds of speech')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per file, the best is kept')
+    args = parser.parse_args()
+
+    tiers = maus_tiers(args.duration)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        print "%8s %10s %10s %10s %12s" % ("format", "bytes", "rows", "seconds", "rows/s")
+        for fmt in FORMATS:
+            path = os.path.join(tmpdir, fmt + '.TextGrid')
+            with open(path, 'wb') as out:
+                write_textgrid(out, tiers, fmt)
+            best = None
+            for i in range(args.repeat):
+                t0 = time.time()
+                tg = TextGrid.load(path)
+                seconds = time.time() - t0
+                best = seconds if best is None else min(best, seconds)
+            rows = sum(len(tier.simple_transcript) for tier in tg)
+            print "%8s %10d %10d %10.3f %12.0f" % (fmt, os.path.getsize(path), rows, best, rows / best)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Compare loading many items into an rdflib store with to_rdf and a
+commit for each item and with bulk_load
+
+Each item is a small MAUS-shaped collection, made as it is loaded.  The
+in-memory store is always used; on-disk stores are used if they can be
+opened here, eg. Sleepycat needs the bsddb module and SQLAlchemy the
+rdflib-sqlalchemy package, which writes each addN to SQLite in its own
+database transaction.
+
+    python -m benchmarks.bulk_load --items 10000 --size 20
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+from rdflib import URIRef
+
+from annotationrdf import bulk_load
+from benchmarks.graph_insert import STORES, open_graph
+from benchmarks.link_children import maus_collection
+
+
+def items(n, size):
+    """Generate n collections of about size annotations, each on its own item"""
+
+    for i in range(n):
+        collection = maus_collection(size, seed=i)
+        collection.itemid = URIRef("http://example.org/corpora/bench/item%d" % i)
+        yield collection
+
+
+def per_item(graph, collections):
+    for collection in collections:
+        collection.to_rdf(graph)
+        graph.commit()
+
+
+def bulk(graph, collections):
+    bulk_load(graph, collections)
+
+
+METHODS = [('per item', per_item), ('bulk_load', bulk)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=10000, help='number of items')
+    parser.add_argument('--size', type=int, default=20, help='annotations per item')
+    args = parser.parse_args()
+
+    # the time to make the collections, which is part of each method's time
+    t0 = time.time()
+    for collection in items(args.items, args.size):
+        pass
+    making = time.time() - t0
+
+    print "%d items, %.3fs to make them" % (args.items, making)
+    print "%12s %12s %10s %10s %12s" % ("store", "method", "triples", "seconds", "triples/s")
+    for store in STORES:
+        for (name, method) in METHODS:
+            tmpdir = tempfile.mkdtemp()
+            graph = open_graph(store, tmpdir)
+            if graph is None:
+                shutil.rmtree(tmpdir)
+                break
+            t0 = time.time()
+            method(graph, items(args.items, args.size))
+            seconds = time.time() - t0 - making
+            triples = len(graph)
+            graph.close()
+            shutil.rmtree(tmpdir)
+            print "%12s %12s %10d %10.3f %12.0f" % (store, name, triples, seconds, triples / seconds)
+
+
+if __name__ == '__main__':
+    main()
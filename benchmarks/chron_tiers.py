@@ -0,0 +1,88 @@
+"""Time reading chronological TextGrids as the number of tiers grows
+
+Compares a full parse with TextGrid, which hands each row to its tier in
+one pass, with a full parse by the original parser, which scans the
+whole file once for each tier (see benchmarks.baseline).  The last
+column is the ratio of the two, the old parser is faster where it is
+below 1.  The lazy column reads every row of every tier of
+TextGrid(data, lazy=True), as MappedTextGrid does, which should grow
+with the size of the file and not with tiers times rows.  With 10 or more tiers the old parser also gives tier 1 the
+rows of tier 11 and so on, its times are for that wrong result.
+
+    python -m benchmarks.chron_tiers --tiers 1,4,16,32,64,128 --rows 2000
+"""
+
+import argparse
+import random
+import time
+
+from annotationrdf.textgrid import TextGrid
+from benchmarks.baseline import baseline_textgrid
+
+
+def chron_textgrid(ntiers, nrows, seed=0):
+    """Return a chronological TextGrid with ntiers interval tiers of
+    nrows intervals each, as a string"""
+
+    rand = random.Random(seed)
+    xmax = float(nrows)
+    lines = ['"Praat chronological TextGrid text file"',
+             '0 %r   ! Time domain.' % xmax,
+             '%d   ! Number of tiers.' % ntiers]
+    for t in range(ntiers):
+        lines.append('"IntervalTier" "tier%d" 0 %r' % (t + 1, xmax))
+
+    rows = []
+    for t in range(ntiers):
+        bounds = sorted(rand.uniform(0, xmax) for i in range(nrows - 1))
+        bounds = [0.0] + bounds + [xmax]
+        for i in range(nrows):
+            rows.append((bounds[i], t + 1, bounds[i + 1]))
+    rows.sort()
+
+    for (start, tier, end) in rows:
+        lines.append('%d %r %r' % (tier, start, end))
+        lines.append('"%s"' % rand.choice('aeiou'))
+
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tiers', default='1,4,16,32,64,128',
+                        help='comma separated numbers of tiers')
+    parser.add_argument('--rows', type=int, default=2000,
+                        help='intervals per tier')
+    parser.add_argument('--baseline', help='git revision of the parser to compare with, '
+                        'the first commit by default')
+    args = parser.parse_args()
+
+    baseline = baseline_textgrid(args.baseline)
+    if baseline is None:
+        parser.error("the original parser can't be loaded from git")
+
+    print "%6s %10s %12s %10s %12s %8s" % ("tiers", "rows", "one pass (s)", "lazy (s)", "old (s)",
+                                           "old/new")
+    for ntiers in [int(t) for t in args.tiers.split(',')]:
+        data = chron_textgrid(ntiers, args.rows)
+
+        t0 = time.time()
+        tg = TextGrid(data)
+        onepass = time.time() - t0
+        assert [len(t.simple_transcript) for t in tg] == [args.rows] * ntiers
+
+        t0 = time.time()
+        tg = TextGrid(data, lazy=True)
+        assert [sum(1 for row in t.rows()) for t in tg] == [args.rows] * ntiers
+        lazy = time.time() - t0
+
+        t0 = time.time()
+        baseline.TextGrid(data)
+        pertier = time.time() - t0
+
+        print "%6d %10d %12.3f %10.3f %12.3f %8.2f" % (ntiers, ntiers * args.rows, onepass, lazy,
+                                                       pertier, pertier / onepass)
+
+
+if __name__ == '__main__':
+    main()
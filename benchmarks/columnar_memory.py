@@ -0,0 +1,46 @@
+"""Compare the memory used per annotation by AnnotationCollection and
+ColumnarAnnotationCollection
+
+Each collection is built in a fresh process and measured by the growth
+in its peak resident size, so the numbers include all of the objects
+that make up the annotations.
+
+    python -m benchmarks.columnar_memory --size 200000
+"""
+
+import argparse
+import multiprocessing
+import resource
+
+from annotationrdf import AnnotationCollection, ColumnarAnnotationCollection
+from annotationrdf.namespaces import MAUS
+from benchmarks.link_children import maus_collection
+
+
+def measure(collection_class, size, queue):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    collection = maus_collection(size, collection_class=collection_class)
+    collection.link_children(MAUS.orthographic, MAUS.phonetic)
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux
+    queue.put((len(collection.annotations), (after - before) * 1024.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=200000,
+                        help='number of annotations')
+    args = parser.parse_args()
+
+    print "%30s %12s %16s" % ("collection", "annotations", "bytes/annotation")
+    for collection_class in (AnnotationCollection, ColumnarAnnotationCollection):
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=measure, args=(collection_class, args.size, queue))
+        process.start()
+        (count, used) = queue.get()
+        process.join()
+        print "%30s %12d %16.1f" % (collection_class.__name__, count, used / count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Generate synthetic MAUS-shaped TextGrid files for benchmarks
+
+A MAUS TextGrid has an ORT tier of words separated by pauses, a KAN tier
+with the canonical transcription of each word on the same intervals and
+a MAU tier of phones that divide up each word; pauses are empty labels,
+as in tests/S1219s1.TextGrid.  More than three tiers repeat this pattern
+with independent segmentations, as if for several speakers.
+
+    python -m benchmarks.generate --duration 3600 --format chron big.TextGrid
+"""
+
+import argparse
+import random
+import string
+import struct
+
+
+FORMATS = ('long', 'short', 'chron', 'binary')
+
+TIER_NAMES = ('ORT', 'KAN', 'MAU')
+
+# SAMPA-like phone symbols
+PHONES = ['p', 'b', 't', 'd', 'k', 'g', 'f', 'v', 's', 'z', 'S', 'Z', 'h',
+          'm', 'n', 'N', 'l', 'r', 'w', 'j', 'I', 'E', '{', 'V', 'Q', 'U',
+          '@', 'i:', 'A:', 'O:', 'u:', '3:', 'eI', 'aI', 'OI', '@U', 'aU']
+
+
+def maus_tiers(duration, ntiers=3, alphabet=PHONES, seed=0):
+    """Return a list of (name, intervals) for ntiers MAUS-shaped tiers
+    covering duration seconds, where intervals is a list of
+    (start, end, label) with float times"""
+
+    rand = random.Random(seed)
+    tiers = []
+    while len(tiers) < ntiers:
+        ort = []
+        kan = []
+        mau = []
+        now = 0.0
+        while now < duration:
+            if rand.random() < 0.2:
+                # a pause
+                end = min(now + rand.uniform(0.1, 1.0), duration)
+                ort.append((now, end, ""))
+                kan.append((now, end, ""))
+                mau.append((now, end, ""))
+            else:
+                phones = [rand.choice(alphabet) for i in range(rand.randint(1, 8))]
+                times = [now]
+                for p in phones:
+                    times.append(min(times[-1] + rand.uniform(0.03, 0.15), duration))
+                end = times[-1]
+                word = ''.join(rand.choice(string.ascii_uppercase) for p in phones)
+                ort.append((now, end, word))
+                kan.append((now, end, ''.join(phones)))
+                for (i, p) in enumerate(phones):
+                    if times[i] < times[i + 1]:
+                        mau.append((times[i], times[i + 1], p))
+            now = end
+        for (name, intervals) in zip(TIER_NAMES, (ort, kan, mau)):
+            tiers.append((name, intervals))
+    return tiers[:ntiers]
+
+
+def quote(label):
+    return '"%s"' % label.replace('"', '""')
+
+
+def binary_string(text):
+    """Praat's binary form of a string, ASCII with a two byte length or
+    0xFFFF and a count of UTF-16 characters"""
+
+    try:
+        text.decode('ascii')
+    except UnicodeDecodeError:
+        utf16 = text.decode('utf-8').encode('utf-16-be')
+        return struct.pack('>HH', 0xFFFF, len(utf16) / 2) + utf16
+    return struct.pack('>H', len(text)) + text
+
+
+def write_binary(out, tiers, xmax):
+    out.write('ooBinaryFile' + struct.pack('>B', 8) + 'TextGrid')
+    out.write(struct.pack('>ddBi', 0.0, xmax, 1, len(tiers)))
+    for (name, intervals) in tiers:
+        out.write(struct.pack('>B', 12) + 'IntervalTier' + binary_string(name))
+        out.write(struct.pack('>ddi', 0.0, xmax, len(intervals)))
+        for (start, end, label) in intervals:
+            out.write(struct.pack('>dd', start, end) + binary_string(label))
+
+
+def write_textgrid(out, tiers, fmt='long'):
+    """Write tiers, as returned by maus_tiers, to the file object out
+    as a TextGrid in the long, short or chron text format or in Praat's
+    binary format"""
+
+    xmax = max(intervals[-1][1] for (name, intervals) in tiers)
+
+    if fmt == 'binary':
+        write_binary(out, tiers, xmax)
+        return
+
+    if fmt == 'chron':
+        out.write('"Praat chronological TextGrid text file"\n')
+        out.write('0 %r   ! Time domain.\n' % xmax)
+        out.write('%d   ! Number of tiers.\n' % len(tiers))
+        for (name, intervals) in tiers:
+            out.write('"IntervalTier" %s 0 %r\n' % (quote(name), xmax))
+        rows = []
+        for (i, (name, intervals)) in enumerate(tiers):
+            rows.extend((start, i + 1, end, label) for (start, end, label) in intervals)
+        rows.sort()
+        for (start, tier, end, label) in rows:
+            out.write('\n%d %r %r\n%s\n' % (tier, start, end, quote(label)))
+        return
+
+    out.write('File type = "ooTextFile"\nObject class = "TextGrid"\n\n')
+    if fmt == 'long':
+        out.write('xmin = 0 \nxmax = %r \ntiers? <exists> \nsize = %d \nitem []: \n' % (xmax, len(tiers)))
+    else:
+        out.write('0\n%r\n<exists>\n%d\n' % (xmax, len(tiers)))
+
+    for (i, (name, intervals)) in enumerate(tiers):
+        if fmt == 'long':
+            out.write('    item [%d]:\n' % (i + 1))
+            out.write('        class = "IntervalTier" \n        name = %s \n' % quote(name))
+            out.write('        xmin = 0 \n        xmax = %r \n' % xmax)
+            out.write('        intervals: size = %d \n' % len(intervals))
+            for (j, (start, end, label)) in enumerate(intervals):
+                out.write('        intervals [%d]:\n' % (j + 1))
+                out.write('            xmin = %r \n            xmax = %r \n' % (start, end))
+                out.write('            text = %s \n' % quote(label))
+        else:
+            out.write('"IntervalTier"\n%s\n0\n%r\n%d\n' % (quote(name), xmax, len(intervals)))
+            for (start, end, label) in intervals:
+                out.write('%r\n%r\n%s\n' % (start, end, quote(label)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output', help='TextGrid file to write')
+    parser.add_argument('--duration', type=float, default=60.0, help='seconds of speech')
+    parser.add_argument('--tiers', type=int, default=3, help='number of tiers')
+    parser.add_argument('--alphabet', type=int, default=len(PHONES),
+                        help='number of distinct phone labels')
+    parser.add_argument('--format', choices=FORMATS, default='long')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tiers = maus_tiers(args.duration, args.tiers, PHONES[:args.alphabet], args.seed)
+    with open(args.output, 'wb') as out:
+        write_textgrid(out, tiers, args.format)
+
+
+if __name__ == '__main__':
+    main()
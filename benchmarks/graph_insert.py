@@ -0,0 +1,99 @@
+"""Compare adding a collection's triples to rdflib stores one at a time
+with Graph.add and in chunks with Graph.addN, as to_rdf now does
+
+The in-memory store is always used; on-disk stores are used if they
+can be opened here, eg. Sleepycat needs the bsddb module and SQLAlchemy
+the rdflib-sqlalchemy package, which is used with SQLite.
+
+    python -m benchmarks.graph_insert --size 20000 --chunks 100,10000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from itertools import islice
+
+from rdflib import Graph, Literal
+
+from annotationrdf.namespaces import MAUS
+from benchmarks.link_children import maus_collection
+
+
+STORES = ['IOMemory', 'Sleepycat', 'SQLAlchemy']
+
+
+def open_graph(store, path):
+    """Return a new empty graph in the given kind of store, or None if
+    that store is not available"""
+
+    try:
+        if store == 'SQLAlchemy':
+            import rdflib_sqlalchemy
+            rdflib_sqlalchemy.registerplugins()
+            graph = Graph(store=store)
+            graph.open(Literal('sqlite:///' + os.path.join(path, 'store.db')), create=True)
+            return graph
+        graph = Graph(store=store)
+        if store != 'IOMemory':
+            graph.open(path, create=True)
+    except Exception as e:
+        print "%s store not available: %s" % (store, e)
+        return None
+    return graph
+
+
+def add_each(graph, triples):
+    for triple in triples:
+        graph.add(triple)
+
+
+def add_chunks(graph, triples, chunksize):
+    triples = iter(triples)
+    while True:
+        chunk = [(s, p, o, graph) for (s, p, o) in islice(triples, chunksize)]
+        if not chunk:
+            break
+        graph.addN(chunk)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=20000,
+                        help='number of annotations')
+    parser.add_argument('--chunks', default='100,10000',
+                        help='comma separated chunk sizes for addN')
+    args = parser.parse_args()
+
+    collection = maus_collection(args.size)
+    collection.link_children(MAUS.orthographic, MAUS.phonetic)
+    triples = list(collection.triples())
+
+    methods = [('add', add_each)]
+    for chunksize in [int(c) for c in args.chunks.split(',')]:
+        methods.append(('addN %d' % chunksize,
+                        lambda g, t, chunksize=chunksize: add_chunks(g, t, chunksize)))
+
+    print "%d triples" % len(triples)
+    print "%12s %12s %10s %12s" % ("store", "method", "seconds", "triples/s")
+    for store in STORES:
+        for (name, method) in methods:
+            tmpdir = tempfile.mkdtemp()
+            graph = open_graph(store, tmpdir)
+            if graph is None:
+                shutil.rmtree(tmpdir)
+                break
+            t0 = time.time()
+            method(graph, triples)
+            if store != 'IOMemory':
+                graph.commit()
+            seconds = time.time() - t0
+            assert len(graph) == len(set(triples))
+            graph.close()
+            shutil.rmtree(tmpdir)
+            print "%12s %12s %10.3f %12.0f" % (store, name, seconds, len(triples) / seconds)
+
+
+if __name__ == '__main__':
+    main()
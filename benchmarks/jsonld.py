@@ -0,0 +1,81 @@
+"""Compare writing and reading a collection as JSON-LD with the
+streaming write_jsonld and from_jsonld and with rdflib's JSON-LD plugin
+on a whole Graph
+
+The rdflib path is only timed if the rdflib-jsonld plugin is installed.
+
+    python -m benchmarks.jsonld --sizes 10000,100000
+"""
+
+import argparse
+import time
+from cStringIO import StringIO
+
+from rdflib import Graph
+
+from annotationrdf import AnnotationCollection
+from annotationrdf.jsonld import CONTEXT
+from annotationrdf.namespaces import MAUS
+from benchmarks.link_children import maus_collection
+
+
+def stream_write(collection):
+    out = StringIO()
+    collection.write_jsonld(out)
+    return out.getvalue()
+
+
+def stream_read(data, corpusid):
+    return AnnotationCollection.from_jsonld(StringIO(data), corpusid)
+
+
+def graph_write(collection):
+    return collection.to_rdf().serialize(format='json-ld', context=CONTEXT)
+
+
+def graph_read(data, corpusid):
+    graph = Graph().parse(data=data, format='json-ld')
+    return AnnotationCollection.from_rdf(graph, corpusid)
+
+
+def rdflib_jsonld():
+    """True if rdflib has a JSON-LD plugin"""
+
+    try:
+        Graph().serialize(format='json-ld')
+    except Exception as e:
+        print "rdflib JSON-LD not available: %s" % e
+        return False
+    return True
+
+
+def timed(function, *args):
+    t0 = time.time()
+    result = function(*args)
+    return (result, time.time() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000',
+                        help='comma separated numbers of annotations')
+    args = parser.parse_args()
+
+    methods = [('streaming', stream_write, stream_read)]
+    if rdflib_jsonld():
+        methods.append(('rdflib', graph_write, graph_read))
+
+    print "%10s %10s %10s %10s %10s" % ("annotations", "method", "bytes", "write", "read")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        collection = maus_collection(size)
+        collection.link_children(MAUS.orthographic, MAUS.phonetic)
+        for (name, write, read) in methods:
+            (data, write_seconds) = timed(write, collection)
+            (loaded, read_seconds) = timed(read, data, collection.corpusid)
+            assert len(loaded.annotations) == len(collection.annotations)
+            print "%10d %10s %10d %10.3f %10.3f" % (len(collection.annotations), name, len(data),
+                                                    write_seconds, read_seconds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Compare AnnotationCollection.link_children with the original nested loop
+
+Builds collections shaped like a MAUS TextGrid (tests/S1219s1.TextGrid):
+an ORT tier of words separated by pauses and a MAU tier of phones that
+exactly tile the ORT intervals.
+
+    python -m benchmarks.link_children --sizes 1000,10000,100000
+"""
+
+import argparse
+import random
+import time
+
+from rdflib import URIRef
+
+from annotationrdf import AnnotationCollection, SecondAnnotation
+from annotationrdf.namespaces import DADA, MAUS
+
+
+def maus_collection(nintervals, seed=0, collection_class=AnnotationCollection):
+    """Return a collection with about nintervals ORT and MAU annotations"""
+
+    rand = random.Random(seed)
+    collection = collection_class([], URIRef("http://example.org/corpora/bench"),
+                                  URIRef("http://example.org/corpora/bench/item1"),
+                                  SecondAnnotation)
+    now = 0.0
+    count = 0
+    while count < nintervals:
+        # a word of a few phones, or a pause which is a single phone
+        nphones = rand.choice([1, 2, 3, 4, 5, 6])
+        durations = [rand.uniform(0.03, 0.15) for i in range(nphones)]
+        end = now + sum(durations)
+        collection.add_annotation(MAUS.orthographic, "w", now, end)
+        for d in durations[:-1]:
+            collection.add_annotation(MAUS.phonetic, "p", now, now + d)
+            now += d
+        collection.add_annotation(MAUS.phonetic, "p", now, end)
+        now = end
+        count += nphones + 1
+
+    return collection
+
+
+def nested_link_children(collection, parenttier, childtier):
+    """The original O(parents x children) implementation of link_children"""
+
+    parents = [a for a in collection.annotations if a.tipe == parenttier]
+    children = [a for a in collection.annotations if a.tipe == childtier]
+
+    for parent in parents:
+        for child in children:
+            if child.start >= parent.start and child.end <= parent.end:
+                parent.add_child(child)
+
+
+def links(collection):
+    """Return the set of child links in the collection as id pairs"""
+
+    result = set()
+    for ann in collection.annotations:
+        for child in ann.get_children() or []:
+            result.add((ann.id, child))
+    return result
+
+
+def clear_links(collection):
+    for ann in collection.annotations:
+        if DADA.hasChild in ann:
+            del ann[DADA.hasChild]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help='comma separated numbers of intervals')
+    parser.add_argument('--nested-max', type=int, default=20000,
+                        help='largest size to run the nested loop on')
+    args = parser.parse_args()
+
+    print "%10s %12s %12s" % ("intervals", "indexed (s)", "nested (s)")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        collection = maus_collection(size)
+
+        t0 = time.time()
+        collection.link_children(MAUS.orthographic, MAUS.phonetic)
+        indexed = time.time() - t0
+
+        if size <= args.nested_max:
+            expected = links(collection)
+            clear_links(collection)
+            t0 = time.time()
+            nested_link_children(collection, MAUS.orthographic, MAUS.phonetic)
+            nested = "%12.3f" % (time.time() - t0)
+            assert links(collection) == expected, "links differ"
+        else:
+            nested = "%12s" % "skipped"
+
+        print "%10d %12.3f %s" % (len(collection.annotations), indexed, nested)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Compare the time and peak memory of reading every interval of a large
+TextGrid with TextGrid.load, TextGridReader and MappedTextGrid, and of
+reading only the headers or one tier lazily
+
+Each reader runs in a fresh process and memory is the growth in its
+peak resident size.  Pages of the mapped file count towards that size
+while they are touched, but they are shared with the page cache and can
+be dropped by the system, unlike the objects made by TextGrid.load.
+
+    python -m benchmarks.mapped_textgrid --duration 36000 --format short
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+from annotationrdf.textgrid import TextGrid, MappedTextGrid, textgrid_reader
+from benchmarks.generate import FORMATS, maus_tiers, write_textgrid
+
+
+def load(path):
+    tg = TextGrid.load(path)
+    return sum(len(tier.simple_transcript) for tier in tg)
+
+
+def stream(path):
+    with open(path, 'rb') as read_file:
+        return sum(1 for row in textgrid_reader(read_file))
+
+
+def mapped(path):
+    with MappedTextGrid(path) as tg:
+        return sum(sum(1 for times in tier.times()) for tier in tg)
+
+
+def headers(path):
+    return sum(tier.size or 0 for tier in TextGrid.load(path, lazy=True))
+
+
+def one_tier(path):
+    tg = TextGrid.load(path, tiers=['MAU'], lazy=True)
+    return len(tg.tiers[0].simple_transcript)
+
+
+READERS = [('TextGrid.load', load), ('TextGridReader', stream), ('MappedTextGrid', mapped),
+           ('lazy headers', headers), ('lazy MAU tier', one_tier)]
+
+
+def measure(reader, path, queue):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.time()
+    rows = reader(path)
+    seconds = time.time() - t0
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux
+    queue.put((rows, seconds, (after - before) / 1024.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=36000.0, help='seconds of speech')
+    parser.add_argument('--tiers', type=int, default=6, help='number of tiers')
+    parser.add_argument('--format', choices=FORMATS, default='short')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, 'big.TextGrid')
+        with open(path, 'wb') as out:
+            write_textgrid(out, maus_tiers(args.duration, args.tiers), args.format)
+        print "%s file of %.1fMB" % (args.format, os.path.getsize(path) / 1048576.0)
+        print "%16s %10s %10s %12s" % ("reader", "rows", "seconds", "peak MB")
+        for (name, reader) in READERS:
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=measure, args=(reader, path, queue))
+            process.start()
+            (rows, seconds, used) = queue.get()
+            process.join()
+            print "%16s %10d %10.3f %12.1f" % (name, rows, seconds, used)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Time each stage of converting synthetic MAUS TextGrids to RDF
+
+For each TextGrid format and duration a file is made by
+benchmarks.generate and then taken through the stages
+
+    load             TextGrid.load
+    maus_annotations building the collection, without linking
+    link_children    linking words to their canonical and phonetic children
+    to_rdf           adding the collection to an rdflib graph
+    serialize        Graph.serialize as Turtle
+    write_ntriples   the streaming N-Triples writer
+
+timing each separately, best of --repeat runs.  The results are written
+as JSON so that runs can be compared between commits:
+
+    python -m benchmarks.pipeline --duration 60,600 --output after.json
+    python -m benchmarks.pipeline --duration 60,600 --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from cStringIO import StringIO
+
+from rdflib import URIRef
+
+from annotationrdf.maus_textgrid import maus_annotations, link_maus_tiers
+from annotationrdf.textgrid import TextGrid
+from benchmarks.generate import FORMATS, PHONES, maus_tiers, write_textgrid
+
+
+STAGES = ['load', 'maus_annotations', 'link_children', 'to_rdf', 'serialize', 'write_ntriples']
+
+CORPUS = URIRef("http://example.org/corpora/corpus99")
+ITEM = URIRef("http://example.org/corpora/corpus99/item123")
+
+
+def timed(times, stage, function, *args, **kwargs):
+    """Call function, record the wall clock and CPU seconds it took
+    in times[stage] and return its result"""
+
+    wall = time.time()
+    cpu = time.clock()
+    result = function(*args, **kwargs)
+    times[stage] = {'wall': time.time() - wall, 'cpu': time.clock() - cpu}
+    return result
+
+
+def run_once(path):
+    """Take the TextGrid at path through each stage, return the times
+    and the counts of what was made"""
+
+    times = {}
+    textgrid = timed(times, 'load', TextGrid.load, path)
+    collection = timed(times, 'maus_annotations', maus_annotations, path, CORPUS, ITEM, link=False)
+    timed(times, 'link_children', link_maus_tiers, collection)
+    graph = timed(times, 'to_rdf', collection.to_rdf)
+    timed(times, 'serialize', graph.serialize, format='turtle')
+    timed(times, 'write_ntriples', collection.write_ntriples, StringIO())
+
+    counts = {'tiers': len(textgrid.tiers),
+              'intervals': sum(len(tier.simple_transcript) for tier in textgrid),
+              'annotations': len(collection.annotations),
+              'triples': len(graph),
+              }
+    return (times, counts)
+
+
+def run(path, repeat):
+    """Return the best times for each stage over repeat runs, and the counts"""
+
+    best = {}
+    for i in range(repeat):
+        (times, counts) = run_once(path)
+        for stage in STAGES:
+            if stage not in best or times[stage]['wall'] < best[stage]['wall']:
+                best[stage] = times[stage]
+    return (best, counts)
+
+
+def git_commit():
+    """The current commit of the working tree, or None if not known"""
+
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=open(os.devnull, 'w')).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def key(result):
+    return (result['format'], result['duration'], result['tiers'], result['alphabet'])
+
+
+def compare(results, previous):
+    """Print the ratio of each stage time to that of a previous run"""
+
+    before = dict((key(r), r) for r in previous['results'])
+    print
+    print "compared with %s" % (previous.get('commit') or 'previous run')
+    print "%6s %8s %18s %10s %10s %8s" % ("format", "seconds", "stage", "before", "after", "ratio")
+    for result in results:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        for stage in STAGES:
+            if stage not in old['stages']:
+                continue
+            (b, a) = (old['stages'][stage]['wall'], result['stages'][stage]['wall'])
+            print "%6s %8g %18s %10.3f %10.3f %8.2f" % (result['format'], result['duration'],
+                                                        stage, b, a, a / b if b else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', default='60,600',
+                        help='comma separated seconds of speech per file')
+    parser.add_argument('--formats', default=','.join(FORMATS),
+                        help='comma separated TextGrid formats (%s)' % ', '.join(FORMATS))
+    parser.add_argument('--tiers', type=int, default=3, help='number of tiers')
+    parser.add_argument('--alphabet', type=int, default=len(PHONES),
+                        help='number of distinct phone labels')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per file, the best is kept')
+    parser.add_argument('--output', '-o', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    args = parser.parse_args()
+
+    results = []
+    tmpdir = tempfile.mkdtemp()
+    try:
+        print "%6s %8s %10s %18s %10s %10s" % ("format", "seconds", "annotations", "stage", "wall", "cpu")
+        for duration in [float(d) for d in args.duration.split(',')]:
+            tiers = maus_tiers(duration, args.tiers, PHONES[:args.alphabet])
+            for fmt in args.formats.split(','):
+                path = os.path.join(tmpdir, '%s-%g.TextGrid' % (fmt, duration))
+                with open(path, 'wb') as out:
+                    write_textgrid(out, tiers, fmt)
+                (stages, counts) = run(path, args.repeat)
+                result = {'format': fmt,
+                          'duration': duration,
+                          'tiers': args.tiers,
+                          'alphabet': args.alphabet,
+                          'bytes': os.path.getsize(path),
+                          'counts': counts,
+                          'stages': stages,
+                          }
+                results.append(result)
+                for stage in STAGES:
+                    print "%6s %8g %10d %18s %10.3f %10.3f" % (fmt, duration, counts['annotations'], stage,
+                                                               stages[stage]['wall'], stages[stage]['cpu'])
+                sys.stdout.flush()
+    finally:
+        shutil.rmtree(tmpdir)
+
+    report = {'commit': git_commit(),
+              'python': platform.python_version(),
+              'platform': platform.platform(),
+              'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'repeat': args.repeat,
+              'results': results,
+              }
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(report, out, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Compare reading a collection back from N-Triples with
+AnnotationCollection.from_ntriples, in one pass over the lines, with
+parsing into an rdflib Graph and then using from_rdf
+
+    python -m benchmarks.rdf_load --sizes 10000,100000
+"""
+
+import argparse
+import time
+from cStringIO import StringIO
+
+from rdflib import Graph
+
+from annotationrdf import AnnotationCollection, ColumnarAnnotationCollection
+from annotationrdf.namespaces import MAUS
+from benchmarks.link_children import maus_collection
+
+
+def graph_load(data, corpusid):
+    graph = Graph().parse(data=data, format='nt')
+    return AnnotationCollection.from_rdf(graph, corpusid)
+
+
+def stream_load(data, corpusid):
+    return AnnotationCollection.from_ntriples(StringIO(data), corpusid)
+
+
+def columnar_load(data, corpusid):
+    return ColumnarAnnotationCollection.from_ntriples(StringIO(data), corpusid)
+
+
+METHODS = [('Graph + from_rdf', graph_load),
+           ('from_ntriples', stream_load),
+           ('columnar', columnar_load)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000',
+                        help='comma separated numbers of annotations')
+    args = parser.parse_args()
+
+    print "%10s %10s %18s %10s %12s" % ("annotations", "triples", "method", "seconds", "triples/s")
+    for size in [int(s) for s in args.sizes.split(',')]:
+        collection = maus_collection(size)
+        collection.link_children(MAUS.orthographic, MAUS.phonetic)
+        out = StringIO()
+        collection.write_ntriples(out)
+        data = out.getvalue()
+        ntriples = data.count('\n')
+
+        for (name, method) in METHODS:
+            t0 = time.time()
+            loaded = method(data, collection.corpusid)
+            seconds = time.time() - t0
+            assert len(loaded.annotations) == len(collection.annotations)
+            print "%10d %10d %18s %10.3f %12.0f" % (len(collection.annotations), ntriples, name,
+                                                    seconds, ntriples / seconds)
+
+
+if __name__ == '__main__':
+    main()
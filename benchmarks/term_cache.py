@@ -0,0 +1,74 @@
+"""Compare writing a collection with its terms shared through a
+TermCache against making a new term for every triple
+
+The time to write N-Triples and to build a Graph with to_rdf is the
+best of several runs; the memory is the growth in peak resident size
+while building the Graph, each in a fresh process so that the numbers
+include all of the terms the graph holds.
+
+    python -m benchmarks.term_cache --size 100000
+"""
+
+import argparse
+import multiprocessing
+import resource
+import time
+from cStringIO import StringIO
+
+from annotationrdf.terms import TermCache, NO_TERMS
+from benchmarks.link_children import maus_collection
+
+
+METHODS = [('TermCache', TermCache),
+           ('no interning', lambda: NO_TERMS)]
+
+
+def best_time(function, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        function()
+        seconds = time.time() - start
+        if best is None or seconds < best:
+            best = seconds
+    return best
+
+
+def measure(make_terms, size, queue):
+    collection = maus_collection(size)
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    graph = collection.to_rdf(terms=make_terms())
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux
+    queue.put((len(graph), (after - before) * 1024.0))
+
+
+def graph_memory(make_terms, size):
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=measure, args=(make_terms, size, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000,
+                        help='number of annotations')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of runs to take the best time from')
+    args = parser.parse_args()
+
+    collection = maus_collection(args.size)
+    print "%d annotations" % len(collection.annotations)
+    print "%15s %12s %12s %14s" % ("terms", "ntriples s", "to_rdf s", "graph MB")
+    for (name, make_terms) in METHODS:
+        ntriples = best_time(lambda: collection.write_ntriples(StringIO(), make_terms()), args.repeat)
+        to_rdf = best_time(lambda: collection.to_rdf(terms=make_terms()), args.repeat)
+        (triples, used) = graph_memory(make_terms, args.size)
+        print "%15s %12.3f %12.3f %14.1f" % (name, ntriples, to_rdf, used / 2 ** 20)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Compare reading TextGrids in each text format with TextGrid and with
+the original regular expression parser
+
+The original parser is loaded from the first commit with git, see
+benchmarks.baseline, and reads the whole file as one string.
+
+    python -m benchmarks.textgrid_parse --duration 3600
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from annotationrdf.textgrid import TextGrid
+from benchmarks.baseline import baseline_textgrid
+from benchmarks.generate import maus_tiers, write_textgrid
+
+
+def best_time(function, repeat):
+    best = None
+    for i in range(repeat):
+        t0 = time.time()
+        function()
+        seconds = time.time() - t0
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=3600.0,
+                        help='seconds of speech')
+    parser.add_argument('--tiers', type=int, default=3, help='number of tiers')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per file, the best is kept')
+    parser.add_argument('--baseline', help='git revision of the parser to compare with, '
+                        'the first commit by default')
+    args = parser.parse_args()
+
+    baseline = baseline_textgrid(args.baseline)
+    if baseline is None:
+        print "baseline parser not available from git"
+
+    tiers = maus_tiers(args.duration, args.tiers)
+    tmpdir = tempfile.mkdtemp()
+    try:
+        print "%8s %10s %10s %12s %12s" % ("format", "bytes", "rows", "TextGrid (s)", "baseline (s)")
+        for fmt in ('long', 'short', 'chron'):
+            path = os.path.join(tmpdir, fmt + '.TextGrid')
+            with open(path, 'wb') as out:
+                write_textgrid(out, tiers, fmt)
+            tg = TextGrid.load(path)
+            rows = sum(len(tier.simple_transcript) for tier in tg)
+            seconds = best_time(lambda: TextGrid.load(path), args.repeat)
+            if baseline is not None:
+                old = best_time(lambda: baseline.TextGrid(open(path).read()), args.repeat)
+            else:
+                old = float('nan')
+            print "%8s %10d %10d %12.3f %12.3f" % (fmt, os.path.getsize(path), rows, seconds, old)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Time writing a large TextGrid in each text format with TextGrid.write,
+and with the old string building to_chron for comparison
+
+    python -m benchmarks.textgrid_write --duration 3600 --old-duration 300
+"""
+
+import argparse
+import os
+import time
+from cStringIO import StringIO
+
+from annotationrdf.textgrid import TextGrid
+from benchmarks.generate import maus_tiers, write_textgrid
+
+
+TEXT_TYPES = ['ooTextFile', 'OldooTextFile', 'ChronTextFile']
+
+
+def old_to_chron(tg):
+    """TextGrid.to_chron before TextGrid.write, repeated += on a string
+    and a list search for the number of each tier"""
+
+    chron_file = ""
+    chron_file += "\"Praat chronological TextGrid text file\"\n"
+    chron_file += str(tg.xmin) + " " + str(tg.xmax)
+    chron_file += "   ! Time domain.\n"
+    chron_file += str(tg.size) + "   ! Number of tiers.\n"
+    for tier in tg.tiers:
+        idx = (tg.tiers.index(tier)) + 1
+        tier_header = "\"" + tier.classid + "\" \"" \
+                      + tier.nameid + "\" " + str(tier.xmin) \
+                      + " " + str(tier.xmax)
+        chron_file += tier_header + "\n"
+        transcript = tier.simple_transcript
+        for (xmin, xmax, utt) in transcript:
+            chron_file += str(idx) + " " + str(xmin)
+            chron_file += " " + str(xmax) + "\n"
+            chron_file += "\"" + utt + "\"\n"
+    return chron_file
+
+
+def textgrid(duration):
+    out = StringIO()
+    write_textgrid(out, maus_tiers(duration), 'short')
+    return TextGrid(out.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=3600.0, help='seconds of speech')
+    parser.add_argument('--old-duration', type=float, default=300.0,
+                        help='seconds of speech for the old to_chron, 0 to skip it')
+    args = parser.parse_args()
+
+    tg = textgrid(args.duration)
+    rows = sum(len(tier.simple_transcript) for tier in tg)
+    print "%d rows" % rows
+    print "%16s %10s %10s %12s %10s" % ("format", "rows", "seconds", "rows/s", "MB/s")
+    for text_type in TEXT_TYPES:
+        with open(os.devnull, 'wb') as out:
+            counted = CountingFile(out)
+            t0 = time.time()
+            tg.write(counted, text_type)
+            seconds = time.time() - t0
+        print "%16s %10d %10.3f %12.0f %10.1f" % (text_type, rows, seconds, rows / seconds,
+                                                  counted.size / seconds / 1048576)
+
+    if args.old_duration:
+        small = textgrid(args.old_duration)
+        rows = sum(len(tier.simple_transcript) for tier in small)
+        for (name, write) in (('old to_chron', old_to_chron), ('to_chron', TextGrid.to_chron)):
+            t0 = time.time()
+            text = write(small)
+            seconds = time.time() - t0
+            print "%16s %10d %10.3f %12.0f %10.1f" % (name, rows, seconds, rows / seconds,
+                                                      len(text) / seconds / 1048576)
+
+
+class CountingFile(object):
+    """Counts the bytes written to a file"""
+
+    def __init__(self, out):
+        self.out = out
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+        self.out.write(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -34,6 +34,11 @@ setup(
                  'annotationrdf'},
     include_package_data=True,
     install_requires=requirements,
+    entry_points={
+        'console_scripts': [
+            'maus2rdf = annotationrdf.batch:main',
+        ],
+    },
     license="BSD",
     zip_safe=False,
     keywords='annotationrdf',
@@ -9,9 +9,12 @@ Tests for `annotationrdf` module.
 """
 
 import unittest
-from rdflib import Namespace, Graph, Literal, XSD, URIRef
+from StringIO import StringIO
+from rdflib import Namespace, Graph, ConjunctiveGraph, Literal, XSD, URIRef
+from rdflib.compare import isomorphic
 
 import annotationrdf
+from annotationrdf import namespaces
 from annotationrdf.namespaces import DADA, MAUS
 
 class TestAnnotationrdf(unittest.TestCase):
@@ -85,6 +88,32 @@ class TestAnnotationrdf(unittest.TestCase):
 
         #print rdfstring
 
+    def test_annotation_uri_cache(self):
+        """Test that cached URIs change when ids are reassigned"""
+
+        corpusid = URIRef("http://example.org/corpora/corpus99")
+        itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+        collection = annotationrdf.AnnotationCollection([], corpusid, itemid)
+
+        MAU = URIRef("http://example.org/schema/maus/phonetic")
+
+        ann = collection.add_annotation(MAU, 'test', 1.0, 2.0, id='a1')
+        self.assertTrue(ann.uri() is ann.uri())
+        self.assertTrue(ann.locator_uri() is ann.locator_uri())
+
+        ann.id = 'a2'
+        self.assertEqual(Namespace(itemid)["/"+collection.id+"/annotation/a2"], ann.uri())
+        self.assertEqual(URIRef(ann.uri() + "L"), ann.locator_uri())
+
+        collection.id = 'c2'
+        self.assertEqual(Namespace(itemid)["/c2"], collection.uri())
+        self.assertEqual(Namespace(itemid)["/c2/annotation/a2"], ann.uri())
+
+        collection.itemid = URIRef("http://example.org/corpora/corpus99/item124")
+        self.assertEqual(URIRef("http://example.org/corpora/corpus99/item124/c2/annotation/a2L"),
+                         ann.locator_uri())
+
     def test_annotation_next(self):
         """Test adding 'next' relation between annotations"""
         
@@ -141,7 +170,7 @@ class TestAnnotationrdf(unittest.TestCase):
         collection = annotationrdf.AnnotationCollection([], corpusid, itemid, annotationrdf.SecondAnnotation)
         
         MAU = MAUS.phonetic
-        ORT = MAUS.orthography
+        ORT = MAUS.orthographic
         
         ort1 = collection.add_annotation(ORT, 'parent', 1.0, 3.0)
         ort2 = collection.add_annotation(ORT, 'parent1', 3.0, 5.0)
@@ -166,6 +195,55 @@ class TestAnnotationrdf(unittest.TestCase):
 
     
     
+    def test_annotations_of_type(self):
+        """Test finding the annotations of one type"""
+
+        corpusid = URIRef("http://example.org/corpora/corpus99")
+        itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+        MAU = MAUS.phonetic
+        ORT = MAUS.orthographic
+
+        ort1 = annotationrdf.Annotation(ORT, 'parent', 1.0, 3.0, annotationrdf.AnnotationCollection([], corpusid, itemid))
+        collection = annotationrdf.AnnotationCollection([ort1], corpusid, itemid)
+
+        ann1 = collection.add_annotation(MAU, 'c1', 1.0, 2.0)
+        ort2 = collection.add_annotation(ORT, 'parent1', 3.0, 5.0)
+        ann2 = collection.add_annotation(MAU, 'c2', 2.0, 3.0)
+
+        self.assertEqual([ORT, MAU], collection.types())
+        self.assertEqual([ort1, ort2], collection.annotations_of_type(ORT))
+        self.assertEqual([ann1, ann2], collection.annotations_of_type(MAU))
+        self.assertEqual([], collection.annotations_of_type(MAUS.canonical))
+
+    def test_annotations_added_directly(self):
+        """Test that annotations appended to the list or changed in type are indexed and linked"""
+
+        corpusid = URIRef("http://example.org/corpora/corpus99")
+        itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+        MAU = MAUS.phonetic
+        ORT = MAUS.orthographic
+
+        annotations = []
+        collection = annotationrdf.AnnotationCollection(annotations, corpusid, itemid)
+        ort1 = collection.add_annotation(ORT, 'parent', 1.0, 3.0)
+        ann1 = annotationrdf.Annotation(MAU, 'c1', 1.0, 2.0, collection)
+        annotations.append(ann1)
+        ann2 = annotationrdf.Annotation(ORT, 'c2', 2.0, 3.0, collection)
+        collection.annotations.append(ann2)
+
+        self.assertEqual([ann1], collection.annotations_of_type(MAU))
+        self.assertEqual([ort1, ann2], collection.annotations_of_type(ORT))
+
+        # a changed type is found by link_children, and by the index once reindexed
+        ann2.tipe = MAU
+        self.assertEqual(2, collection.link_children(ORT, MAU))
+        self.assertEqual([ann1.uri(), ann2.uri()], ort1.get_children())
+        collection.reindex()
+        self.assertEqual([ann1, ann2], collection.annotations_of_type(MAU))
+        self.assertEqual([ORT, MAU], collection.types())
+
     def test_create_second_annotation(self):
         """Test creation of annotations of a different type"""
         
@@ -205,6 +283,175 @@ class TestAnnotationrdf(unittest.TestCase):
         
         #print rdfstring
         
+    def test_to_rdf_chunks(self):
+        """Test that adding triples in chunks gives the same graph"""
+
+        corpusid = URIRef("http://example.org/corpora/corpus99")
+        itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+        collection = annotationrdf.AnnotationCollection([], corpusid, itemid, annotationrdf.SecondAnnotation)
+
+        MAU = URIRef("http://example.org/schema/maus/phonetic")
+
+        last = None
+        for i in range(20):
+            ann = collection.add_annotation(MAU, 'p%d' % (i % 3), i, i + 1)
+            if last:
+                last.set_next(ann)
+            last = ann
+
+        expected = Graph()
+        for triple in collection.triples():
+            expected.add(triple)
+
+        for chunksize in (1, 7, 1000):
+            graph = collection.to_rdf(chunksize=chunksize)
+            self.assertEqual(set(expected), set(graph))
+
+        graph = collection.to_rdf(ConjunctiveGraph())
+        self.assertEqual(set(expected), set(graph.default_context))
+
+    def test_write_ntriples_escapes(self):
+        """Test that awkward labels survive streaming output"""
+
+        corpusid = URIRef("http://example.org/corpora/corpus99")
+        itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+        collection = annotationrdf.AnnotationCollection([], corpusid, itemid, annotationrdf.HMSAnnotation)
+
+        MAU = URIRef("http://example.org/schema/maus/phonetic")
+
+        collection.add_annotation(MAU, u'a "quoted"\nlabel \\ caf\xe9', '00:00:01', '00:00:02',
+                                  properties={'speakerid': 'spk1'})
+
+        out = StringIO()
+        collection.write_ntriples(out)
+        graph = Graph().parse(data=out.getvalue(), format='nt')
+
+        self.assertTrue(isomorphic(collection.to_rdf(), graph))
+
+    def test_from_rdf(self):
+        """Test reading a collection back from its RDF"""
+
+        corpusid = URIRef("http://example.org/corpora/corpus99")
+        itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+        collection = annotationrdf.maus_annotations("tests/S1219s1.TextGrid", corpusid, itemid)
+        graph = collection.to_rdf()
+
+        out = StringIO()
+        collection.write_ntriples(out)
+        out.seek(0)
+
+        for copy in (annotationrdf.AnnotationCollection.from_rdf(graph, corpusid),
+                     annotationrdf.AnnotationCollection.from_ntriples(out, corpusid),
+                     annotationrdf.ColumnarAnnotationCollection.from_rdf(graph, corpusid)):
+            self.assertTrue(isomorphic(graph, copy.to_rdf()))
+            self.assertEqual(collection.uri(), copy.uri())
+            self.assertEqual(corpusid, copy.corpusID())
+            self.assertEqual(collection.types(), copy.types())
+            for (a, b) in zip(collection.annotations, copy.annotations):
+                self.assertTrue(isinstance(b, annotationrdf.SecondAnnotation))
+                self.assertEqual((a.id, a['val']), (b.id, b['val']))
+                # times are as precise as the literals in the RDF
+                self.assertAlmostEqual(a.start, b.start, 9)
+                self.assertAlmostEqual(a.end, b.end, 9)
+                self.assertEqual(a.get_children(), b.get_children())
+
+        # new annotations don't reuse the ids read
+        ann = copy.add_annotation(MAUS.phonetic, 'x', 9.0, 9.5)
+        self.assertFalse(ann.id in [a.id for a in collection.annotations])
+
+        # other kinds of locator and properties
+        collection = annotationrdf.AnnotationCollection([], corpusid, itemid, annotationrdf.HMSAnnotation)
+        first = collection.add_annotation(MAUS.phonetic, u'caf\xe9 "1"\n', '00:00:01', '00:00:02',
+                                          id='a', properties={'speakerid': 'spk1', 'notes': ['x', 'y']})
+        second = collection.add_annotation(MAUS.phonetic, 'b', '00:00:02', '00:00:03', id='b')
+        first.set_next(second)
+
+        out = StringIO()
+        collection.write_ntriples(out)
+        out.seek(0)
+        copy = annotationrdf.AnnotationCollection.from_ntriples(out, corpusid)
+
+        self.assertTrue(isomorphic(collection.to_rdf(), copy.to_rdf()))
+        (a, b) = copy.annotations
+        self.assertTrue(isinstance(a, annotationrdf.HMSAnnotation))
+        self.assertEqual(u'00:00:01', a.start)
+        self.assertEqual(u'caf\xe9 "1"\n', a['val'])
+        self.assertEqual('spk1', a['speakerid'])
+        self.assertEqual(['x', 'y'], sorted(a['notes']))
+        self.assertEqual(b.uri(), a.get_next())
+
+        self.assertRaises(TypeError, annotationrdf.AnnotationCollection.from_rdf, Graph())
+
+    def test_jsonld(self):
+        """Test writing JSON-LD and reading it back"""
+
+        corpusid = URIRef("http://example.org/corpora/corpus99")
+        itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+        collection = annotationrdf.maus_annotations("tests/S1219s1.TextGrid", corpusid, itemid)
+        first = collection.annotations[0]
+        first['speakerid'] = 'spk1'
+        first['notes'] = [u'caf\xe9', 'two "quoted"\nlines']
+        first[DADA.source] = URIRef("http://example.org/source")
+
+        out = StringIO()
+        collection.write_jsonld(out)
+        lines = out.getvalue().splitlines(True)
+        self.assertEqual(len(collection.annotations) * 2 + 4, len(lines))
+
+        copy = annotationrdf.AnnotationCollection.from_jsonld(lines, corpusid)
+        self.assertTrue(isomorphic(collection.to_rdf(), copy.to_rdf()))
+        self.assertEqual(URIRef("http://example.org/source"), copy.annotations[0][DADA.source])
+
+        # nested nodes, compact IRIs and typed values written by hand
+        document = """{
+          "@context": {"dada": "http://purl.org/dada/schema/0.2#",
+                       "maus": "http://ns.ausnc.org.au/schemas/annotation/maus/",
+                       "type": {"@id": "dada:type", "@type": "@id"}},
+          "@graph": [
+            {"@id": "http://example.org/c/1/annotation/a",
+             "@type": "dada:Annotation",
+             "dada:partof": {"@id": "http://example.org/c/1"},
+             "type": "maus:phonetic",
+             "dada:label": {"@value": "hello", "@language": "en"},
+             "dada:targets": {"@id": "http://example.org/c/1/annotation/aL",
+                              "@type": "dada:TextRegion",
+                              "dada:start": 3,
+                              "dada:end": {"@value": "7",
+                                           "@type": "http://www.w3.org/2001/XMLSchema#integer"}}},
+            {"@id": "http://example.org/c/1", "@type": "dada:AnnotationCollection",
+             "dada:annotates": {"@id": "http://example.org/c"}}
+          ]
+        }"""
+        copy = annotationrdf.AnnotationCollection.from_jsonld(StringIO(document))
+        (ann,) = copy.annotations
+        self.assertEqual((3, 7, 'hello', MAUS.phonetic), (ann.start, ann.end, ann['val'], ann.tipe))
+        self.assertEqual(URIRef("http://example.org/c/1/annotation/a"), ann.uri())
+
+    def test_bind_graph(self):
+        """Test binding the namespace template and corpus namespaces"""
+
+        graph = namespaces.bind_graph(Graph())
+        bound = dict(graph.namespaces())
+        self.assertEqual(URIRef(DADA), bound['dada'])
+        self.assertTrue(graph.store in namespaces.TEMPLATE.stores)
+
+        # binding again to a graph on the same store does nothing
+        calls = []
+        other = Graph(store=graph.store)
+        other.bind = lambda prefix, ns: calls.append(prefix)
+        namespaces.bind_graph(other)
+        self.assertEqual([], calls)
+
+        before = dict(namespaces.NAMESPACES)
+        ns = namespaces.corpus_property_namespace('Corpus99', graph)
+        self.assertEqual(before, namespaces.NAMESPACES)
+        self.assertEqual(URIRef(ns), dict(graph.namespaces())['corpus99'])
+        self.assertFalse('corpus99' in dict(namespaces.bind_graph(Graph()).namespaces()))
+
     def tearDown(self):
         pass
 
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_batch
+----------------------------------
+
+Tests for `annotationrdf.batch` module.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from cStringIO import StringIO
+from rdflib import Graph, URIRef
+
+from annotationrdf import batch
+from annotationrdf.namespaces import DADA
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.indir = os.path.join(self.tmpdir, 'in')
+        self.outdir = os.path.join(self.tmpdir, 'out')
+        os.makedirs(os.path.join(self.indir, 'sub'))
+        shutil.copy("tests/S1219s1.TextGrid", os.path.join(self.indir, 'item1.TextGrid'))
+        shutil.copy("tests/S1219s1.TextGrid", os.path.join(self.indir, 'sub', 'item2.TextGrid'))
+        with open(os.path.join(self.indir, 'bad.TextGrid'), 'w') as out:
+            out.write('not a textgrid\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_find_textgrids(self):
+        """Test finding input files from directories and patterns"""
+
+        paths = batch.find_textgrids([self.indir])
+        self.assertEqual(['bad', 'item1', 'item2'], sorted(batch.item_id(p) for p in paths))
+
+        paths = batch.find_textgrids([os.path.join(self.indir, 'item*')])
+        self.assertEqual([os.path.join(self.indir, 'item1.TextGrid')], paths)
+
+    def test_batch_convert(self):
+        """Test converting a directory in parallel, with one bad file"""
+
+        status = batch.main(['--corpus', 'corpus99', '--output', self.outdir,
+                             '--jobs', '2', '--format', 'nt', self.indir])
+
+        self.assertEqual(1, status)
+        self.assertEqual(['item1.nt', 'item2.nt'], sorted(os.listdir(self.outdir)))
+
+        graph = Graph().parse(os.path.join(self.outdir, 'item2.nt'), format='nt')
+        item = URIRef("http://ns.ausnc.org.au/corpora/corpus99/items/item2")
+        self.assertEqual(1, len(list(graph.subjects(DADA.annotates, item))))
+
+    def test_duplicate_items(self):
+        """Test that files for the same item in different directories are refused"""
+
+        other = os.path.join(self.tmpdir, 'other')
+        os.makedirs(other)
+        shutil.copy("tests/S1219s1.TextGrid", os.path.join(other, 'item1.TextGrid'))
+        paths = batch.find_textgrids([self.indir, other])
+        self.assertEqual({'item1': [os.path.join(self.indir, 'item1.TextGrid'),
+                                    os.path.join(other, 'item1.TextGrid')]},
+                         batch.duplicate_items(paths))
+
+        stderr = sys.stderr
+        sys.stderr = StringIO()
+        try:
+            self.assertRaises(SystemExit, batch.main, ['--corpus', 'corpus99', '--output', self.outdir,
+                                                       self.indir, other])
+            self.assertTrue('item1' in sys.stderr.getvalue())
+        finally:
+            sys.stderr = stderr
+        self.assertFalse(os.path.exists(self.outdir))
+
+    def test_batch_cache(self):
+        """Test that unchanged files are copied from the cache"""
+
+        cache = os.path.join(self.tmpdir, 'cache')
+        args = ['--corpus', 'corpus99', '--output', self.outdir, '--jobs', '1',
+                '--format', 'nt', '--cache', cache, self.indir]
+
+        results = []
+        for i in range(2):
+            shutil.rmtree(self.outdir, ignore_errors=True)
+            batch.main(args)
+            with open(os.path.join(self.outdir, 'item1.nt')) as f:
+                results.append(f.read())
+        self.assertEqual(results[0], results[1])
+
+        # converting again uses the cache
+        path = os.path.join(self.indir, 'item1.TextGrid')
+        [(path, outpath, seconds, error, stats)] = batch.convert_all([path], self.outdir, 'corpus99', fmt='nt',
+                                                                     cache=(cache, 1 << 20))
+        self.assertEqual(None, error)
+        self.assertTrue(stats['cached'])
+
+
+if __name__ == '__main__':
+    unittest.main()
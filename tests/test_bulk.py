@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_bulk
+----------------------------------
+
+Tests for `annotationrdf.bulk` module.
+"""
+
+import unittest
+from rdflib import Graph, ConjunctiveGraph, URIRef
+from rdflib.compare import isomorphic
+from rdflib.plugins.memory import IOMemory
+from rdflib.plugins.stores.auditable import AuditableStore
+
+import annotationrdf
+from annotationrdf import Instruments, bulk_load
+
+
+class CountingGraph(Graph):
+    """A graph that counts commits and rollbacks"""
+
+    commits = 0
+    rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+        Graph.commit(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        Graph.rollback(self)
+
+
+class TestBulk(unittest.TestCase):
+
+    corpusid = URIRef("http://example.org/corpora/corpus99")
+
+    def transactional(self):
+        """A graph on a store that can roll back"""
+
+        return CountingGraph(store=AuditableStore(IOMemory()))
+
+    def collections(self, n):
+        for i in range(n):
+            yield annotationrdf.maus_annotations("tests/S1219s1.TextGrid", self.corpusid,
+                                                 URIRef("http://example.org/corpora/corpus99/item%d" % i))
+
+    def test_bulk_load(self):
+        """Test loading several collections in transactions"""
+
+        collections = list(self.collections(5))
+        expected = Graph()
+        for collection in collections:
+            collection.to_rdf(expected)
+
+        graph = self.transactional()
+        instruments = Instruments()
+        self.assertEqual(5 * 146, bulk_load(graph, iter(collections), transaction_size=300,
+                                            chunksize=100, instruments=instruments))
+        self.assertTrue(isomorphic(expected, graph))
+        self.assertEqual(3, graph.commits)
+        stats = instruments.stats()
+        self.assertEqual((5, 730, 3), (stats['items'], stats['triples'], stats['transactions']))
+
+        # no commits for a store without transactions
+        graph = CountingGraph()
+        self.assertFalse(graph.store.transaction_aware)
+        self.assertEqual(5 * 146, bulk_load(graph, collections, transaction_size=300, chunksize=100))
+        self.assertTrue(isomorphic(expected, graph))
+        self.assertEqual(0, graph.commits)
+
+        # a ConjunctiveGraph gets them in its default context
+        graph = ConjunctiveGraph()
+        bulk_load(graph, collections)
+        self.assertTrue(isomorphic(expected, graph.default_context))
+
+        self.assertEqual(0, bulk_load(CountingGraph(), []))
+
+    def test_rollback(self):
+        """Test that the transaction is rolled back when an item fails"""
+
+        def failing():
+            for collection in self.collections(2):
+                yield collection
+            raise ValueError("bad item")
+
+        graph = self.transactional()
+        self.assertRaises(ValueError, bulk_load, graph, failing(), transaction_size=200, chunksize=100)
+        self.assertEqual(1, graph.commits)
+        self.assertEqual(1, graph.rollbacks)
+        # the first 200 triples were committed, the rest rolled back
+        self.assertEqual(200, len(graph))
+
+        # without transactions the chunks added are left, not the one
+        # being made when the item failed
+        graph = CountingGraph()
+        self.assertRaises(ValueError, bulk_load, graph, failing(), transaction_size=1000, chunksize=100)
+        self.assertEqual((0, 0), (graph.commits, graph.rollbacks))
+        self.assertEqual(200, len(graph))
+
+
+if __name__ == '__main__':
+    unittest.main()
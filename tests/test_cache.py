@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_cache
+----------------------------------
+
+Tests for `annotationrdf.cache` module.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from rdflib import URIRef
+from rdflib.compare import isomorphic
+
+import annotationrdf
+from annotationrdf import cache
+from annotationrdf.cache import ConversionCache
+
+
+class TestCache(unittest.TestCase):
+
+    corpusid = URIRef("http://example.org/corpora/corpus99")
+    itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache = ConversionCache(os.path.join(self.tmpdir, 'cache'), max_bytes=2500)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def output(self, name, size):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'wb') as out:
+            out.write(name[0] * size)
+        return path
+
+    def test_key(self):
+        """Test that keys depend on the file and the options"""
+
+        key = self.cache.key("tests/S1219s1.TextGrid", self.corpusid, self.itemid, 'nt')
+        self.assertEqual(key, self.cache.key("tests/S1219s1.TextGrid", self.corpusid, self.itemid, 'nt'))
+        self.assertNotEqual(key, self.cache.key("tests/S1219s1.TextGrid", self.corpusid, self.itemid, 'turtle'))
+        self.assertNotEqual(key, self.cache.key("tests/S1219s1.TextGrid", self.corpusid, self.corpusid, 'nt'))
+
+        other = self.output('other.TextGrid', 10)
+        self.assertNotEqual(key, self.cache.key(other, self.corpusid, self.itemid, 'nt'))
+
+        # a change to the output misses the cache
+        outpath = os.path.join(self.tmpdir, 'fetched')
+        self.cache.store(key, self.output('output', 10))
+        version = cache.OUTPUT_VERSION
+        cache.OUTPUT_VERSION += 1
+        try:
+            newkey = self.cache.key("tests/S1219s1.TextGrid", self.corpusid, self.itemid, 'nt')
+        finally:
+            cache.OUTPUT_VERSION = version
+        self.assertNotEqual(key, newkey)
+        self.assertFalse(self.cache.fetch(newkey, outpath))
+        self.assertTrue(self.cache.fetch(key, outpath))
+
+    def test_fetch(self):
+        """Test storing and fetching output, with the least recently used evicted"""
+
+        outpath = os.path.join(self.tmpdir, 'fetched')
+        self.assertFalse(self.cache.fetch('aaaa', outpath))
+
+        for name in ('aaaa', 'bbbb'):
+            self.cache.store(name, self.output(name, 1000))
+        # make aaaa the most recently used
+        os.utime(self.cache.path('bbbb'), (0, 0))
+        self.assertTrue(self.cache.fetch('aaaa', outpath))
+        with open(outpath) as f:
+            self.assertEqual('a' * 1000, f.read())
+
+        self.cache.store('cccc', self.output('cccc', 1000))
+        self.assertTrue(self.cache.fetch('aaaa', outpath))
+        self.assertFalse(self.cache.fetch('bbbb', outpath))
+        self.assertTrue(self.cache.fetch('cccc', outpath))
+        self.assertEqual(2000, self.cache.size)
+        self.assertEqual(3, self.cache.stats()['cache_hits'])
+
+        # storing an entry again replaces it
+        self.cache.store('cccc', self.output('cccc', 500))
+        self.assertEqual(1500, self.cache.size)
+        self.assertTrue(self.cache.fetch('aaaa', outpath))
+
+    def test_collection(self):
+        """Test storing a pickled collection"""
+
+        collection = annotationrdf.maus_annotations("tests/S1219s1.TextGrid", self.corpusid, self.itemid,
+                                                    annotationrdf.ColumnarAnnotationCollection,
+                                                    stable_ids=True)
+        key = self.cache.key("tests/S1219s1.TextGrid", self.corpusid, self.itemid, 'collection')
+        self.assertEqual(None, self.cache.load_collection(key))
+        self.cache.store_collection(key, collection)
+
+        copy = self.cache.load_collection(key)
+        self.assertTrue(isinstance(copy, annotationrdf.ColumnarAnnotationCollection))
+        self.assertTrue(isomorphic(collection.to_rdf(), copy.to_rdf()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_columnar
+----------------------------------
+
+Tests for `annotationrdf.columnar` module.
+"""
+
+import unittest
+from rdflib import Namespace, Graph, Literal, XSD, URIRef
+from rdflib.compare import isomorphic
+
+import annotationrdf
+from annotationrdf.namespaces import DADA, MAUS
+
+
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.corpusid = URIRef("http://example.org/corpora/corpus99")
+        self.itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+    def test_create_annotation(self):
+        """Test annotations are views of the columns"""
+
+        collection = annotationrdf.ColumnarAnnotationCollection([], self.corpusid, self.itemid,
+                                                                annotationrdf.SecondAnnotation)
+
+        ann1 = collection.add_annotation(MAUS.phonetic, 'a', '1.0', 2.0, properties={'size': 'one'})
+        ann2 = collection.add_annotation(MAUS.phonetic, 'b', 2.0, 3.0, id='foobar')
+
+        self.assertTrue(isinstance(ann1, annotationrdf.SecondAnnotation))
+        self.assertEqual(2, len(collection.annotations))
+        self.assertEqual(1.0, ann1.start)
+        self.assertEqual(MAUS.phonetic, ann1.tipe)
+        self.assertEqual(set(['val', 'size']), set(ann1.keys()))
+        self.assertEqual('foobar', ann2.id)
+        self.assertEqual(Namespace(self.itemid)["/"+collection.id+"/annotation/foobar"], ann2.uri())
+
+        ann1.set_next(ann2)
+        ann1['val'] = 'c'
+        ann = collection.annotations[0]
+        self.assertEqual(ann2.uri(), ann.get_next())
+        self.assertEqual('c', ann['val'])
+        self.assertEqual(ann1.uri(), ann.uri())
+        self.assertEqual(['a', 'b', 'c'], collection.label_codes.values)
+
+        del ann[DADA.next]
+        self.assertEqual(None, ann1.get_next())
+
+    def test_annotations_of_type(self):
+        """Test the index of rows by type"""
+
+        collection = annotationrdf.ColumnarAnnotationCollection([], self.corpusid, self.itemid)
+
+        ort = collection.add_annotation(MAUS.orthographic, 'w', 0, 10)
+        ann1 = collection.add_annotation(MAUS.phonetic, 'a', 0, 5)
+        ann2 = collection.add_annotation(MAUS.phonetic, 'b', 5, 10)
+
+        self.assertEqual([MAUS.orthographic, MAUS.phonetic], collection.types())
+        self.assertEqual([ann1.uri(), ann2.uri()],
+                         [a.uri() for a in collection.annotations_of_type(MAUS.phonetic)])
+
+        ann1.tipe = MAUS.orthographic
+        self.assertEqual([0, 1], list(collection.rows_of_type(MAUS.orthographic)))
+        self.assertEqual([2], list(collection.rows_of_type(MAUS.phonetic)))
+
+        collection.link_children(MAUS.orthographic, MAUS.phonetic)
+        self.assertEqual([ann2.uri()], ort.get_children())
+        self.assertEqual(None, ann1.get_children())
+
+    def test_same_rdf(self):
+        """Test the columnar collection gives the same RDF for a MAUS file"""
+
+        tf = "tests/S1219s1.TextGrid"
+
+        # the same generated ids for both, without changing them for other tests
+        uniqueid = annotationrdf.Annotation.uniqueid
+        try:
+            annotationrdf.Annotation.uniqueid = 0
+            collection = annotationrdf.maus_annotations(tf, self.corpusid, self.itemid)
+            annotationrdf.Annotation.uniqueid = 0
+            columnar = annotationrdf.maus_annotations(tf, self.corpusid, self.itemid,
+                                                      annotationrdf.ColumnarAnnotationCollection)
+        finally:
+            annotationrdf.Annotation.uniqueid = uniqueid
+        columnar.id = collection.id
+
+        self.assertEqual(len(collection.annotations), len(columnar.annotations))
+        self.assertTrue(isomorphic(collection.to_rdf(), columnar.to_rdf()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_delta
+----------------------------------
+
+Tests for `annotationrdf.delta` module.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from cStringIO import StringIO
+from rdflib import Graph, ConjunctiveGraph, URIRef, Literal, BNode, RDFS
+from rdflib.compare import isomorphic
+
+import annotationrdf
+from annotationrdf import AnnotationCollection, diff
+from annotationrdf.delta import read_patch
+from annotationrdf.namespaces import MAUS
+from annotationrdf.textgrid import TextGrid
+
+
+class TestDelta(unittest.TestCase):
+
+    corpusid = URIRef("http://example.org/corpora/corpus99")
+    itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+    def versions(self):
+        """Two conversions of the same item with one phone boundary moved in the second"""
+
+        (old, new) = [annotationrdf.maus_annotations("tests/S1219s1.TextGrid", self.corpusid, self.itemid,
+                                                     stable_ids=True) for i in range(2)]
+        (first, second) = new.annotations_of_type(annotationrdf.namespaces.MAUS.phonetic)[1:3]
+        first.end = second.start = first.end + 0.01
+        return (old, new)
+
+    def test_stable_ids(self):
+        """Test that converting an item again gives the same RDF"""
+
+        (old, new) = self.versions()
+        self.assertEqual(old.uri(), new.uri())
+        self.assertEqual('MAU0', new.annotations_of_type(annotationrdf.namespaces.MAUS.phonetic)[0].id)
+        self.assertEqual(len(old.to_rdf()) - 2, len(set(old.triples()) & set(new.triples())))
+
+    def test_diff(self):
+        """Test the difference between two versions and applying it"""
+
+        (old, new) = self.versions()
+        change = diff(old, new)
+        self.assertEqual(2, len(change.removed))
+        self.assertEqual(2, len(change.added))
+        self.assertFalse(diff(new, new))
+
+        graph = change.apply(old.to_rdf())
+        self.assertTrue(isomorphic(new.to_rdf(), graph))
+
+        # from the stored RDF of the old version
+        out = StringIO()
+        old.write_ntriples(out)
+        out.seek(0)
+        stored = AnnotationCollection.from_ntriples(out, self.corpusid)
+        self.assertEqual(change.added, diff(stored, new).added)
+        self.assertEqual(change.added, diff(old.to_rdf(), new).added)
+
+    def test_insertion(self):
+        """Test that dropping or adding a phone, which renumbers the rest
+        of the tier, only changes the triples around it"""
+
+        full = annotationrdf.maus_annotations("tests/S1219s1.TextGrid", self.corpusid, self.itemid,
+                                              stable_ids=True)
+        # the same item with the second phone merged into the first
+        tg = TextGrid.load("tests/S1219s1.TextGrid")
+        tier = [t for t in tg.tiers if t.nameid == 'MAU'][0]
+        rows = tier.simple_transcript
+        tier.simple_transcript = rows[:1] + [(rows[1][0], rows[2][1], rows[1][2])] + rows[3:]
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'merged.TextGrid')
+            with open(path, 'wb') as out:
+                tg.write(out)
+            merged = annotationrdf.maus_annotations(path, self.corpusid, self.itemid, stable_ids=True)
+        finally:
+            shutil.rmtree(tmpdir)
+
+        for (old, new) in ((full, merged), (merged, full)):
+            change = diff(old, new)
+            # the phone and its locator, the end and next of the one
+            # before, and its link from the word
+            self.assertEqual(14, len(change), sorted(change.removed) + sorted(change.added))
+            self.assertTrue(len(diff(old, new, align=False)) > 40)
+
+            graph = change.apply(old.to_rdf())
+            result = AnnotationCollection.from_rdf(graph, self.corpusid)
+            for tipe in (MAUS.phonetic, MAUS.orthographic):
+                # times in RDF have 12 digits
+                self.assertEqual([(round(a.start, 9), round(a.end, 9), a['val'])
+                                  for a in new.annotations_of_type(tipe)],
+                                 sorted((round(a.start, 9), round(a.end, 9), a['val'])
+                                        for a in result.annotations_of_type(tipe)))
+
+        # the added phone can't have the URI of the phone after it
+        change = diff(merged, full)
+        phone = [a for a in full.annotations_of_type(MAUS.phonetic) if a['val'] == '{'][0]
+        added = set(s for (s, p, o) in change.added if o == Literal(phone['val']))
+        self.assertEqual([URIRef(phone.uri() + '-1')], list(added))
+
+    def test_patch(self):
+        """Test writing and reading an RDF Patch"""
+
+        (old, new) = self.versions()
+        change = diff(old, new)
+
+        out = StringIO()
+        self.assertEqual(4, change.write_patch(out))
+        lines = out.getvalue().splitlines(True)
+        self.assertEqual(['D', 'D', 'A', 'A'], [line[0] for line in lines])
+
+        patch = read_patch(lines)
+        self.assertEqual(change.removed, patch.removed)
+        self.assertEqual(change.added, patch.added)
+
+        self.assertRaises(TypeError, read_patch, ['X <http://a> <http://b> <http://c> .\n'])
+
+    def test_sparql(self):
+        """Test that the SPARQL Update makes the change"""
+
+        (old, new) = self.versions()
+        change = diff(old, new)
+
+        out = StringIO()
+        change.write_sparql(out, chunksize=1)
+        self.assertEqual(2, out.getvalue().count('DELETE DATA'))
+        graph = old.to_rdf()
+        graph.update(out.getvalue())
+        self.assertTrue(isomorphic(new.to_rdf(), graph))
+
+        # in a named graph
+        name = URIRef("http://example.org/graphs/item123")
+        store = ConjunctiveGraph()
+        store.get_context(name).addN((s, p, o, store.get_context(name)) for (s, p, o) in old.triples())
+        out = StringIO()
+        change.write_sparql(out, graph=name)
+        store.update(out.getvalue())
+        self.assertTrue(isomorphic(new.to_rdf(), store.get_context(name)))
+
+        out = StringIO()
+        diff(old, old).write_sparql(out)
+        self.assertEqual('', out.getvalue())
+
+    def test_sparql_bnodes(self):
+        """Test that removed triples with blank nodes are deleted by pattern"""
+
+        (old, new) = self.versions()
+        graph = old.to_rdf()
+        (a, b) = (BNode(), BNode())
+        extra = [(old.uri(), RDFS.seeAlso, a), (a, RDFS.label, Literal(u'x')),
+                 (a, RDFS.seeAlso, b), (b, RDFS.label, Literal(u'y')),
+                 (BNode(), RDFS.label, Literal(u'z'))]
+        for triple in extra:
+            graph.add(triple)
+        change = diff(graph, new)
+        self.assertEqual(len(extra) + 2, len(change.removed))
+
+        out = StringIO()
+        change.write_sparql(out)
+        self.assertEqual(2, out.getvalue().count('DELETE WHERE'))
+        self.assertFalse('_:' in out.getvalue())
+        graph.update(out.getvalue())
+        self.assertTrue(isomorphic(new.to_rdf(), graph))
+
+
+if __name__ == '__main__':
+    unittest.main()
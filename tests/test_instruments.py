@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_instruments
+----------------------------------
+
+Tests for `annotationrdf.instruments` module.
+"""
+
+import unittest
+from cStringIO import StringIO
+from rdflib import URIRef
+
+import annotationrdf
+from annotationrdf import Instruments
+
+
+class TestInstruments(unittest.TestCase):
+
+    def test_stages(self):
+        """Test that times and counts add up and are passed to the callback"""
+
+        seen = []
+        instruments = Instruments(lambda name, value: seen.append(name))
+        for i in range(2):
+            with instruments.stage('parse'):
+                pass
+            instruments.count('tiers', 3)
+
+        stats = instruments.stats()
+        self.assertEqual(['parse.wall', 'parse.cpu', 'tiers'], stats.keys())
+        self.assertEqual(6, stats['tiers'])
+        self.assertTrue(stats['parse.wall'] >= 0)
+        self.assertEqual(['parse.wall', 'parse.cpu', 'tiers'] * 2, seen)
+
+    def test_maus(self):
+        """Test the counts recorded while converting a MAUS TextGrid"""
+
+        corpusid = URIRef("http://example.org/corpora/corpus99")
+        itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+        instruments = Instruments()
+        collection = annotationrdf.maus_annotations("tests/S1219s1.TextGrid", corpusid, itemid,
+                                                    instruments=instruments)
+        graph = collection.to_rdf(instruments=instruments)
+        collection.write_ntriples(StringIO(), instruments=instruments)
+
+        stats = instruments.stats()
+        for stage in ('parse', 'link', 'to_rdf', 'serialize'):
+            self.assertTrue(stage + '.wall' in stats)
+            self.assertTrue(stage + '.cpu' in stats)
+        self.assertEqual(3, stats['tiers'])
+        self.assertEqual(15, stats['intervals'])
+        self.assertEqual(15, stats['annotations'])
+        self.assertEqual(sum(len(a.get_children() or []) for a in collection.annotations), stats['links'])
+        # triples from to_rdf and from the writer
+        self.assertEqual(2 * len(graph), stats['triples'])
+
+
+if __name__ == '__main__':
+    unittest.main()
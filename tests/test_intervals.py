@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_intervals
+----------------------------------
+
+Tests for `annotationrdf.intervals` module.
+"""
+
+import unittest
+import random
+
+from annotationrdf.intervals import ContainmentIndex
+
+
+class Interval(object):
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+
+class TestContainmentIndex(unittest.TestCase):
+
+    def test_empty(self):
+        """An empty index contains nothing"""
+
+        index = ContainmentIndex([])
+        self.assertEqual([], index.containing(0, 1))
+
+    def test_containing(self):
+        """Boundaries are inclusive and overlapping intervals don't match"""
+
+        a = Interval(1.0, 3.0)
+        b = Interval(3.0, 5.0)
+        c = Interval(0.0, 10.0)
+        index = ContainmentIndex([a, b, c])
+
+        self.assertEqual(set([a, c]), set(index.containing(1.0, 2.0)))
+        self.assertEqual(set([a, b, c]), set(index.containing(3.0, 3.0)))
+        self.assertEqual(set([c]), set(index.containing(2.0, 4.0)))
+        self.assertEqual([], index.containing(-1.0, 2.0))
+
+    def test_matches_brute_force(self):
+        """The index finds the same intervals as testing every one"""
+
+        rand = random.Random(42)
+        for n in (1, 2, 7, 64, 100):
+            parents = []
+            for i in range(n):
+                start = rand.randint(0, 50)
+                parents.append(Interval(start, start + rand.randint(0, 20)))
+            index = ContainmentIndex(parents)
+
+            for j in range(200):
+                start = rand.randint(0, 60)
+                end = start + rand.randint(0, 10)
+                expected = [p for p in parents if start >= p.start and end <= p.end]
+                self.assertEqual(sorted(expected), sorted(index.containing(start, end)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_sink
+----------------------------------
+
+Tests for `annotationrdf.sink` module, against a stub store running
+in a thread.
+"""
+
+import threading
+import unittest
+import urllib
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+from rdflib import Graph, ConjunctiveGraph, URIRef
+from rdflib.compare import isomorphic
+
+import annotationrdf
+from annotationrdf import StoreSink
+from annotationrdf.sink import SinkError
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Records each request and replies with the next of the server's
+    scripted statuses, 204 when there are none left, or drops the
+    connection for a status of None"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        server = self.server
+        with server.lock:
+            status = server.statuses.pop(0) if server.statuses else 204
+            if status is None:
+                self.close_connection = 1
+                return
+            server.requests.append((self.path, self.headers['Content-Type'], body, self.client_address))
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubHandler)
+        self.lock = threading.Lock()
+        self.statuses = []
+        self.requests = []
+
+
+def insert_data(body, graph=None):
+    """Parse the triples in a SPARQL INSERT DATA request as written by
+    the sink, rdflib's SPARQL parser recurses for each triple so can't
+    read large requests"""
+
+    head = 'INSERT DATA {\n'
+    tail = '}\n'
+    if graph is not None:
+        head += 'GRAPH <%s> {\n' % graph
+        tail += '}\n'
+    assert body.startswith(head) and body.endswith(tail), body
+    return Graph().parse(data=body[len(head):-len(tail)], format='nt')
+
+
+class TestSink(unittest.TestCase):
+
+    corpusid = URIRef("http://example.org/corpora/corpus99")
+
+    def setUp(self):
+        self.server = StubServer()
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.url = 'http://127.0.0.1:%d/store' % self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def collections(self, n=3):
+        return [annotationrdf.maus_annotations("tests/S1219s1.TextGrid", self.corpusid,
+                                               URIRef("http://example.org/corpora/corpus99/item%d" % i))
+                for i in range(n)]
+
+    def expected(self, collections):
+        graph = Graph()
+        for collection in collections:
+            collection.to_rdf(graph)
+        return graph
+
+    def test_update(self):
+        """Test batching collections into SPARQL updates over kept-alive connections"""
+
+        collections = self.collections()
+        with StoreSink(self.url, max_triples=100, concurrency=2) as sink:
+            for collection in collections:
+                sink.add(collection)
+
+        graph = Graph()
+        for (path, content_type, body, client) in self.server.requests:
+            self.assertEqual('/store', path)
+            self.assertEqual('application/sparql-update', content_type)
+            graph += insert_data(body)
+        self.assertTrue(isomorphic(self.expected(collections), graph))
+
+        # 3 * 146 triples in requests of at most 100
+        self.assertEqual(5, len(self.server.requests))
+        self.assertEqual({'requests': 5, 'retries': 0, 'triples': 3 * 146,
+                          'bytes': sum(len(r[2]) for r in self.server.requests)}, sink.stats())
+        self.assertTrue(len(set(r[3] for r in self.server.requests)) <= 2)
+
+        # into a named graph, several collections to a request
+        del self.server.requests[:]
+        name = URIRef("http://example.org/graphs/corpus99")
+        with StoreSink(self.url, graph=name, max_bytes=1 << 20) as sink:
+            for collection in collections:
+                sink.add(collection)
+        self.assertEqual(1, len(self.server.requests))
+        graph = insert_data(self.server.requests[0][2], name)
+        self.assertTrue(isomorphic(self.expected(collections), graph))
+
+        # small requests are real SPARQL
+        del self.server.requests[:]
+        with StoreSink(self.url, graph=name, max_triples=10) as sink:
+            sink.add(collections[0])
+        store = ConjunctiveGraph()
+        for request in self.server.requests:
+            store.update(request[2])
+        self.assertTrue(isomorphic(collections[0].to_rdf(), store.get_context(name)))
+
+    def test_graph_store(self):
+        """Test posting N-Triples to a Graph Store Protocol endpoint"""
+
+        collections = self.collections(2)
+        name = URIRef("http://example.org/graphs/corpus99")
+        with StoreSink(self.url + '?x=1', protocol='graph', graph=name, max_triples=200) as sink:
+            for collection in collections:
+                sink.add(collection)
+
+        graph = Graph()
+        for (path, content_type, body, client) in self.server.requests:
+            self.assertEqual('/store?x=1&graph=' + urllib.quote(name, safe=''), path)
+            self.assertEqual('application/n-triples', content_type)
+            graph.parse(data=body, format='nt')
+        self.assertTrue(isomorphic(self.expected(collections), graph))
+
+    def test_retry(self):
+        """Test that busy responses and dropped connections are retried"""
+
+        self.server.statuses = [503, None, 500]
+        (collection,) = self.collections(1)
+        with StoreSink(self.url, concurrency=1, backoff=0.001) as sink:
+            sink.add(collection)
+        self.assertEqual(3, sink.stats()['retries'])
+        self.assertEqual(1, sink.stats()['requests'])
+
+        self.assertTrue(isomorphic(collection.to_rdf(), insert_data(self.server.requests[-1][2])))
+
+    def test_failure(self):
+        """Test that requests that can't be retried are reported"""
+
+        (collection,) = self.collections(1)
+        self.server.statuses = [400]
+        sink = StoreSink(self.url, concurrency=1, backoff=0.001)
+        sink.add(collection)
+        self.assertRaises(SinkError, sink.close)
+
+        self.server.statuses = [503] * 3
+        sink = StoreSink(self.url, concurrency=1, retries=2, backoff=0.001)
+        sink.add(collection)
+        self.assertRaises(SinkError, sink.flush)
+        sink.close()
+        self.assertEqual(0, sink.stats()['requests'])
+
+        self.assertRaises(TypeError, StoreSink, self.url, protocol='ftp')
+
+
+if __name__ == '__main__':
+    unittest.main()
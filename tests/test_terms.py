@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+test_terms
+----------------------------------
+
+Tests for `annotationrdf.terms` module.
+"""
+
+import unittest
+from rdflib import Literal, XSD, URIRef
+
+import annotationrdf
+from annotationrdf.terms import TermCache, NO_TERMS
+
+
+class TestTermCache(unittest.TestCase):
+
+    def test_literal(self):
+        """Test that equal literals are shared and others kept apart"""
+
+        terms = TermCache()
+
+        a = terms.literal(u'a')
+        self.assertEqual(Literal(u'a'), a)
+        self.assertTrue(a is terms.literal(u'a'))
+
+        one = terms.literal(1.0, XSD.float)
+        self.assertEqual(Literal(1.0, datatype=XSD.float), one)
+        self.assertFalse(one is terms.literal(1, XSD.integer))
+        self.assertFalse(one is terms.literal(1.0))
+
+        self.assertEqual(1, terms.stats()['hits'])
+        self.assertEqual(4, terms.stats()['misses'])
+
+    def test_bounded(self):
+        """Test that the cache is bounded, starting again when it is full"""
+
+        terms = TermCache(size=2)
+        a = terms.uri(u'http://example.org/a')
+        terms.uri(u'http://example.org/b')
+        self.assertTrue(a is terms.uri(u'http://example.org/a'))
+        c = terms.uri(u'http://example.org/c')
+
+        self.assertEqual(1, len(terms.terms))
+        self.assertTrue(c is terms.uri(u'http://example.org/c'))
+        self.assertFalse(a is terms.uri(u'http://example.org/a'))
+
+    def test_no_terms(self):
+        """Test that NO_TERMS makes equal but separate terms"""
+
+        a = NO_TERMS.literal(u'a')
+        self.assertEqual(Literal(u'a'), a)
+        self.assertFalse(a is NO_TERMS.literal(u'a'))
+        self.assertEqual(URIRef(u'http://example.org/a'), NO_TERMS.uri(u'http://example.org/a'))
+
+    def test_maus_stats(self):
+        """Test that labels and times are shared when writing a collection"""
+
+        corpusid = URIRef("http://example.org/corpora/corpus99")
+        itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+        collection = annotationrdf.maus_annotations("tests/S1219s1.TextGrid", corpusid, itemid)
+        terms = TermCache()
+        graph = collection.to_rdf(terms=terms)
+
+        stats = terms.stats()
+        self.assertTrue(stats['hit_rate'] > 0.5)
+        self.assertEqual(len(set(graph.objects())), len(set(id(o) for o in graph.objects())))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,11 +8,39 @@ test_annotationrdf
 Tests for `annotationrdf` module.
 """
 
+import struct
+import tempfile
+import os
 import unittest
+import warnings
+from StringIO import StringIO
 from rdflib import Namespace, Graph, Literal, XSD, URIRef
+from rdflib.compare import isomorphic
 
 import annotationrdf
 from annotationrdf.namespaces import DADA, MAUS
+from annotationrdf import textgrid
+
+def binary_textgrid(tg):
+    """Write a TextGrid in the binary format, with the label 'this' written
+    as u'th\xefs' to test UTF-16 strings"""
+
+    def string(text):
+        if text == 'this':
+            utf16 = u'th\xefs'.encode('utf-16-be')
+            return struct.pack('>HH', 0xFFFF, 4) + utf16
+        return struct.pack('>H', len(text)) + text
+
+    data = 'ooBinaryFile' + struct.pack('>B', 8) + 'TextGrid'
+    data += struct.pack('>ddBi', tg.xmin, tg.xmax, 1, tg.size)
+    for tier in tg:
+        data += struct.pack('>B', len(tier.classid)) + tier.classid + string(tier.nameid)
+        data += struct.pack('>ddi', tier.xmin, tier.xmax, len(tier.simple_transcript))
+        for row in tier.simple_transcript:
+            data += struct.pack('>' + 'd' * (len(row) - 1), *[float(t) for t in row[:-1]])
+            data += string(row[-1])
+    return data
+
 
 class TestTextGrid(unittest.TestCase):
 
@@ -32,5 +60,335 @@ class TestTextGrid(unittest.TestCase):
         collection = annotationrdf.maus_annotations(tf, corpusid, itemid)
 
         graph = collection.to_rdf()
-        
-        
\ No newline at end of file
+
+        self.assertEqual(15, len(collection.annotations))
+
+    def test_textgrid_formats(self):
+        """Test that the three text formats give the same tiers"""
+
+        oo = textgrid.TextGrid(textgrid.demo_data1)
+        old = textgrid.TextGrid(textgrid.demo_data2)
+        chron = textgrid.TextGrid(textgrid.demo_data3)
+
+        self.assertEqual("ooTextFile", oo.text_type)
+        self.assertEqual("OldooTextFile", old.text_type)
+        self.assertEqual("ChronTextFile", chron.text_type)
+
+        self.assertEqual(3, oo.size)
+        self.assertEqual(['utterances', 'notes', 'phones'], [t.tier_name() for t in oo])
+        self.assertEqual(('2041.4217474125382', '2041.968276643991', 'this'),
+                         oo.tiers[0].simple_transcript[1])
+        self.assertEqual(('2043.8338291031832', 'voice gets quiet here'),
+                         oo.tiers[1].simple_transcript[1])
+
+        self.assertEqual((0.0, 2.8), old.tiers[1].min_max())
+        for (a, b) in zip(old, chron):
+            self.assertEqual(a.tier_name(), b.tier_name())
+            self.assertEqual(a.simple_transcript, b.simple_transcript)
+
+    def test_textgrid_reader(self):
+        """Test reading rows one at a time from an open file"""
+
+        with open("tests/S1219s1.TextGrid") as read_file:
+            reader = textgrid.TextGridReader(read_file)
+            self.assertEqual(3, reader.size)
+            self.assertEqual([], reader.tiers)
+            rows = [(tier.tier_name(), row) for (tier, row) in reader]
+
+        self.assertEqual(['ORT', 'KAN', 'MAU'], [t.tier_name() for t in reader.tiers])
+        self.assertEqual(('ORT', ('0.665315039757821', '1.290899090683124', 'BASINETTE')), rows[1])
+        self.assertEqual(sum(t.size for t in reader.tiers), len(rows))
+
+    def test_textgrid_strings(self):
+        """Test labels with quotes, comment characters and newlines"""
+
+        data = textgrid.demo_data2.replace('"demo"', '"a ""quoted""\n! demo"')
+        tg = textgrid.TextGrid(data)
+
+        self.assertEqual('a "quoted"\n! demo', tg.tiers[0].simple_transcript[1][2])
+        self.assertEqual(3, len(tg.tiers[0].simple_transcript))
+
+        # in the long format, where most lines are a label and one value
+        labels = ['a = b', 'say ""hi""', 'x ! y', 'two\nlines']
+        data = textgrid.demo_data1
+        for (word, label) in zip(['"this"', '"is"', '"a"', '"demo"'], labels):
+            data = data.replace('text = %s' % word, 'text = "%s"' % label)
+        data = data.replace('xmin = 2041.968276643991\n', 'xmin = 2041.968276643991 ! a comment\n', 1)
+        tg = textgrid.TextGrid(data)
+        self.assertEqual(['', 'a = b', 'say "hi"', 'x ! y', 'two\nlines'],
+                         [row[2] for row in tg.tiers[0].simple_transcript])
+        self.assertEqual('2041.968276643991', tg.tiers[0].simple_transcript[2][0])
+
+    def test_old_names(self):
+        """Test the names kept from the old parser"""
+
+        tg = textgrid.TextGrid(textgrid.demo_data1)
+        tier = tg.tiers[2]
+        self.assertEqual(textgrid.demo_data1, tg.read_file)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            self.assertEqual(tier.simple_transcript, tier.transcript)
+            self.assertEqual(tier.simple_transcript, tier.make_simple_transcript())
+            self.assertEqual(('IntervalTier', 'phones', 0.0, 2045.144149659864, 12, tier.simple_transcript),
+                             tier.tier_info)
+            tier._make_info()
+        self.assertEqual(4, len(caught))
+        self.assertTrue(all(issubclass(w.category, DeprecationWarning) for w in caught))
+
+    def test_chron_tier_numbers(self):
+        """Test that chronological rows only go to their own tier"""
+
+        # a label that looks like a row of tier 2 must stay in tier 1
+        data = textgrid.demo_data3.replace('"demo"', '"2 0 1.6229213249309031"')
+        tg = textgrid.TextGrid(data)
+
+        self.assertEqual(3, len(tg.tiers[0].simple_transcript))
+        self.assertEqual(7, len(tg.tiers[1].simple_transcript))
+        self.assertEqual('2 0 1.6229213249309031', tg.tiers[0].simple_transcript[1][2])
+
+        for bad in ('3', '0', 'x'):
+            data = textgrid.demo_data3.replace('\n1 2.341428074708195', '\n%s 2.341428074708195' % bad)
+            self.assertRaises(TypeError, textgrid.TextGrid, data)
+
+    def test_binary(self):
+        """Test that the binary format gives the same tiers as the text formats"""
+
+        oo = textgrid.TextGrid(textgrid.demo_data1)
+        data = binary_textgrid(oo)
+
+        binary = textgrid.TextGrid(data)
+        self.assertEqual("ooBinaryFile", binary.text_type)
+        self.assertEqual((oo.xmin, oo.xmax, oo.size), (binary.xmin, binary.xmax, binary.size))
+        for (a, b) in zip(oo, binary):
+            self.assertEqual((a.classid, a.nameid, a.min_max()), (b.classid, b.nameid, b.min_max()))
+            self.assertEqual(len(a.simple_transcript), len(b.simple_transcript))
+            for (x, y) in zip(a.simple_transcript, b.simple_transcript):
+                self.assertEqual([float(t) for t in x[:-1]], [float(t) for t in y[:-1]])
+                self.assertEqual(x[-1].replace('this', 'th\xc3\xafs'), y[-1])
+
+        # files are recognised by their contents
+        (fd, path) = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as out:
+            out.write(data)
+        try:
+            self.assertEqual(binary.tiers[2].simple_transcript, textgrid.TextGrid.load(path).tiers[2].simple_transcript)
+        finally:
+            os.remove(path)
+
+        self.assertRaises(TypeError, textgrid.TextGrid, data[:-3])
+
+    def test_mapped(self):
+        """Test reading the tiers of a mapped file in each format"""
+
+        sources = [textgrid.demo_data1, textgrid.demo_data2, textgrid.demo_data3,
+                   binary_textgrid(textgrid.TextGrid(textgrid.demo_data1)),
+                   open("tests/S1219s1.TextGrid").read()]
+        for data in sources:
+            (fd, path) = tempfile.mkstemp()
+            with os.fdopen(fd, 'wb') as out:
+                out.write(data)
+            try:
+                tg = textgrid.TextGrid(data)
+                with textgrid.MappedTextGrid(path) as mapped:
+                    self.assertEqual(tg.text_type, mapped.text_type)
+                    self.assertEqual((tg.size, tg.xmin, tg.xmax), (mapped.size, mapped.xmin, mapped.xmax))
+                    for (a, b) in zip(tg, mapped):
+                        self.assertEqual((a.classid, a.nameid, a.min_max()), (b.classid, b.nameid, b.min_max()))
+                        self.assertEqual(a.simple_transcript, b.simple_transcript)
+                        self.assertEqual([row[-1] for row in a.simple_transcript], list(b.labels()))
+                        self.assertEqual([tuple(float(t) for t in row[:-1]) for row in a.simple_transcript],
+                                         list(b.times()))
+                    self.assertEqual(mapped.tiers[0].simple_transcript, list(mapped.tiers[0].rows()))
+            finally:
+                os.remove(path)
+
+    def test_lazy(self):
+        """Test reading tier headers first and rows when they are used"""
+
+        for data in (textgrid.demo_data1, textgrid.demo_data2, textgrid.demo_data3,
+                     binary_textgrid(textgrid.TextGrid(textgrid.demo_data1))):
+            tg = textgrid.TextGrid(data)
+            lazy = textgrid.TextGrid(data, lazy=True)
+            self.assertEqual([t.size for t in tg], [t.size for t in lazy])
+            self.assertTrue(all(t._transcript is None for t in lazy))
+            self.assertEqual(tg.tiers[1].simple_transcript, lazy.tiers[1].simple_transcript)
+            self.assertEqual(None, lazy.tiers[0]._transcript)
+            self.assertEqual(tg.tiers[1].time(), lazy.tiers[1].time())
+
+    def test_lazy_chron(self):
+        """Test that each lazy tier of a chronological file gets only its own rows"""
+
+        tg = textgrid.TextGrid(textgrid.demo_data1)
+        tg.tiers = tg.tiers * 6
+        tg.size = len(tg.tiers)
+        data = tg.to_chron()
+
+        tg = textgrid.TextGrid(data)
+        lazy = textgrid.TextGrid(data, lazy=True)
+        self.assertEqual(18, lazy.size)
+        for (a, b) in zip(tg, lazy):
+            self.assertEqual(a.simple_transcript, list(b.rows()))
+            self.assertEqual([tuple(float(t) for t in row[:-1]) for row in a.simple_transcript],
+                             list(b.times()))
+
+        # from an open file, with only some of the tiers kept
+        lazy = textgrid.TextGrid(StringIO(data), tiers=['phones'], lazy=True)
+        self.assertEqual(6, lazy.size)
+        self.assertEqual([tg.tiers[2].simple_transcript] * 6, [t.simple_transcript for t in lazy])
+
+        for bad in ('3', '0', 'x'):
+            data = textgrid.demo_data3.replace('\n1 2.341428074708195', '\n%s 2.341428074708195' % bad)
+            self.assertRaises(TypeError, textgrid.TextGrid, data, lazy=True)
+        self.assertRaises(TypeError, textgrid.TextGrid, textgrid.demo_data3.rstrip()[:-3], lazy=True)
+
+    def test_named_tiers(self):
+        """Test reading only some of the tiers"""
+
+        for lazy in (False, True):
+            tg = textgrid.TextGrid(textgrid.demo_data3, tiers=['phones'], lazy=lazy)
+            self.assertEqual(1, tg.size)
+            self.assertEqual(['phones'], [t.tier_name() for t in tg])
+            self.assertEqual(7, len(tg.tiers[0].simple_transcript))
+
+        with textgrid.MappedTextGrid("tests/S1219s1.TextGrid", tiers=['ORT', 'MAU']) as tg:
+            self.assertEqual(['ORT', 'MAU'], [t.tier_name() for t in tg])
+            self.assertEqual(('0.665315039757821', '1.290899090683124', 'BASINETTE'),
+                             tg.tiers[0].simple_transcript[1])
+
+    def test_maus_other_tiers(self):
+        """Test that tiers other than ORT, KAN and MAU are skipped"""
+
+        # add a copy of the ORT tier with another name
+        data = open("tests/S1219s1.TextGrid").read()
+        ort = data[data.index('    item [1]'):data.index('    item [2]')]
+        data = data.replace('size = 3', 'size = 4', 1) + ort.replace('"ORT"', '"TRN"')
+        (fd, path) = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as out:
+            out.write(data)
+        try:
+            self.assertEqual(4, textgrid.TextGrid.load(path).size)
+            corpusid = URIRef("http://example.org/corpora/corpus99")
+            itemid = URIRef("http://example.org/corpora/corpus99/item123")
+            collection = annotationrdf.maus_annotations(path, corpusid, itemid)
+            self.assertEqual(15, len(collection.annotations))
+        finally:
+            os.remove(path)
+
+    def test_columns(self):
+        """Test the times of a tier as float arrays"""
+
+        for lazy in (False, True):
+            tg = textgrid.TextGrid(textgrid.demo_data1, lazy=lazy)
+            (starts, ends, labels) = tg.tiers[0].columns()
+            rows = tg.tiers[0].simple_transcript
+            self.assertEqual([float(row[0]) for row in rows], list(starts))
+            self.assertEqual([float(row[1]) for row in rows], list(ends))
+            self.assertEqual([row[2] for row in rows], labels)
+            self.assertEqual(8, starts.itemsize)
+            self.assertTrue(starts is tg.tiers[0].starts())
+
+            # points are both starts and ends
+            notes = tg.tiers[1]
+            self.assertEqual(list(notes.starts()), list(notes.ends()))
+            self.assertEqual(2043.8338291031832, notes.starts()[1])
+
+        tg.tiers[0].simple_transcript = [('0', '1.5', 'a')]
+        self.assertEqual([1.5], list(tg.tiers[0].ends()))
+
+    def test_stats(self):
+        """Test tier statistics against the old row by row speech time"""
+
+        def speech_time(tier):
+            total = 0.0
+            if tier.classid != textgrid.TEXTTIER:
+                for (time1, time2, utt) in tier.simple_transcript:
+                    utt = utt.strip()
+                    if utt and not utt[0] == ".":
+                        total += (float(time2) - float(time1))
+            return total
+
+        for tg in (textgrid.TextGrid(textgrid.demo_data1), textgrid.TextGrid.load("tests/S1219s1.TextGrid")):
+            for (tier, stats) in zip(tg, tg.stats()):
+                self.assertEqual(tier.nameid, stats['name'])
+                self.assertAlmostEqual(speech_time(tier), stats['speech'])
+                self.assertEqual(tier.time(), stats['speech'])
+                self.assertEqual(len(tier.simple_transcript), stats['count'])
+                self.assertEqual(len(tier.simple_transcript), sum(stats['labels'].values()))
+
+        phones = textgrid.TextGrid(textgrid.demo_data1).tiers[2]
+        phones.simple_transcript = [('0', '1', ''), ('1', '2', 'a'), ('2', '4', '.b'),
+                                    ('4', '5', 'a'), ('5', '8', 'c')]
+        stats = phones.stats(percentiles=(0, 50, 75, 100))
+        self.assertEqual(3, stats['speech_count'])
+        self.assertEqual((8.0, 5.0, 3.0), (stats['total'], stats['speech'], stats['non_speech']))
+        self.assertEqual(5.0 / 8, stats['speech_ratio'])
+        self.assertEqual((5.0 / 3, 1.0, 3.0), (stats['mean'], stats['min'], stats['max']))
+        self.assertEqual({0: 1.0, 50: 1.0, 75: 2.0, 100: 3.0}, stats['percentiles'])
+        self.assertEqual(2, stats['labels']['a'])
+        # another non-speech marker
+        self.assertEqual(4.0, phones.time(non_speech_char='c'))
+        # no marker, only empty labels are not speech
+        self.assertEqual(7.0, phones.time(non_speech_char=''))
+        self.assertEqual(4, phones.stats(non_speech_char='')['speech_count'])
+
+        notes = textgrid.TextGrid(textgrid.demo_data1).tiers[1].stats()
+        self.assertEqual((0.0, 0.0), (notes['total'], notes['speech']))
+
+    def test_write(self):
+        """Test writing each format and reading it back"""
+
+        data = textgrid.demo_data1.replace('"demo"', '"a ""quoted""\n! demo"')
+        sources = [textgrid.TextGrid(data), textgrid.TextGrid(textgrid.demo_data3),
+                   textgrid.TextGrid.load("tests/S1219s1.TextGrid", lazy=True),
+                   textgrid.TextGrid(binary_textgrid(textgrid.TextGrid(textgrid.demo_data1)))]
+        for tg in sources:
+            for text_type in ("ooTextFile", "OldooTextFile", "ChronTextFile"):
+                out = StringIO()
+                tg.write(out, text_type)
+                copy = textgrid.TextGrid(out.getvalue())
+                self.assertEqual(text_type, copy.text_type)
+                self.assertEqual((tg.xmin, tg.xmax, tg.size), (copy.xmin, copy.xmax, copy.size))
+                for (a, b) in zip(tg, copy):
+                    self.assertEqual((a.classid, a.nameid, a.min_max()), (b.classid, b.nameid, b.min_max()))
+                    self.assertEqual(a.simple_transcript, b.simple_transcript)
+
+        tg = sources[0]
+        self.assertEqual(tg.to_oo(), textgrid.TextGrid(tg.to_chron()).to_oo())
+        self.assertRaises(TypeError, tg.write, StringIO(), "ooBinaryFile")
+
+    def test_maus_link_times(self):
+        """Test that words are linked to phones by the value of their times"""
+
+        data = textgrid.demo_data2.split('"IntervalTier"')[0].replace('\n3\n', '\n2\n', 1)
+        data += '"IntervalTier"\n"ORT"\n0\n10.5\n2\n0\n9.8\n""\n9.8\n10.5\n"WORD"\n'
+        data += '"IntervalTier"\n"MAU"\n0\n10.5\n3\n0\n9.8\n""\n9.8\n10.0\n"w"\n10.0\n10.5\n"3:"\n'
+        (fd, path) = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as out:
+            out.write(data)
+        try:
+            corpusid = URIRef("http://example.org/corpora/corpus99")
+            itemid = URIRef("http://example.org/corpora/corpus99/item123")
+            collection = annotationrdf.maus_annotations(path, corpusid, itemid)
+        finally:
+            os.remove(path)
+
+        vals = dict((a.uri(), a['val']) for a in collection.annotations)
+        word = [a for a in collection.annotations if a['val'] == 'WORD'][0]
+        self.assertEqual(['w', '3:'], [vals[uri] for uri in word.get_children()])
+
+    def test_maus_write_rdf(self):
+        """Test streaming RDF output gives the same graph as to_rdf"""
+
+        corpusid = URIRef("http://example.org/corpora/corpus99")
+        itemid = URIRef("http://example.org/corpora/corpus99/item123")
+
+        collection = annotationrdf.maus_annotations("tests/S1219s1.TextGrid", corpusid, itemid)
+        graph = collection.to_rdf()
+
+        out = StringIO()
+        collection.write_ntriples(out)
+        self.assertTrue(isomorphic(graph, Graph().parse(data=out.getvalue(), format='nt')))
+
+        out = StringIO()
+        collection.write_turtle(out)
+        self.assertTrue(isomorphic(graph, Graph().parse(data=out.getvalue(), format='turtle')))